@@ -4,6 +4,11 @@ from setuptools import setup
 
 install_requires = ["aiohttp"]
 tests_require = ["mock", "unittest2"]
+extras_require = {
+    "http2": ["httpx[http2]"],
+    "numpy": ["numpy"],
+    "arrow": ["pyarrow"],
+}
 
 base_dir = os.path.dirname(os.path.abspath(__file__))
 
@@ -41,15 +46,23 @@ setup(
         # List of python versions and their support status:
         # https://en.wikipedia.org/wiki/CPython#Version_history
         'Programming Language :: Python',
-        'Programming Language :: Python :: 3.4',
-        'Programming Language :: Python :: 3.5',
+        'Programming Language :: Python :: 3',
+        'Programming Language :: Python :: 3 :: Only',
+        'Programming Language :: Python :: 3.7',
+        'Programming Language :: Python :: 3.8',
+        'Programming Language :: Python :: 3.9',
+        'Programming Language :: Python :: 3.10',
+        'Programming Language :: Python :: 3.11',
+        'Programming Language :: Python :: 3.12',
         'Topic :: Internet :: WWW/HTTP :: HTTP Servers',
         'Topic :: Software Development :: Libraries :: Python Modules',
         'Topic :: Software Development :: Testing',
     ],
     packages = ["slumber"],
     zip_safe = False,
+    python_requires = ">=3.7",
     install_requires = install_requires,
+    extras_require = extras_require,
     tests_require = tests_require,
     test_suite = "tests.get_tests",
 )
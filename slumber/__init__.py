@@ -1,15 +1,69 @@
-import aiohttp
+import asyncio
+import importlib
+from contextlib import asynccontextmanager
 
 try:
-    from urllib.parse import urlparse, urlsplit, urlunsplit
+    from collections.abc import Mapping
 except ImportError:
-    from urlparse import urlparse, urlsplit, urlunsplit
+    from collections import Mapping
 
 from . import exceptions
+from . import timeouts
 from .serialize import Serializer
-from .utils import url_join, iterator, copy_kwargs
-
-__all__ = ["Resource", "API"]
+from .utils import url_join, copy_kwargs
+from .timeouts import Timeout, deadline
+from .hedging import HedgePolicy
+from .balancing import Balancer
+from .redirects import LocationPolicy
+from .polling import PollScheduler
+from .idempotency import IdempotencyPolicy, IdempotencyJournal
+from .config import APIConfig
+from .slashes import SlashTable
+from .limits import ConcurrencyLimiter
+from .priorities import PriorityScheduler
+from .columnar import Columnar
+from .sync import Mirror
+from .middleware import Pipeline, Request
+
+# Names imported on first access, so that ``import slumber`` doesn't import
+# aiohttp and the other heavy dependencies of the modules providing them.
+_LAZY_ATTRIBUTES = {
+    "AiohttpTransport": "transports",
+    "AuthProvider": "auth",
+    "BearerAuth": "auth",
+    "TokenAuth": "auth",
+    "OAuth2ClientCredentials": "auth",
+    "HMACAuth": "auth",
+    "Recorder": "recording",
+    "ReplayTransport": "recording",
+    "DiskCache": "caching",
+    "ProcessRunner": "runners",
+}
+
+_LAZY_MODULES = ("auth", "caching", "downloads", "recording", "runners", "streams", "transports", "websockets")
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        return getattr(importlib.import_module("." + _LAZY_ATTRIBUTES[name], __name__), name)
+    if name in _LAZY_MODULES:
+        return importlib.import_module("." + name, __name__)
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES) | set(_LAZY_MODULES))
+
+
+__all__ = ["Resource", "API", "Timeout", "deadline", "HedgePolicy", "Balancer", "LocationPolicy",
+           "PollScheduler", "DiskCache", "IdempotencyPolicy", "IdempotencyJournal",
+           "ProcessRunner", "APIConfig", "SlashTable",
+           "ConcurrencyLimiter", "PriorityScheduler", "Columnar", "Mirror", "Request",
+           "AuthProvider", "BearerAuth", "TokenAuth", "OAuth2ClientCredentials", "HMACAuth",
+           "Recorder", "ReplayTransport"]
+
+# The modes of ``raw`` returning the body without decoding it.
+_raw_modes = ("bytes", "memoryview", "lazy")
 
 
 class ResourceAttributesMixin(object):
@@ -39,6 +93,38 @@ class ResourceAttributesMixin(object):
         return self._get_resource(**kwargs)
 
 
+class LazyResponse(object):
+    """
+    A response whose body is only decoded when ``data`` is first accessed.
+    """
+
+    __slots__ = ("response", "_decode", "_data")
+
+    def __init__(self, response, decode):
+        self.response = response
+        self._decode = decode
+        self._data = None
+
+    @property
+    def status_code(self):
+        return self.response.status_code
+
+    @property
+    def headers(self):
+        return self.response.headers
+
+    @property
+    def content(self):
+        return self.response.content
+
+    @property
+    def data(self):
+        if self._decode is not None:
+            self._data = self._decode(self.response)
+            self._decode = None
+        return self._data
+
+
 class Resource(ResourceAttributesMixin, object):
     """
     Resource provides the main functionality behind slumber. It handles the
@@ -50,10 +136,30 @@ class Resource(ResourceAttributesMixin, object):
     attributes.
     """
 
+    # Keyword arguments of the verb methods that configure the request
+    # instead of being sent as query parameters, when the value is one the
+    # option takes. Other values are sent as query parameters, as is what is
+    # given in ``params``.
+    _request_options = {
+        "timeout": lambda resource, method, value: isinstance(value, (Timeout, int, float)) and
+        not isinstance(value, bool),
+        "hedge": lambda resource, method, value: value is False or isinstance(value, HedgePolicy),
+        "raw": lambda resource, method, value: isinstance(value, bool) or value in _raw_modes,
+        "on_status": lambda resource, method, value: isinstance(value, Mapping),
+        "not_found": lambda resource, method, value: True,
+        "location": lambda resource, method, value: isinstance(value, LocationPolicy) or
+        value in LocationPolicy.modes,
+        "cache": lambda resource, method, value: value is False or hasattr(value, "fetch"),
+        "idempotency": lambda resource, method, value: isinstance(value, (bool, IdempotencyPolicy)) or
+        (isinstance(value, str) and method not in ("GET", "HEAD", "OPTIONS")),
+        "priority": lambda resource, method, value: resource._store.get("priorities") is not None,
+        "headers": lambda resource, method, value: isinstance(value, Mapping),
+    }
+
     def __init__(self, *args, **kwargs):
         self._store = kwargs
 
-    def __call__(self, id=None, format=None, url_override=None):
+    def __call__(self, id=None, format=None, url_override=None, timeout=None, priority=None):
         """
         Returns a new instance of self modified by one or more of the available
         parameters. These allows us to do things like override format for a
@@ -62,7 +168,7 @@ class Resource(ResourceAttributesMixin, object):
         """
 
         # Short Circuit out if the call is empty
-        if id is None and format is None and url_override is None:
+        if id is None and format is None and url_override is None and timeout is None and priority is None:
             return self
 
         kwargs = copy_kwargs(self._store)
@@ -78,38 +184,176 @@ class Resource(ResourceAttributesMixin, object):
             #    of handling the case when a POST/PUT doesn't return an object
             #    but a Location to an object that we need to GET.
             kwargs["base_url"] = url_override
+            # The url comes from the server and is used as given.
+            kwargs["append_slash"] = False
 
-        kwargs["session"] = self._store["session"]
+        if timeout is not None:
+            kwargs["timeout"] = timeouts.resolve(self._store.get("timeout"), timeout)
+
+        if priority is not None:
+            kwargs["priority"] = priority
+
+        kwargs["transport"] = self._store["transport"]
 
         return self._get_resource(**kwargs)
 
-    def _request(self, method, data=None, files=None, params=None):
+    async def _request(self, method, data=None, files=None, params=None, timeout=None, hedge=None,
+                       on_status=None, cache=None, idempotency=None, priority=None, headers=None):
         serializer = self._store["serializer"]
         url = self.url()
 
+        # Headers given with the call are sent along the ones of the resource.
+        extra_headers = headers
         headers = {"accept": serializer.get_content_type()}
+        if extra_headers:
+            headers.update(extra_headers)
 
         if not files:
             if data is not None:
                 headers["content-type"] = serializer.get_content_type()
                 data = serializer.dumps(data)
 
-        resp = self._store["session"].request(method, url, data=data, params=params, files=files, headers=headers)
+        kwargs = {}
+        timeout = timeouts.resolve(self._store.get("timeout"), timeout)
+        budget = timeouts.remaining()
+
+        if budget is not None and budget <= 0:
+            raise exceptions.DeadlineExceeded("Deadline exceeded before %s %s" % (method, url))
 
+        if timeout is not None or budget is not None:
+            kwargs["timeout"] = (timeout or Timeout()).capped(budget)
+
+        if self._store.get("priorities") is not None:
+            kwargs["priority"] = priority if priority is not None else self._store.get("priority")
+
+        # An explicit key is sent with the policy of the resource, or the
+        # default one when the resource has none, whatever the method.
+        key = None
+        if isinstance(idempotency, str):
+            key, idempotency = idempotency, self._store.get("idempotency") or True
+        policy = IdempotencyPolicy.coerce(idempotency if idempotency is not None else self._store.get("idempotency"))
+        if policy is not None and key is None and not policy.applies(method):
+            policy = None
+
+        # Writes carrying an idempotency key are as safe to hedge as GETs.
+        if method == "GET" or policy is not None:
+            kwargs["hedge"] = hedge if hedge is not None else self._store.get("hedge")
+
+        if cache is None:
+            cache = self._store.get("cache")
+
+        def send(headers, url=url):
+            return self._send(method, url, data=data, params=params, files=files, headers=headers, **kwargs)
+
+        if self._store["append_slash"] == "auto":
+            send = self._store["slashes"].learning(method, url, send)
+
+        if method == "GET" and cache:
+            request = cache.fetch(url, params, headers, send, identity=await self._identity())
+        elif policy is not None:
+            request = policy.run(method, url, params, data if not files else None, headers, send, key=key)
+        else:
+            request = send(headers)
+
+        try:
+            if budget is None:
+                resp = await request
+            else:
+                resp = await asyncio.wait_for(request, budget)
+        except asyncio.TimeoutError:
+            if budget is not None and timeouts.remaining() <= 0:
+                raise exceptions.DeadlineExceeded("Deadline exceeded: %s %s" % (method, url))
+            raise exceptions.RequestTimeout("Timed out: %s %s" % (method, url))
+
+        if on_status and resp.status_code in on_status:
+            return resp
+
+        self._raise_for_status(resp, url)
+
+        self._ = resp
+
+        return resp
+
+    async def _identity(self):
+        """
+        Returns what tells the credentials the requests are sent with apart,
+        or None when there are none, for the cache.
+        """
+        auth = self._store.get("auth")
+        if auth is not None:
+            return await auth.identity()
+        auth = getattr(self._store["transport"], "auth", None)
+        return repr(auth) if auth is not None else None
+
+    async def _authorize(self, method, url, params, headers):
+        """
+        Returns ``headers`` authenticated by the auth provider of the API,
+        for the requests made straight on the transport.
+        """
+        auth = self._store.get("auth")
+        if auth is None:
+            return headers
+        return await auth.apply(method, url, params, None, dict(headers or {}))
+
+    @asynccontextmanager
+    async def _stream(self, url, params=None, headers=None, timeout=None):
+        """
+        Opens an authenticated streamed GET of ``url`` on the transport,
+        raising the HTTP exception of its status, with its body read, if it
+        is an error.
+        """
+        headers = await self._authorize("GET", url, params, headers)
+        async with self._store["transport"].stream("GET", url, params=params, headers=headers,
+                                                   timeout=timeout) as resp:
+            if resp.status_code >= 400:
+                from .transports import Response
+
+                content = await resp.read()
+                self._raise_for_status(Response(resp.status_code, resp.headers, content, url=url), url)
+            yield resp
+
+    def _raise_for_status(self, resp, url):
         if 400 <= resp.status_code <= 499:
             exception_class = exceptions.HttpNotFoundError if resp.status_code == 404 else exceptions.HttpClientError
-            raise exception_class("Client Error %s: %s" % (resp.status_code, url), response=resp, content=resp.content)
+            raise exception_class(response=resp, url=url, decode=self._try_to_serialize_response)
         elif 500 <= resp.status_code <= 599:
-            raise exceptions.HttpServerError("Server Error %s: %s" % (resp.status_code, url), response=resp, content=resp.content)
+            raise exceptions.HttpServerError(response=resp, url=url, decode=self._try_to_serialize_response)
 
-        self._ = resp
+    async def _send(self, method, url, hedge=None, **kwargs):
+        if not hedge:
+            return await self._send_once(method, url, **kwargs)
 
-        return resp
+        return await hedge.run(lambda: self._send_once(method, url, **kwargs))
+
+    async def _send_once(self, method, url, priority=None, **kwargs):
+        transport = self._store["transport"]
+        balancer = self._store.get("balancer")
+        limiter = self._store.get("limiter")
+        priorities = self._store.get("priorities")
+
+        pipeline = self._store.get("pipeline")
+        if pipeline is None:
+            # Resources built without an API have no middleware.
+            pipeline = Pipeline(transport, auth=self._store.get("auth"))
+
+        def request(url):
+            send = lambda: pipeline.handler(Request(method, url, **kwargs))
+            if limiter is not None:
+                send = lambda send=send: limiter.run(url, send)
+            if priorities is not None:
+                return priorities.run(priority, send)
+            return send()
+
+        if balancer is None:
+            return await request(url)
+
+        balancer.ensure_health_checks(transport)
+        return await balancer.run(url, request)
 
-    def _handle_redirect(self, resp, **kwargs):
+    async def _handle_redirect(self, resp, **kwargs):
         # @@@ Hacky, see description in __call__
         resource_obj = self(url_override=resp.headers["location"])
-        return resource_obj.get(**kwargs)
+        return await resource_obj.get(**kwargs)
 
     def _try_to_serialize_response(self, resp):
         s = self._store["serializer"]
@@ -128,46 +372,222 @@ class Resource(ResourceAttributesMixin, object):
         else:
             return resp.content
 
-    def _process_response(self, resp):
+    def _decode_response(self, resp):
         if 200 <= resp.status_code <= 299:
-            decoded = self._try_to_serialize_response(resp)
-        else:
-            # @@@ We should probably do some sort of error here? (Is this even possible?)
-            decoded = None
+            return self._try_to_serialize_response(resp)
+
+        # @@@ We should probably do some sort of error here? (Is this even possible?)
+        return None
+
+    def _process_response(self, resp, raw=None):
+        if raw is None:
+            raw = self._store.get("raw")
+
+        # Passthrough modes, the body is never decoded.
+        if raw == "bytes":
+            return resp.content if resp.content is not None else b""
+        elif raw == "memoryview":
+            return memoryview(resp.content if resp.content is not None else b"")
+        elif raw == "lazy":
+            return LazyResponse(resp, self._decode_response)
 
-        if self._store["raw"]:
+        decoded = self._decode_response(resp)
+
+        if raw:
             return (resp, decoded)
 
         return decoded
 
-    def _do_verb_request(self, verb, data=None, files=None, params=None):
-        resp = self._request(verb, data=data, files=files, params=params)
-        return self._process_response(resp)
+    async def _do_verb_request(self, verb, data=None, files=None, params=None, raw=None,
+                               on_status=None, location=None, **options):
+        resp = await self._request(verb, data=data, files=files, params=params, on_status=on_status, **options)
 
-    def as_raw(self):
-        self._store["raw"] = True
-        return self
+        if on_status and resp.status_code in on_status:
+            return on_status[resp.status_code]
+
+        policy = LocationPolicy.coerce(location if location is not None else self._store.get("location"))
+        if policy is not None and policy.applies(resp):
+            if policy.mode == "location":
+                return policy.location(self, resp)
+            resp = await policy.resolve(self, resp)
 
-    def get(self, **kwargs):
-        return self._do_verb_request("GET", params=kwargs)
+        return self._process_response(resp, raw=raw)
+
+    def _split_options(self, kwargs, method="GET"):
+        options = {}
+        for key, takes in self._request_options.items():
+            if key in kwargs and (kwargs[key] is None or takes(self, method, kwargs[key])):
+                options[key] = kwargs.pop(key)
+
+        # params= sends the names of the options as query parameters.
+        params = kwargs.pop("params", None)
+        if isinstance(params, Mapping):
+            kwargs.update(params)
+        elif params is not None:
+            kwargs["params"] = params
+
+        # not_found=value is a shorthand to return value instead of raising
+        # HttpNotFoundError, which is cheaper when many 404s are expected.
+        if "not_found" in options:
+            on_status = dict(options.get("on_status") or {})
+            on_status[404] = options.pop("not_found")
+            options["on_status"] = on_status
+
+        return kwargs, options
+
+    def as_raw(self, mode=True):
+        """
+        Returns a copy of this resource whose responses are returned raw.
+
+        With ``True`` a ``(response, decoded)`` tuple is returned. ``"bytes"``
+        and ``"memoryview"`` return the body without ever decoding it, and
+        ``"lazy"`` a ``LazyResponse`` that decodes it on first access.
+        """
+        kwargs = copy_kwargs(self._store)
+        kwargs["raw"] = mode
+        return self._get_resource(**kwargs)
+
+    def get(self, columnar=None, **kwargs):
+        """
+        GETs the resource. With ``columnar``, ``True`` or a ``Columnar``, a
+        list of records is decoded into columns instead of dicts.
+        """
+        if not (columnar is None or isinstance(columnar, (bool, Columnar)) or columnar in Columnar.backends):
+            kwargs["columnar"], columnar = columnar, None
+        params, options = self._split_options(kwargs)
+        columnar = Columnar.coerce(columnar)
+        if columnar is not None:
+            return columnar.fetch(self, params, options)
+        return self._do_verb_request("GET", params=params, **options)
 
     def options(self, **kwargs):
-        return self._do_verb_request("OPTIONS", params=kwargs)
+        params, options = self._split_options(kwargs, "OPTIONS")
+        return self._do_verb_request("OPTIONS", params=params, **options)
 
     def head(self, **kwargs):
-        return self._do_verb_request("HEAD", params=kwargs)
+        params, options = self._split_options(kwargs, "HEAD")
+        return self._do_verb_request("HEAD", params=params, **options)
 
     def post(self, data=None, files=None, **kwargs):
-        return self._do_verb_request("POST", data=data, files=files, params=kwargs)
+        params, options = self._split_options(kwargs, "POST")
+        return self._do_verb_request("POST", data=data, files=files, params=params, **options)
 
     def patch(self, data=None, files=None, **kwargs):
-        return self._do_verb_request("PATCH", data=data, files=files, params=kwargs)
+        params, options = self._split_options(kwargs, "PATCH")
+        return self._do_verb_request("PATCH", data=data, files=files, params=params, **options)
 
     def put(self, data=None, files=None, **kwargs):
-        return self._do_verb_request("PUT", data=data, files=files, params=kwargs)
+        params, options = self._split_options(kwargs, "PUT")
+        return self._do_verb_request("PUT", data=data, files=files, params=params, **options)
+
+    def post_and_wait(self, data=None, files=None, scheduler=None, **kwargs):
+        """
+        POSTs and, when the server answers ``202 Accepted`` with the url of a
+        status resource, waits for the operation to complete and returns its
+        result. The status is polled by ``scheduler``, by default the
+        ``PollScheduler`` shared by every resource of the API.
+        """
+        if scheduler is None:
+            scheduler = self._store.get("scheduler")
+        if scheduler is None:
+            scheduler = PollScheduler()
+
+        kwargs["location"] = LocationPolicy(mode="poll", scheduler=scheduler)
+        return self.post(data=data, files=files, **kwargs)
+
+    def subscribe(self, mode=None, last_event_id=None, decode=True, reconnect=None, retry=3.0,
+                  max_retries=None, timeout=None, **kwargs):
+        """
+        Returns an async iterator over what the resource pushes, either
+        Server-Sent Events or newline delimited documents such as NDJSON::
+
+            async for event in api.notifications.subscribe():
+                print(event.event, event.data)
+
+        ``mode`` is ``"sse"`` or ``"ndjson"``, by default it follows the
+        content type of the response. Server-Sent Events are yielded as
+        ``Event`` objects, NDJSON documents as they are decoded. With
+        ``decode=False`` data is left as text, and lines as bytes.
+
+        A stream of events is reopened when it ends or drops, after ``retry``
+        seconds or what the server asked with a ``retry:`` field, sending
+        ``Last-Event-ID`` so it can resume. NDJSON streams can't resume and
+        end with their connection, unless ``reconnect=True`` reopens them,
+        replaying them from the start. ``reconnect=False`` never reopens.
+        ``max_retries`` bounds the reconnections in a row that fail. Only
+        ``connect`` and ``read`` of ``timeout`` apply, a stream has no total
+        duration.
+        """
+        from . import streams
+
+        return streams.subscribe(self, mode=mode, params=kwargs, last_event_id=last_event_id, decode=decode,
+                                 reconnect=reconnect, retry=retry, max_retries=max_retries, timeout=timeout)
+
+    def websocket(self, format=None, id_field="id", heartbeat=None, timeout=None, max_queue=1024, **kwargs):
+        """
+        Returns a ``WebSocket`` to the url of this resource, turned into
+        ws(s), opened on the transport of the API. Await it or use it with
+        ``async with``::
+
+            async with api.rpc.websocket() as ws:
+                result = await ws.call({"method": "add", "params": [1, 2]})
+
+        Messages go through the serializer, ``format`` picking another one
+        than the resource's. Extra keyword arguments are sent as the query.
+        """
+        from . import websockets
+
+        return websockets.WebSocket(self, params=kwargs or None, format=format, id_field=id_field,
+                                    heartbeat=heartbeat, timeout=timeout, max_queue=max_queue)
+
+    def download(self, path, parts=4, min_part_size=1 << 20, retries=3, checksum=None, timeout=None, **kwargs):
+        """
+        Downloads the resource into the file at ``path`` and returns it.
+
+        When a HEAD tells the server takes ranges, up to ``parts`` ranges of
+        at least ``min_part_size`` bytes are fetched concurrently and written
+        at their offsets into a preallocated ``path + ".part"``, and a part
+        that fails is resumed ``retries`` times. The progress is kept in
+        ``path + ".part.json"``, so that calling ``download`` again after a
+        failure resumes it. Otherwise the resource is streamed by a single
+        GET.
+
+        The size is checked against ``Content-Length``, and the content
+        against ``checksum`` given as ``"sha256:<hexdigest>"``.
+        """
+        from . import downloads
+
+        return downloads.Download(self, path, parts=parts, min_part_size=min_part_size, retries=retries,
+                                  checksum=checksum, timeout=timeout, params=kwargs).run()
+
+    def with_middleware(self, *middlewares):
+        """
+        Returns a copy of this resource whose requests also go through
+        ``middlewares``, after the ones of the API.
+        """
+        kwargs = copy_kwargs(self._store)
+        kwargs["pipeline"] = self._store["pipeline"].extended(*middlewares)
+        return self._get_resource(**kwargs)
+
+    def mirror(self, id_field="id", since=None, **options):
+        """
+        Returns a ``Mirror`` of the collection at this resource, a local
+        copy kept up to date by its ``sync`` method::
 
-    def delete(self, **kwargs):
-        resp = self._request("DELETE", params=kwargs)
+            users = api.users.mirror(since="updated_after", reconcile_every=10)
+            await users.sync()
+            users[5]
+        """
+        return Mirror(self, id_field=id_field, since=since, **options)
+
+    async def delete(self, **kwargs):
+        params, options = self._split_options(kwargs, "DELETE")
+        options.pop("raw", None)
+        options.pop("location", None)
+        resp = await self._request("DELETE", params=params, **options)
+        on_status = options.get("on_status")
+        if on_status and resp.status_code in on_status:
+            return on_status[resp.status_code]
         if 200 <= resp.status_code <= 299:
             if resp.status_code == 204:
                 return True
@@ -179,6 +599,9 @@ class Resource(ResourceAttributesMixin, object):
     def url(self):
         url = self._store["base_url"]
 
+        if self._store["append_slash"] == "auto":
+            return self._store["slashes"].apply(url)
+
         if self._store["append_slash"] and not url.endswith("/"):
             url = url + "/"
 
@@ -195,28 +618,95 @@ class API(ResourceAttributesMixin, object):
 
     def __init__(self, base_url=None, auth=None,
                  format=None, append_slash=True,
-                 session=None, serializer=None, raw=False):
+                 session=None, serializer=None, raw=False, timeout=None,
+                 hedge=None, base_urls=None, balancer=None, transport=None,
+                 location=None, scheduler=None, cache=None, idempotency=None, slashes=None,
+                 limiter=None, priorities=None, priority=None, middlewares=None):
         if serializer is None:
             serializer = Serializer(default=format)
 
-        if session is None:
-            session = aiohttp.ClientSession()
+        # Providers authenticate each request, other credentials are handed
+        # to the transport.
+        provider = None
+        if auth is not None and not isinstance(auth, tuple):
+            from .auth import AuthProvider
+            if isinstance(auth, AuthProvider):
+                provider, auth = auth, None
 
-        if auth is not None:
-            session.auth = auth
+        if transport is None:
+            from .transports import AiohttpTransport
+            transport = AiohttpTransport(session=session, auth=auth)
+        elif session is not None or auth is not None:
+            # They would be silently left out, the transport has its own.
+            raise exceptions.ImproperlyConfigured("session and auth other than an AuthProvider belong to "
+                                                  "the transport when one is given")
+
+        if provider is not None:
+            provider.bind(transport)
+
+        if balancer is None and base_urls is not None:
+            balancer = Balancer(base_urls)
+
+        if balancer is not None:
+            base_url = balancer.base_url
+
+        if append_slash == "auto" and slashes is None:
+            slashes = SlashTable()
+
+        if isinstance(cache, str):
+            from .caching import DiskCache
+            cache = DiskCache(cache)
 
         self._store = {
             "base_url": base_url,
             "format": format if format is not None else "json",
             "append_slash": append_slash,
-            "session": session,
+            "transport": transport,
             "serializer": serializer,
             "raw": raw,
+            "timeout": Timeout.coerce(timeout),
+            "hedge": hedge,
+            "balancer": balancer,
+            "location": LocationPolicy.coerce(location),
+            "scheduler": scheduler if scheduler is not None else PollScheduler(),
+            "cache": cache,
+            "idempotency": IdempotencyPolicy.coerce(idempotency),
+            "slashes": slashes,
+            "limiter": ConcurrencyLimiter.coerce(limiter),
+            "priorities": priorities,
+            "priority": priority,
+            "auth": provider,
+            "pipeline": Pipeline(transport, auth=provider, middlewares=middlewares or ()),
         }
 
         # Do some Checks for Required Values
         if self._store.get("base_url") is None:
             raise exceptions.ImproperlyConfigured("base_url is required")
 
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        """
+        Stops the health checks of the balancer and the polls of the
+        scheduler of the API, and closes its transport.
+        """
+        if self._store["balancer"] is not None:
+            self._store["balancer"].close()
+        self._store["scheduler"].close()
+        await self._store["transport"].close()
+
+    def add_middleware(self, *middlewares):
+        """
+        Registers ``middlewares``, async callables taking the ``Request``
+        about to be sent and the handler sending it, and returning the
+        response, for the requests of every resource of the API.
+        """
+        self._store["pipeline"].use(*middlewares)
+        return self
+
     def _get_resource(self, **kwargs):
         return self.resource_class(**kwargs)
@@ -0,0 +1,294 @@
+"""
+Authentication providers.
+
+Static credentials are handed to the transport, but tokens expire and
+signatures change with every request. An ``AuthProvider`` is given each
+request to authenticate before it is sent. ``TokenAuth`` caches its token
+until shortly before it expires, fetching the next one in the background
+ahead of time, and lets concurrent requests answered with 401 share a single
+refresh before being replayed. ``HMACAuth`` signs requests, keeping what can
+be computed once out of the per-request work.
+"""
+import asyncio
+import base64
+import collections
+import hashlib
+import hmac
+import json
+import time
+
+try:
+    from urllib.parse import urlencode, urlsplit
+except ImportError:
+    from urllib import urlencode
+    from urlparse import urlsplit
+
+from . import exceptions
+
+
+class AuthProvider(object):
+    """
+    Authenticates the requests of an `API` given it as ``auth``.
+
+    Subclasses implement ``apply``, returning the headers to send, and may
+    implement ``retry`` to replay the requests answered with 401.
+    """
+
+    transport = None
+
+    def bind(self, transport):
+        """
+        Called with the transport of the API, for providers that need to
+        make requests of their own.
+        """
+        if self.transport is None:
+            self.transport = transport
+
+    async def apply(self, method, url, params, data, headers):
+        """
+        Returns ``headers`` with the authentication of the request added.
+        """
+        raise NotImplementedError()
+
+    async def retry(self, headers):
+        """
+        Called when the request sent with ``headers`` was answered with 401,
+        returns whether to send it again.
+        """
+        return False
+
+    async def identity(self):
+        """
+        Returns a string telling the credentials of the provider apart, which
+        caches use to keep the responses of different users apart. It is only
+        stored hashed. By default it is the provider itself, subclasses
+        return their credentials so that processes using the same ones share
+        cached responses.
+        """
+        return "%s:%s" % (self.__class__.__name__, id(self))
+
+    async def run(self, method, url, params, data, headers, send):
+        """
+        Sends the request through ``send``, a callable taking the headers
+        and returning an awaitable of the response, authenticated.
+        """
+        sent = await self.apply(method, url, params, data, dict(headers or {}))
+        resp = await send(sent)
+        if resp.status_code == 401 and await self.retry(sent):
+            resp = await send(await self.apply(method, url, params, data, dict(headers or {})))
+        return resp
+
+
+class BearerAuth(AuthProvider):
+    """
+    Sends a static token in the ``Authorization`` header.
+    """
+
+    def __init__(self, token, scheme="Bearer"):
+        self.authorization = "%s %s" % (scheme, token)
+
+    async def apply(self, method, url, params, data, headers):
+        headers["authorization"] = self.authorization
+        return headers
+
+    async def identity(self):
+        return self.authorization
+
+
+class TokenAuth(AuthProvider):
+    """
+    Sends a token obtained from ``fetch``, an async callable returning the
+    token and the seconds it is valid for (None if it doesn't expire), or
+    from the ``fetch`` method of a subclass.
+
+    The token is used until ``leeway`` seconds before it expires. Within
+    ``refresh_ahead`` seconds of that, the next one is fetched in the
+    background while requests go on with the current one. A request answered
+    with 401 causes a refresh, a single one for all the requests that were
+    sent with the same token, and is sent once more with the new token.
+    """
+
+    def __init__(self, fetch=None, refresh_ahead=60.0, leeway=5.0, scheme="Bearer", clock=time.monotonic):
+        self._fetch = fetch
+        self.refresh_ahead = refresh_ahead
+        self.leeway = leeway
+        self.scheme = scheme
+        self.clock = clock
+        self.refreshes = 0
+
+        self._authorization = None
+        self._expires = None
+        self._refreshing = None
+
+    async def fetch(self):
+        if self._fetch is None:
+            raise exceptions.ImproperlyConfigured("TokenAuth requires a fetch callable")
+        return await self._fetch()
+
+    async def _refresh(self):
+        token, expires_in = await self.fetch()
+        self._authorization = "%s %s" % (self.scheme, token)
+        self._expires = self.clock() + expires_in if expires_in is not None else None
+        self.refreshes += 1
+
+    def _refreshed(self, task):
+        self._refreshing = None
+        if not task.cancelled():
+            # Retrieved so that a failed background refresh isn't reported,
+            # the next request will fetch again.
+            task.exception()
+
+    def refresh(self):
+        """
+        Starts a refresh of the token unless one is running, and returns it.
+        """
+        if self._refreshing is None:
+            self._refreshing = asyncio.ensure_future(self._refresh())
+            self._refreshing.add_done_callback(self._refreshed)
+        return self._refreshing
+
+    async def authorization(self):
+        """
+        Returns the value of the ``Authorization`` header, refreshing the
+        token as needed.
+        """
+        if self._authorization is None:
+            # Requests that are cancelled don't cancel the refresh the other
+            # ones wait for.
+            await asyncio.shield(self.refresh())
+        elif self._expires is not None:
+            now = self.clock()
+            if now >= self._expires - self.leeway:
+                await asyncio.shield(self.refresh())
+            elif now >= self._expires - self.leeway - self.refresh_ahead:
+                self.refresh()
+        return self._authorization
+
+    async def apply(self, method, url, params, data, headers):
+        headers["authorization"] = await self.authorization()
+        return headers
+
+    async def identity(self):
+        return await self.authorization()
+
+    async def retry(self, headers):
+        if headers.get("authorization") == self._authorization:
+            # The first request turned down with the current token drops it,
+            # the next ones wait for the same refresh.
+            self._authorization = None
+            await asyncio.shield(self.refresh())
+        elif self._refreshing is not None:
+            await asyncio.shield(self._refreshing)
+        return True
+
+
+class OAuth2ClientCredentials(TokenAuth):
+    """
+    Fetches tokens from the OAuth2 ``token_url`` with the client credentials
+    grant, through the transport of the API unless another one is given.
+    """
+
+    def __init__(self, token_url, client_id, client_secret, scope=None, transport=None, **options):
+        super(OAuth2ClientCredentials, self).__init__(**options)
+        self.token_url = token_url
+        self.scope = scope
+        self.transport = transport
+
+        credentials = ("%s:%s" % (client_id, client_secret)).encode("utf-8")
+        self._headers = {
+            "accept": "application/json",
+            "content-type": "application/x-www-form-urlencoded",
+            "authorization": "Basic " + base64.b64encode(credentials).decode("ascii"),
+        }
+
+    async def identity(self):
+        # The client credentials, unlike the tokens, outlive a refresh.
+        return "%s %s %r" % (self.token_url, self._headers["authorization"], self.scope)
+
+    async def fetch(self):
+        form = {"grant_type": "client_credentials"}
+        if self.scope is not None:
+            form["scope"] = self.scope if isinstance(self.scope, str) else " ".join(self.scope)
+
+        resp = await self.transport.request("POST", self.token_url, data=urlencode(form),
+                                            headers=dict(self._headers))
+        if 400 <= resp.status_code <= 499:
+            raise exceptions.HttpClientError(response=resp, url=self.token_url)
+        elif resp.status_code >= 500:
+            raise exceptions.HttpServerError(response=resp, url=self.token_url)
+
+        content = resp.content
+        token = json.loads(content.decode("utf-8") if isinstance(content, bytes) else content)
+        return token["access_token"], token.get("expires_in")
+
+
+class HMACAuth(AuthProvider):
+    """
+    Signs each request with an HMAC of its method, path and query, date and
+    body digest, sent as ``Authorization: HMAC keyId="...",signature="..."``
+    along the ``Date`` and ``X-Content-SHA256`` headers.
+
+    The key is only hashed once, the date is formatted once a second, and
+    the digests of the last ``cache_size`` bodies are kept for the requests
+    sent again by retries, hedging or a replay.
+    """
+
+    def __init__(self, key_id, secret, digestmod="sha256", cache_size=16):
+        if isinstance(secret, str):
+            secret = secret.encode("utf-8")
+        self.key_id = key_id
+        self.cache_size = cache_size
+
+        self._mac = hmac.new(secret, digestmod=digestmod)
+        self._date = (None, None)
+        self._digests = collections.OrderedDict()
+
+    def _now(self):
+        second = int(time.time())
+        if self._date[0] != second:
+            from email.utils import formatdate
+            self._date = (second, formatdate(second, usegmt=True))
+        return self._date[1]
+
+    def _body_digest(self, data):
+        if data is None:
+            data = b""
+        key = id(data)
+        cached = self._digests.get(key)
+        # The body is kept along its digest, so the id can't be reused.
+        if cached is not None and cached[0] is data:
+            self._digests.move_to_end(key)
+            return cached[1]
+
+        body = data.encode("utf-8") if isinstance(data, str) else data
+        digest = base64.b64encode(hashlib.sha256(body).digest()).decode("ascii")
+        self._digests[key] = (data, digest)
+        if len(self._digests) > self.cache_size:
+            self._digests.popitem(last=False)
+        return digest
+
+    def sign(self, message):
+        mac = self._mac.copy()
+        mac.update(message.encode("utf-8"))
+        return base64.b64encode(mac.digest()).decode("ascii")
+
+    async def apply(self, method, url, params, data, headers):
+        parts = urlsplit(url)
+        target = parts.path or "/"
+        query = "&".join(filter(None, [parts.query, urlencode(sorted(params.items())) if params else ""]))
+        if query:
+            target += "?" + query
+
+        date = self._now()
+        digest = self._body_digest(data if isinstance(data, (bytes, str)) else None)
+        signature = self.sign("\n".join([method, target, date, digest]))
+
+        headers["date"] = date
+        headers["x-content-sha256"] = digest
+        headers["authorization"] = 'HMAC keyId="%s",signature="%s"' % (self.key_id, signature)
+        return headers
+
+    async def identity(self):
+        # Signing a constant ties the identity to the secret, not only the
+        # key id.
+        return "%s %s" % (self.key_id, self.sign("identity"))
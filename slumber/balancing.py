@@ -0,0 +1,225 @@
+"""
+Client-side load balancing across several replicas of an API.
+
+A ``Balancer`` picks one of its ``Endpoint`` for each request, following a
+pluggable strategy, and keeps track of their health: an endpoint that keeps
+failing is ejected for a while, and optional active health checks bring it
+back once it answers again.
+"""
+import asyncio
+import itertools
+import random
+import time
+
+from . import exceptions
+from .utils import url_join
+
+
+class Endpoint(object):
+    """
+    One replica of the API, with the statistics used to balance load on it.
+    """
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip("/")
+        self.outstanding = 0
+        self.ewma = 0.0
+        self.samples = 0
+        self.failures = 0
+        self.ejected_until = 0.0
+
+    def __repr__(self):
+        return "<Endpoint %s>" % self.base_url
+
+    def is_healthy(self, now=None):
+        return self.ejected_until <= (time.monotonic() if now is None else now)
+
+    def rebase(self, url, base_url):
+        """
+        Moves ``url``, built on top of ``base_url``, to this endpoint.
+        """
+        if url.startswith(base_url):
+            return self.base_url + url[len(base_url):]
+        return url
+
+
+class RoundRobin(object):
+    """
+    Cycles through the endpoints in order.
+    """
+
+    def __init__(self):
+        self._counter = itertools.count()
+
+    def choose(self, endpoints):
+        return endpoints[next(self._counter) % len(endpoints)]
+
+
+class LeastOutstanding(object):
+    """
+    Picks the endpoint with the fewest requests in flight.
+    """
+
+    def choose(self, endpoints):
+        return min(endpoints, key=lambda endpoint: endpoint.outstanding)
+
+
+class PowerOfTwoChoices(object):
+    """
+    Picks two endpoints at random and keeps the one with the lowest expected
+    latency, its latency EWMA weighted by the requests in flight. This avoids
+    the herd effect of always picking the best endpoint.
+    """
+
+    def __init__(self, random=random):
+        self.random = random
+
+    def cost(self, endpoint):
+        return endpoint.ewma * (endpoint.outstanding + 1)
+
+    def choose(self, endpoints):
+        if len(endpoints) == 1:
+            return endpoints[0]
+
+        first, second = self.random.sample(endpoints, 2)
+        return first if self.cost(first) <= self.cost(second) else second
+
+
+_STRATEGIES = {
+    "round_robin": RoundRobin,
+    "least_outstanding": LeastOutstanding,
+    "p2c": PowerOfTwoChoices,
+}
+
+
+class Balancer(object):
+    """
+    Spreads requests over ``base_urls``.
+
+    ``strategy`` is one of ``"round_robin"``, ``"least_outstanding"`` and
+    ``"p2c"``, or any object with a ``choose(endpoints)`` method.
+
+    An endpoint failing ``max_failures`` times in a row, by raising or
+    answering with a server error, is ejected for ``ejection_time`` seconds.
+    If ``health_check_path`` is given, every endpoint is also probed with a
+    GET on it every ``health_check_interval`` seconds while requests are being
+    made, ejecting the endpoints that fail and restoring the ones that answer.
+    """
+
+    def __init__(self, base_urls, strategy="round_robin", max_failures=5,
+                 ejection_time=30.0, decay=0.3, health_check_path=None,
+                 health_check_interval=10.0):
+        if not base_urls:
+            raise exceptions.ImproperlyConfigured("base_urls must not be empty")
+
+        if isinstance(strategy, str):
+            if strategy not in _STRATEGIES:
+                raise exceptions.ImproperlyConfigured("%s is not an available strategy" % strategy)
+            strategy = _STRATEGIES[strategy]()
+
+        self.endpoints = [Endpoint(base_url) for base_url in base_urls]
+        self.base_url = self.endpoints[0].base_url
+        self.strategy = strategy
+        self.max_failures = max_failures
+        self.ejection_time = ejection_time
+        self.decay = decay
+        self.health_check_path = health_check_path
+        self.health_check_interval = health_check_interval
+
+        self._health_check_task = None
+
+    def choose(self):
+        """
+        Returns the endpoint for the next request. When every endpoint is
+        ejected all of them are considered, failing open.
+        """
+        now = time.monotonic()
+        endpoints = [endpoint for endpoint in self.endpoints if endpoint.is_healthy(now)]
+        return self.strategy.choose(endpoints or self.endpoints)
+
+    def record(self, endpoint, latency, failed):
+        if endpoint.samples:
+            endpoint.ewma = self.decay * latency + (1 - self.decay) * endpoint.ewma
+        else:
+            endpoint.ewma = latency
+        endpoint.samples += 1
+
+        if not failed:
+            endpoint.failures = 0
+            return
+
+        endpoint.failures += 1
+        if endpoint.failures >= self.max_failures:
+            self.eject(endpoint)
+
+    def eject(self, endpoint):
+        endpoint.ejected_until = time.monotonic() + self.ejection_time
+
+    def restore(self, endpoint):
+        endpoint.failures = 0
+        endpoint.ejected_until = 0.0
+
+    async def run(self, url, send):
+        """
+        Sends ``url`` to the chosen endpoint. ``send`` is called with the
+        rebased url and returns an awaitable of the response.
+        """
+        endpoint = self.choose()
+        endpoint.outstanding += 1
+        start = time.monotonic()
+
+        try:
+            resp = await send(endpoint.rebase(url, self.base_url))
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.record(endpoint, time.monotonic() - start, failed=True)
+            raise
+        finally:
+            endpoint.outstanding -= 1
+
+        self.record(endpoint, time.monotonic() - start, failed=resp.status_code >= 500)
+        return resp
+
+    def ensure_health_checks(self, transport):
+        """
+        Starts the health checks on the running loop if they are configured
+        and not running yet.
+        """
+        if self.health_check_path is None:
+            return
+
+        if self._health_check_task is None or self._health_check_task.done():
+            self._health_check_task = asyncio.ensure_future(self._health_checks(transport))
+
+    def close(self):
+        if self._health_check_task is not None:
+            self._health_check_task.cancel()
+            self._health_check_task = None
+
+    async def check(self, transport, endpoint):
+        """
+        Probes ``endpoint`` once, ejecting or restoring it.
+        """
+        url = url_join(endpoint.base_url, self.health_check_path.lstrip("/"))
+
+        try:
+            resp = await transport.request("GET", url)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            healthy = False
+        else:
+            healthy = 200 <= resp.status_code <= 299
+
+        if healthy:
+            self.restore(endpoint)
+        else:
+            self.eject(endpoint)
+
+        return healthy
+
+    async def _health_checks(self, transport):
+        while True:
+            await asyncio.gather(*[self.check(transport, endpoint) for endpoint in self.endpoints])
+            await asyncio.sleep(self.health_check_interval)
@@ -0,0 +1,376 @@
+"""
+A persistent cache of GET responses on disk.
+
+Batch jobs re-reading the same large resources on every run can keep them in
+a ``DiskCache``: bodies are stored once in a content-addressed directory and
+revalidated with ``ETag`` and ``Last-Modified``, so an unchanged resource
+costs a ``304 Not Modified`` instead of a download.
+
+Every file is written to a temporary name and renamed into place, which is
+atomic, so several processes on the host can share a cache directory: a
+reader sees a whole entry or none at all. Responses are keyed by the
+credentials of the request and the headers they vary on, so processes with
+different credentials never see each other's responses.
+"""
+import asyncio
+import email.utils
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+try:
+    from urllib.parse import urlencode
+except ImportError:
+    from urllib import urlencode
+
+from multidict import CIMultiDict
+
+from .transports import Response
+
+# Headers kept with a cached body.
+_STORED_HEADERS = ("content-type", "content-encoding", "etag", "last-modified", "cache-control", "expires")
+
+
+def _directives(value):
+    directives = {}
+    for part in (value or "").split(","):
+        name, _, argument = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = argument.strip('"')
+    return directives
+
+
+def _vary(resp):
+    return sorted(set(name.strip().lower() for name in (resp.headers.get("vary") or "").split(",") if name.strip()))
+
+
+class CacheEntry(object):
+    """
+    What the cache knows about a url: the headers of the response, the digest
+    of its body and when it was stored.
+    """
+
+    __slots__ = ("url", "status_code", "headers", "digest", "stored_at")
+
+    def __init__(self, url, status_code, headers, digest, stored_at):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.digest = digest
+        self.stored_at = stored_at
+
+    def max_age(self):
+        """
+        Returns how long the response is fresh for, according to its
+        ``Cache-Control`` or ``Expires`` header, or None.
+        """
+        directives = _directives(self.headers.get("cache-control"))
+        if "no-cache" in directives:
+            return 0
+        if directives.get("max-age", "").isdigit():
+            return int(directives["max-age"])
+
+        expires = self.headers.get("expires")
+        if expires:
+            try:
+                return email.utils.parsedate_to_datetime(expires).timestamp() - self.stored_at
+            except (TypeError, ValueError):
+                return 0
+
+        return None
+
+    def validators(self):
+        """
+        Returns the headers making a conditional request for this entry.
+        """
+        headers = {}
+        if self.headers.get("etag"):
+            headers["if-none-match"] = self.headers["etag"]
+        if self.headers.get("last-modified"):
+            headers["if-modified-since"] = self.headers["last-modified"]
+        return headers
+
+
+class DiskCache(object):
+    """
+    Caches GET responses under ``directory``.
+
+    A response is served without a request while it is fresh, for
+    ``max_age`` seconds when given or else what its ``Cache-Control`` or
+    ``Expires`` headers allow. Once stale it is revalidated with a
+    conditional request when it has an ``ETag`` or ``Last-Modified``.
+
+    Bodies live in ``objects/`` named by their sha256, so identical bodies
+    served at different urls are stored once, and the entry of each url in
+    ``index/``. Files are read and written in a thread so that large bodies
+    don't block the event loop.
+
+    Bodies no entry refers to anymore are removed by ``collect``, which runs
+    every ``collect_every`` replaced bodies. With ``max_size``, in bytes, it
+    also runs whenever as much as an eighth of it was written, and drops the
+    entries stored the longest ago until the bodies fit.
+    """
+
+    # Bodies written less than this many seconds ago are not collected, their
+    # entry may be about to be saved by another process.
+    grace = 60
+
+    def __init__(self, directory, max_age=None, max_size=None, collect_every=64):
+        self.directory = directory
+        self.max_age = max_age
+        self.max_size = max_size
+        self.collect_every = collect_every
+
+        self._written = 0
+        self._replaced = 0
+
+        self.hits = 0
+        self.revalidations = 0
+        self.misses = 0
+
+        os.makedirs(os.path.join(directory, "objects"), exist_ok=True)
+        os.makedirs(os.path.join(directory, "index"), exist_ok=True)
+
+    def key(self, url, params=None, headers=None, identity=None):
+        """
+        Returns the key of a request, its url with the query sorted, the
+        accepted content type and a hash of its credentials, its
+        ``Authorization`` header and the ``identity`` of the auth of the API.
+        """
+        headers = CIMultiDict(headers or {})
+        query = urlencode(sorted(params.items()), doseq=True) if params else ""
+        credentials = ""
+        if identity is not None or headers.get("authorization"):
+            credentials = "%s\n%s" % (identity or "", headers.get("authorization", ""))
+            credentials = hashlib.sha256(credentials.encode("utf-8")).hexdigest()
+        return "%s?%s|%s|%s" % (url, query, headers.get("accept", ""), credentials)
+
+    def _variant(self, key, vary, headers):
+        # The values of the headers a response varies on select its entry.
+        headers = CIMultiDict(headers or {})
+        return json.dumps([key] + [[name, headers.get(name, "")] for name in vary])
+
+    def _index_path(self, key):
+        return os.path.join(self.directory, "index", hashlib.sha256(key.encode("utf-8")).hexdigest())
+
+    def _object_path(self, digest):
+        return os.path.join(self.directory, "objects", digest[:2], digest)
+
+    def _write(self, path, content):
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(content)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def _read_index(self, path):
+        try:
+            with open(path, "rb") as f:
+                return json.loads(f.read().decode("utf-8"))
+        except (IOError, ValueError):
+            return None
+
+    def lookup(self, key, headers=None):
+        """
+        Returns the key of the entry a request selects, as the responses to
+        ``key`` may vary on its ``headers``, and that ``CacheEntry`` or None.
+        """
+        data = self._read_index(self._index_path(key))
+        if data is not None and data.get("key") == key and "vary" in data:
+            key = self._variant(key, data["vary"], headers)
+        return key, self.load(key)
+
+    def load(self, key):
+        """
+        Returns the ``CacheEntry`` of ``key``, or None.
+        """
+        data = self._read_index(self._index_path(key))
+
+        # A body removed by clear() or collect() in another process is a
+        # miss.
+        if data is None or data.get("key") != key or "digest" not in data or \
+                not os.path.exists(self._object_path(data["digest"])):
+            return None
+
+        return CacheEntry(data["url"], data["status_code"], CIMultiDict(data["headers"]), data["digest"],
+                          data["stored_at"])
+
+    def read(self, entry):
+        """
+        Returns the body of ``entry``, or None if it went missing.
+        """
+        try:
+            with open(self._object_path(entry.digest), "rb") as f:
+                return f.read()
+        except IOError:
+            return None
+
+    def store(self, key, resp, headers=None):
+        """
+        Stores ``resp``, the response to a request with ``headers``, as the
+        entry of ``key`` and returns it.
+        """
+        vary = _vary(resp)
+        if vary:
+            self._write(self._index_path(key), json.dumps({"key": key, "vary": vary}).encode("utf-8"))
+            key = self._variant(key, vary, headers)
+
+        content = resp.content or b""
+        digest = hashlib.sha256(content).hexdigest()
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            self._write(path, content)
+            self._written += len(content)
+
+        previous = self._read_index(self._index_path(key))
+        if previous is not None and previous.get("digest") not in (None, digest):
+            self._replaced += 1
+
+        stored = [(name, resp.headers[name]) for name in _STORED_HEADERS if resp.headers.get(name)]
+        entry = CacheEntry(resp.url, resp.status_code, CIMultiDict(stored), digest, time.time())
+        self._save(key, entry)
+
+        if self._replaced >= self.collect_every or \
+                (self.max_size is not None and self._written > self.max_size // 8):
+            self.collect()
+        return entry
+
+    def refresh(self, key, entry, resp):
+        """
+        Renews ``entry`` after a ``304 Not Modified``, taking the updated
+        headers of ``resp``.
+        """
+        for name in _STORED_HEADERS:
+            if resp.headers.get(name):
+                entry.headers[name] = resp.headers[name]
+        entry.stored_at = time.time()
+        self._save(key, entry)
+        return entry
+
+    def _save(self, key, entry):
+        data = {
+            "key": key,
+            "url": entry.url,
+            "status_code": entry.status_code,
+            "headers": list(entry.headers.items()),
+            "digest": entry.digest,
+            "stored_at": entry.stored_at,
+        }
+        self._write(self._index_path(key), json.dumps(data).encode("utf-8"))
+
+    def is_fresh(self, entry):
+        max_age = self.max_age if self.max_age is not None else entry.max_age()
+        return max_age is not None and time.time() - entry.stored_at < max_age
+
+    def is_storable(self, resp):
+        if resp.status_code != 200 or "*" in _vary(resp):
+            return False
+        directives = _directives(resp.headers.get("cache-control"))
+        return "no-store" not in directives and "private" not in directives
+
+    def clear(self):
+        """
+        Removes every entry and body.
+        """
+        for name in ("index", "objects"):
+            for root, _, files in os.walk(os.path.join(self.directory, name)):
+                for filename in files:
+                    try:
+                        os.unlink(os.path.join(root, filename))
+                    except OSError:
+                        pass
+
+    def collect(self):
+        """
+        Removes the bodies no entry refers to and, with ``max_size``, the
+        entries stored the longest ago until the bodies fit. Returns the
+        number of bytes freed.
+        """
+        self._written = 0
+        self._replaced = 0
+
+        entries = []
+        references = {}
+        for root, _, files in os.walk(os.path.join(self.directory, "index")):
+            for filename in files:
+                path = os.path.join(root, filename)
+                data = self._read_index(path)
+                if data is not None and "digest" in data:
+                    entries.append((data.get("stored_at", 0), path, data["digest"]))
+                    references[data["digest"]] = references.get(data["digest"], 0) + 1
+
+        freed = 0
+        sizes = {}
+        now = time.time()
+        for root, _, files in os.walk(os.path.join(self.directory, "objects")):
+            for filename in files:
+                path = os.path.join(root, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                if filename in references:
+                    sizes[filename] = stat.st_size
+                elif not filename.startswith(".tmp-") and now - stat.st_mtime > self.grace:
+                    freed += self._unlink(path, stat.st_size)
+
+        size = sum(sizes.values())
+        if self.max_size is not None and size > self.max_size:
+            for stored_at, path, digest in sorted(entries):
+                if size <= self.max_size:
+                    break
+                self._unlink(path)
+                references[digest] -= 1
+                if references[digest] == 0:
+                    freed += self._unlink(self._object_path(digest), sizes[digest])
+                    size -= sizes[digest]
+
+        return freed
+
+    def _unlink(self, path, size=0):
+        try:
+            os.unlink(path)
+        except OSError:
+            return 0
+        return size
+
+    async def fetch(self, url, params, headers, send, identity=None):
+        """
+        Returns the response of a GET on ``url``, from the cache when it is
+        fresh or still valid. ``send`` is called with the request headers and
+        returns an awaitable of the response. ``identity`` tells the
+        credentials the request is sent with apart.
+        """
+        loop = asyncio.get_event_loop()
+        key = self.key(url, params, headers, identity)
+
+        variant, entry = await loop.run_in_executor(None, self.lookup, key, headers)
+        if entry is not None and self.is_fresh(entry):
+            content = await loop.run_in_executor(None, self.read, entry)
+            if content is not None:
+                self.hits += 1
+                return Response(entry.status_code, entry.headers, content, url=entry.url)
+
+        resp = await send(dict(headers, **entry.validators()) if entry is not None else headers)
+
+        if resp.status_code == 304 and entry is not None:
+            content = await loop.run_in_executor(None, self.read, entry)
+            if content is not None:
+                self.revalidations += 1
+                entry = await loop.run_in_executor(None, self.refresh, variant, entry, resp)
+                return Response(entry.status_code, entry.headers, content, url=entry.url, raw=resp.raw)
+
+            # The body went away since the entry was loaded.
+            resp = await send(headers)
+
+        self.misses += 1
+        if self.is_storable(resp):
+            await loop.run_in_executor(None, self.store, key, resp, headers)
+        return resp
@@ -0,0 +1,299 @@
+"""
+Columnar decoding of list endpoints.
+
+A list endpoint returning hundreds of thousands of homogeneous records is
+decoded into as many dicts, which take far more memory than the values they
+hold. ``Columnar`` decodes the records into one array per field instead,
+``array.array``, NumPy arrays or an Arrow table, growing the arrays page by
+page so that only the page being decoded is ever held as dicts.
+"""
+import array
+
+from . import exceptions
+from . import paging
+
+# The array.array typecode of the kinds stored in arrays, the other kinds
+# are stored in lists.
+_TYPECODES = {
+    "int64": "q",
+    "float64": "d",
+    "bool": "b",
+}
+
+_KINDS = {
+    bool: "bool",
+    int: "int64",
+    float: "float64",
+    str: "str",
+}
+
+_ALIASES = {
+    bool: "bool",
+    int: "int64",
+    float: "float64",
+    str: "str",
+    object: "object",
+}
+
+_NAN = float("nan")
+
+
+def _merge(kind, other):
+    """
+    Returns the narrowest kind holding the values of both kinds.
+    """
+    if kind is None or kind == other:
+        return other
+    if other is None:
+        return kind
+    if {kind, other} == {"int64", "float64"}:
+        return "float64"
+    return "object"
+
+
+def _infer(values):
+    """
+    Returns the kind of ``values`` and whether some are None.
+    """
+    kind = None
+    null = False
+    for value in values:
+        if value is None:
+            null = True
+        else:
+            kind = _merge(kind, _KINDS.get(type(value), "object"))
+    return kind, null
+
+
+def _nullable(kind):
+    """
+    Returns the kind holding both the values of ``kind`` and None.
+    """
+    if kind == "int64":
+        return "float64"
+    if kind == "bool":
+        return "object"
+    return kind
+
+
+def _new(kind, values=()):
+    if kind in _TYPECODES:
+        return array.array(_TYPECODES[kind], values)
+    return list(values)
+
+
+def _convert(data, old, kind):
+    if old == "bool":
+        data = [bool(value) for value in data]
+    if kind == "float64":
+        data = [_NAN if value is None else value for value in data]
+    return _new(kind, data)
+
+
+class _Column(object):
+
+    __slots__ = ("name", "kind", "declared", "null", "data")
+
+    def __init__(self, name, kind=None, declared=False, length=0):
+        self.name = name
+        self.kind = kind
+        self.declared = declared
+        self.null = False
+        self.data = _new(kind)
+        if length:
+            # A field first seen after some records, missing from them.
+            self.extend([None] * length)
+
+    def _widen(self, kind):
+        if self.declared:
+            raise exceptions.SchemaError("The values of %s don't fit the declared %s" % (self.name, self.kind))
+        self.data = _convert(self.data, self.kind, kind)
+        self.kind = kind
+
+    def extend(self, values):
+        kind, null = _infer(values)
+        self.null = self.null or null
+        kind = _merge(self.kind, kind)
+        if self.null and kind is not None:
+            kind = _nullable(kind)
+
+        if kind != self.kind:
+            self._widen(kind)
+
+        if null and self.kind == "float64":
+            values = [_NAN if value is None else value for value in values]
+        length = len(self.data)
+        try:
+            self.data.extend(values)
+        except OverflowError:
+            # Integers beyond 64 bits.
+            del self.data[length:]
+            self._widen("object")
+            self.data.extend(values)
+
+
+class ColumnBuilder(object):
+    """
+    Accumulates records into columns, one page after the other.
+    """
+
+    def __init__(self, schema=None):
+        self.length = 0
+        self._schema = schema
+        self._columns = {}
+        if schema is not None:
+            for name, kind in schema.items():
+                self._columns[name] = _Column(name, kind, declared=True)
+
+    def extend(self, records):
+        if not records:
+            return
+
+        if self._schema is None:
+            # Fields first seen in this page become new columns.
+            seen = {}
+            for record in records:
+                for name in record:
+                    seen[name] = None
+            for name in seen:
+                if name not in self._columns:
+                    self._columns[name] = _Column(name, length=self.length)
+
+        for name, column in self._columns.items():
+            column.extend([record.get(name) for record in records])
+        self.length += len(records)
+
+    def columns(self):
+        return dict((name, column.data) for name, column in self._columns.items())
+
+    def kinds(self):
+        return dict((name, column.kind or "object") for name, column in self._columns.items())
+
+
+def _as_numpy(builder):
+    import numpy
+
+    columns = {}
+    for name, kind in builder.kinds().items():
+        data = builder._columns[name].data
+        if kind in _TYPECODES:
+            # Shares the memory of the array.
+            columns[name] = numpy.frombuffer(data, dtype={"int64": numpy.int64, "float64": numpy.float64,
+                                                          "bool": numpy.bool_}[kind])
+        else:
+            columns[name] = numpy.array(data, dtype=object if kind == "object" else None)
+    return columns
+
+
+def _as_arrow(builder):
+    import pyarrow
+
+    types = {"int64": pyarrow.int64(), "float64": pyarrow.float64(), "bool": pyarrow.int8()}
+    columns = {}
+    for name, kind in builder.kinds().items():
+        data = builder._columns[name].data
+        if kind in _TYPECODES:
+            column = pyarrow.Array.from_buffers(types[kind], len(data), [None, pyarrow.py_buffer(data)])
+            columns[name] = column.cast(pyarrow.bool_()) if kind == "bool" else column
+        else:
+            columns[name] = pyarrow.array(data)
+    return pyarrow.table(columns)
+
+
+_BACKENDS = {
+    "array": ColumnBuilder.columns,
+    "numpy": _as_numpy,
+    "arrow": _as_arrow,
+}
+
+
+def _default_backend():
+    import importlib.util
+    return "numpy" if importlib.util.find_spec("numpy") is not None else "array"
+
+
+class Columnar(object):
+    """
+    Decodes list responses into columns instead of dicts::
+
+        columns = await api.events.get(columnar=True)
+        columns["duration"]   # array('d', [...])
+
+    ``schema`` maps the fields to keep to their kind, ``"int64"``,
+    ``"float64"``, ``"bool"``, ``"str"`` or ``"object"`` (or ``int``,
+    ``float``, ``bool``, ``str`` and ``object``); without one the kinds
+    are inferred from the values, an integer field with nulls becoming
+    ``float64`` with NaNs, and a field mixing kinds ``object``.
+
+    ``records`` is the key holding the list of records when the body is an
+    object. ``next`` is the key holding the url of the next page, or
+    ``"link"`` to follow the ``Link`` header, pages being fetched and
+    appended to the columns until there are none left or ``max_pages`` were
+    fetched.
+
+    ``backend`` is ``"array"`` for a dict of ``array.array`` (and lists for
+    strings and objects), ``"numpy"`` for a dict of NumPy arrays, or
+    ``"arrow"`` for a ``pyarrow.Table``. It is NumPy by default when it is
+    installed.
+    """
+
+    backends = tuple(_BACKENDS)
+
+    def __init__(self, schema=None, records=None, next=None, backend=None, max_pages=None):
+        if schema is not None:
+            schema = dict((name, _ALIASES.get(kind, kind)) for name, kind in schema.items())
+            for name, kind in schema.items():
+                if kind not in ("int64", "float64", "bool", "str", "object"):
+                    raise exceptions.ImproperlyConfigured("%s is not a column kind" % (kind,))
+        if backend is not None and backend not in _BACKENDS:
+            raise exceptions.ImproperlyConfigured("%s is not a columnar backend" % backend)
+
+        self.schema = schema
+        self.records = records
+        self.next = next
+        self.backend = backend
+        self.max_pages = max_pages
+
+    @classmethod
+    def coerce(cls, value):
+        """
+        Accepts a Columnar, True for the defaults, a backend name or None.
+        """
+        if value is None or value is False:
+            return None
+        if value is True:
+            return cls()
+        if isinstance(value, str):
+            return cls(backend=value)
+        return value
+
+    async def fetch(self, resource, params, options):
+        """
+        GETs ``resource`` and the pages following it, returning their
+        records as columns.
+        """
+        builder = ColumnBuilder(self.schema)
+        options = dict(options, raw=True)
+        pages = 0
+
+        while True:
+            result = await resource.get(params=params, **options)
+            if not isinstance(result, tuple):
+                # A value given with on_status or not_found.
+                return result
+            resp, body = result
+            # Only the names unpacked hold the page from now on.
+            del result
+            pages += 1
+            builder.extend(paging.records(body, self.records))
+
+            url = paging.next_url(resp, body, resource.url(), self.next)
+            # The dicts and the bytes of the page are released before the
+            # next one is fetched.
+            del resp, body
+            if url is None or (self.max_pages is not None and pages >= self.max_pages):
+                break
+            resource = resource(url_override=url)
+            params = {}
+
+        return _BACKENDS[self.backend or _default_backend()](builder)
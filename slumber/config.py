@@ -0,0 +1,94 @@
+"""
+Configuration of an `API`, kept apart from its runtime state.
+
+An `API` holds live objects: a transport with its connection pool, policies
+gathering statistics, a poll scheduler. An ``APIConfig`` only holds the
+arguments it is built from, is frozen and can be pickled, so it is cheap to
+keep around, to build many `API` from and to ship to other processes.
+"""
+from . import exceptions
+
+_arguments = None
+
+
+def _api_arguments():
+    global _arguments
+    if _arguments is None:
+        import inspect
+        from . import API
+        _arguments = frozenset(list(inspect.signature(API.__init__).parameters)[1:])
+    return _arguments
+
+
+def _restore(options):
+    return APIConfig(**options)
+
+
+class APIConfig(object):
+    """
+    The arguments of an `API`::
+
+        config = slumber.APIConfig("https://example.com/api/", timeout=10, append_slash=False)
+        api = config.build()
+
+    Options are read as attributes, unset ones are None. ``replace`` returns
+    a copy with some options changed. A ``session`` is runtime state and
+    can't be part of a config; the `API` creates its own on its first
+    request.
+    """
+
+    __slots__ = ("_options",)
+
+    def __init__(self, base_url=None, **options):
+        if base_url is not None:
+            options["base_url"] = base_url
+
+        unknown = set(options) - _api_arguments()
+        if unknown:
+            raise exceptions.ImproperlyConfigured("%s not API arguments" % ", ".join(sorted(unknown)))
+
+        if "session" in options:
+            raise exceptions.ImproperlyConfigured("A session can't be part of an APIConfig")
+
+        object.__setattr__(self, "_options", options)
+
+    def __getattr__(self, name):
+        if name in _api_arguments():
+            return self._options.get(name)
+        raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("APIConfig is frozen")
+
+    def __delattr__(self, name):
+        raise AttributeError("APIConfig is frozen")
+
+    def __reduce__(self):
+        return (_restore, (self._options,))
+
+    def __eq__(self, other):
+        if not isinstance(other, APIConfig):
+            return NotImplemented
+        return self._options == other._options
+
+    __hash__ = None
+
+    def __repr__(self):
+        options = ", ".join("%s=%r" % item for item in sorted(self._options.items()))
+        return "APIConfig(%s)" % options
+
+    def as_dict(self):
+        return dict(self._options)
+
+    def replace(self, **changes):
+        options = dict(self._options)
+        options.update(changes)
+        return APIConfig(**options)
+
+    def build(self):
+        """
+        Returns a new `API`. Its serializer is created here, cheaply, and its
+        transport opens a session on the first request.
+        """
+        from . import API
+        return API(**self._options)
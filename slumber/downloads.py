@@ -0,0 +1,286 @@
+"""
+Parallel ranged downloads.
+
+A large binary resource downloaded through a single GET goes as fast as a
+single connection, and starts over from zero when it drops. When the server
+takes ranges, ``Resource.download()`` splits the resource into parts fetched
+concurrently and written at their offsets into a preallocated file, keeping
+track of the progress of each part next to it so that an interrupted
+download resumes where it stopped.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+from . import exceptions
+from . import timeouts
+from .timeouts import Timeout
+
+# Chunks are gathered up to this size before being written to the file.
+_WRITE_SIZE = 1 << 20
+
+# The progress is saved each time this much more was written.
+_SAVE_EVERY = 16 << 20
+
+_seek_lock = threading.Lock()
+
+
+def _write_at(fd, data, offset):
+    if hasattr(os, "pwrite"):
+        view = memoryview(data)
+        while view:
+            written = os.pwrite(fd, view, offset)
+            view = view[written:]
+            offset += written
+    else:
+        with _seek_lock:
+            os.lseek(fd, offset, os.SEEK_SET)
+            os.write(fd, data)
+
+
+def _preallocate(path, size):
+    with open(path, "wb") as f:
+        f.truncate(size)
+        if hasattr(os, "posix_fallocate"):
+            try:
+                os.posix_fallocate(f.fileno(), 0, size)
+            except OSError:
+                # Not supported by the file system, the file stays sparse.
+                pass
+
+
+def _digest(path, algorithm):
+    digest = hashlib.new(algorithm)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_WRITE_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _save(path, state):
+    # Parts save the progress concurrently, each from its own file.
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=".download-")
+    with os.fdopen(fd, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+
+
+def _load(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (IOError, OSError, ValueError):
+        return None
+
+
+def _remove(*paths):
+    for path in paths:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+class _Part(object):
+
+    __slots__ = ("start", "end", "done")
+
+    def __init__(self, start, end, done=0):
+        self.start = start
+        self.end = end
+        self.done = done
+
+    @property
+    def remaining(self):
+        return self.end - self.start + 1 - self.done
+
+
+class Download(object):
+    """
+    Downloads ``resource`` into ``path``, see ``Resource.download``.
+    """
+
+    def __init__(self, resource, path, parts=4, min_part_size=1 << 20, retries=3, checksum=None,
+                 timeout=None, params=None):
+        self.resource = resource
+        self.path = path
+        self.parts = parts
+        self.min_part_size = min_part_size
+        self.retries = retries
+        self.params = params or {}
+
+        if checksum is not None:
+            algorithm, _, expected = checksum.partition(":")
+            if not expected or algorithm not in hashlib.algorithms_available:
+                raise exceptions.ImproperlyConfigured("The checksum must be given as algorithm:hexdigest")
+            checksum = (algorithm, expected.lower())
+        self.checksum = checksum
+
+        self.timeout = (timeouts.resolve(resource._store.get("timeout"), timeout) or Timeout()).without_total()
+
+        self.url = resource.url()
+        self.part_path = path + ".part"
+        self.state_path = path + ".part.json"
+        self._fd = None
+        self._writes = set()
+        self._unsaved = 0
+
+    async def _executor(self, function, *args):
+        return await asyncio.get_event_loop().run_in_executor(None, function, *args)
+
+    async def _probe(self):
+        result = await self.resource.head(raw=True, on_status={405: None, 501: None}, **self.params)
+        if result is None:
+            return None, False, None
+
+        resp = result[0]
+        length = resp.headers.get("content-length")
+        ranges = "bytes" in (resp.headers.get("accept-ranges") or "").lower()
+        return (int(length) if length else None), ranges, resp.headers.get("etag") or resp.headers.get(
+            "last-modified")
+
+    async def run(self):
+        size, ranges, validator = await self._probe()
+
+        if not ranges or size is None or self.parts < 2 or size < 2 * self.min_part_size:
+            await self._single(size)
+        else:
+            await self._ranged(size, validator)
+
+        if self.checksum is not None:
+            algorithm, expected = self.checksum
+            if await self._executor(_digest, self.part_path, algorithm) != expected:
+                _remove(self.part_path, self.state_path)
+                raise exceptions.DownloadError("The %s digest of %s doesn't match" % (algorithm, self.url))
+
+        os.replace(self.part_path, self.path)
+        _remove(self.state_path)
+        return self.path
+
+    def _state(self):
+        return {"url": self.url, "size": self._size, "validator": self._validator,
+                "parts": [[part.start, part.end, part.done] for part in self._parts]}
+
+    async def _resume(self, size, validator):
+        state = await self._executor(_load, self.state_path)
+        if (state is None or state["url"] != self.url or state["size"] != size
+                or state["validator"] != validator or not os.path.exists(self.part_path)
+                or os.path.getsize(self.part_path) != size):
+            return None
+        return [_Part(*part) for part in state["parts"]]
+
+    def _split(self, size):
+        count = max(1, min(self.parts, size // self.min_part_size))
+        step = -(-size // count)
+        return [_Part(start, min(start + step, size) - 1) for start in range(0, size, step)]
+
+    async def _ranged(self, size, validator):
+        parts = await self._resume(size, validator)
+        if parts is None:
+            parts = self._split(size)
+            await self._executor(_preallocate, self.part_path, size)
+
+        self._size, self._validator, self._parts = size, validator, parts
+        await self._executor(_save, self.state_path, self._state())
+
+        self._fd = os.open(self.part_path, os.O_RDWR | getattr(os, "O_BINARY", 0))
+        tasks = [asyncio.ensure_future(self._fetch(part, validator)) for part in parts if part.remaining]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException as exc:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            # Writes still running in the executor go on past the
+            # cancellation of their part.
+            await asyncio.gather(*self._writes, return_exceptions=True)
+            os.close(self._fd)
+
+            if isinstance(exc, exceptions.DownloadError):
+                # The resource changed, what was written can't be resumed.
+                _remove(self.part_path, self.state_path)
+            else:
+                # What was written so far is kept to resume from.
+                await self._executor(_save, self.state_path, self._state())
+            raise
+        os.close(self._fd)
+
+        # The file was preallocated, so only the parts tell what was written.
+        if any(part.remaining for part in parts):
+            _remove(self.part_path, self.state_path)
+            raise exceptions.DownloadError("%s was not fully downloaded" % self.url)
+
+    async def _fetch(self, part, validator):
+        failures = 0
+
+        while part.remaining:
+            headers = {"range": "bytes=%d-%d" % (part.start + part.done, part.end)}
+            if validator:
+                # The whole resource is sent instead of the range if it
+                # changed since the probe.
+                headers["if-range"] = validator
+
+            try:
+                async with self.resource._stream(self.url, params=self.params, headers=headers,
+                                                 timeout=self.timeout) as resp:
+                    if resp.status_code != 206:
+                        raise exceptions.DownloadError("%s changed or ignored the range" % self.url)
+
+                    buffer = bytearray()
+                    async for chunk in resp.chunks:
+                        buffer += chunk
+                        if len(buffer) >= _WRITE_SIZE:
+                            await self._write(part, buffer)
+                            buffer = bytearray()
+                    await self._write(part, buffer)
+
+                if part.remaining:
+                    raise ConnectionError("The range of %s ended early" % self.url)
+            except exceptions.PERMANENT_ERRORS:
+                raise
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                failures += 1
+                if failures > self.retries:
+                    raise
+                await asyncio.sleep(min(0.1 * 2 ** failures, 5.0))
+
+    async def _write(self, part, buffer):
+        # Whatever the server sends past the end of the part is left out.
+        data = bytes(buffer[:part.remaining])
+        if not data:
+            return
+        write = asyncio.get_event_loop().run_in_executor(None, _write_at, self._fd, data, part.start + part.done)
+        self._writes.add(write)
+        write.add_done_callback(self._writes.discard)
+        await asyncio.shield(write)
+        part.done += len(data)
+
+        self._unsaved += len(data)
+        if self._unsaved >= _SAVE_EVERY:
+            self._unsaved = 0
+            await self._executor(_save, self.state_path, self._state())
+
+    async def _single(self, size):
+        _remove(self.state_path)
+
+        with open(self.part_path, "wb") as f:
+            async with self.resource._stream(self.url, params=self.params, timeout=self.timeout) as resp:
+                written = 0
+                buffer = bytearray()
+                async for chunk in resp.chunks:
+                    buffer += chunk
+                    if len(buffer) >= _WRITE_SIZE:
+                        await self._executor(f.write, bytes(buffer))
+                        written += len(buffer)
+                        buffer = bytearray()
+                await self._executor(f.write, bytes(buffer))
+                written += len(buffer)
+
+        if size is not None and written != size:
+            _remove(self.part_path)
+            raise exceptions.DownloadError("%s was not fully downloaded" % self.url)
@@ -1,4 +1,4 @@
-from .utils import url_join, iterator
+from .utils import iterator
 
 
 class SlumberBaseException(Exception):
@@ -7,22 +7,109 @@ class SlumberBaseException(Exception):
     """
 
 
+_MISSING = object()
+
+
+def _decode(response):
+    """
+    Decodes the body of an unpickled response by its content type, the way
+    ``Resource`` does.
+    """
+    from .serialize import Serializer
+
+    content_type = response.headers.get("content-type")
+    if not content_type or not response.content:
+        return response.content
+
+    try:
+        stype = Serializer().get_serializer(content_type=content_type.split(";")[0].strip())
+    except SerializerNotAvailable:
+        return response.content
+    return stype.loads(response.content)
+
+
 class SlumberHttpBaseException(SlumberBaseException):
     """
     All Slumber HTTP Exceptions inherit from this exception.
+
+    They are cheap to build, as some workloads raise a lot of them: the
+    message is only formatted when the exception is displayed, ``content``
+    is read from the response when accessed and ``data``, the decoded body,
+    is only decoded when accessed.
     """
 
+    message_format = "HTTP Error %s: %s"
+
     def __init__(self, *args, **kwargs):
+        self.response = kwargs.pop("response", None)
+        self.url = kwargs.pop("url", None)
+        self._content = kwargs.pop("content", _MISSING)
+        self._decode = kwargs.pop("decode", None)
+        self._data = _MISSING
+
         for key, value in iterator(kwargs):
             setattr(self, key, value)
         super(SlumberHttpBaseException, self).__init__(*args)
 
+    def __str__(self):
+        if self.args or self.response is None:
+            return super(SlumberHttpBaseException, self).__str__()
+        return self.message_format % (self.response.status_code, self.url)
+
+    def __reduce__(self):
+        # The decoder can't be pickled, so the response is sent as its parts,
+        # for errors raised in worker processes. The body is decoded again
+        # by its content type if ``data`` is accessed, as it may not decode.
+        state = dict(self.__dict__)
+        for name in ("_content", "_decode", "_data"):
+            del state[name]
+        if self.response is not None:
+            state["response"] = (self.response.status_code, list(self.response.headers.items()), self.content)
+        state["content"] = self.content
+        if self._data is not _MISSING:
+            state["data"] = self._data
+        return (self.__class__, self.args, state)
+
+    def __setstate__(self, state):
+        state = dict(state)
+        response = state.pop("response")
+        if response is not None:
+            from multidict import CIMultiDict
+            from .transports import Response
+
+            status_code, headers, content = response
+            response = Response(status_code, CIMultiDict(headers), content, url=state["url"])
+
+        self.response = response
+        self._content = state.pop("content")
+        self._data = state.pop("data", _MISSING)
+        self._decode = _decode if response is not None else None
+        for key, value in iterator(state):
+            setattr(self, key, value)
+
+    @property
+    def content(self):
+        if self._content is _MISSING:
+            return getattr(self.response, "content", None)
+        return self._content
+
+    @property
+    def data(self):
+        if self._data is _MISSING:
+            if self._decode is not None and self.response is not None:
+                self._data = self._decode(self.response)
+            else:
+                self._data = self.content
+        return self._data
+
 
 class HttpClientError(SlumberHttpBaseException):
     """
     Called when the server tells us there was a client error (4xx).
     """
 
+    message_format = "Client Error %s: %s"
+
 
 class HttpNotFoundError(HttpClientError):
     """
@@ -35,6 +122,13 @@ class HttpServerError(SlumberHttpBaseException):
     Called when the server tells us there was a server error (5xx).
     """
 
+    message_format = "Server Error %s: %s"
+
+
+# Errors that won't go away by retrying a request or reopening a stream: HTTP
+# errors, and content that doesn't decode or doesn't match the resource.
+PERMANENT_ERRORS = (SlumberBaseException, ValueError)
+
 
 class SerializerNoAvailable(SlumberBaseException):
     """
@@ -52,3 +146,45 @@ class ImproperlyConfigured(SlumberBaseException):
     """
     Slumber is somehow improperly configured.
     """
+
+
+class RequestTimeout(SlumberBaseException):
+    """
+    The request did not complete within its timeout.
+    """
+
+
+class DeadlineExceeded(RequestTimeout):
+    """
+    The deadline shared by the current block of requests ran out.
+    """
+
+
+class TooManyRedirects(SlumberBaseException):
+    """
+    More Locations were followed than allowed.
+    """
+
+
+class ConnectionClosed(SlumberBaseException):
+    """
+    The WebSocket was closed.
+    """
+
+
+class SchemaError(SlumberBaseException):
+    """
+    Decoded records don't fit the columns they are decoded into.
+    """
+
+
+class DownloadError(SlumberBaseException):
+    """
+    The downloaded content doesn't match the resource.
+    """
+
+
+class NotRecorded(SlumberBaseException):
+    """
+    The replayed log holds no response to the request.
+    """
@@ -0,0 +1,162 @@
+"""
+Hedged requests for idempotent GETs.
+
+When the response to a request is slower than most of the recent ones, a
+duplicate is sent and whichever answers first successfully wins. The other
+one is cancelled, or released if it already completed.
+"""
+import asyncio
+import collections
+
+
+class HedgePolicy(object):
+    """
+    Decides when to send a duplicate request and how many may be sent.
+
+    The hedge is sent once the primary request has been pending longer than
+    the ``percentile`` of the latencies observed over the last ``window``
+    requests, or ``initial_delay`` seconds while there are fewer than
+    ``min_samples`` of them. The delay is clamped to ``min_delay`` and
+    ``max_delay``.
+
+    ``budget`` caps the extra load: every request earns ``budget`` of a
+    token and every hedge spends a whole one, so with ``budget=0.05`` at most
+    about 5% of requests are duplicated. ``burst`` caps the saved tokens.
+    """
+
+    def __init__(self, percentile=95, initial_delay=0.1, min_delay=0.0,
+                 max_delay=None, window=256, min_samples=16,
+                 budget=0.05, burst=10):
+        if not 0 < percentile < 100:
+            raise ValueError("percentile must be between 0 and 100")
+
+        self.percentile = percentile
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.min_samples = min_samples
+        self.budget = budget
+        self.burst = burst
+
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+        self._latencies = collections.deque(maxlen=window)
+        self._tokens = 0.0
+        self._delay = None
+
+    def delay(self):
+        """
+        Returns the seconds to wait for the primary request before hedging.
+        """
+        if self._delay is None:
+            if len(self._latencies) < self.min_samples:
+                delay = self.initial_delay
+            else:
+                latencies = sorted(self._latencies)
+                index = int(len(latencies) * self.percentile / 100.0)
+                delay = latencies[min(index, len(latencies) - 1)]
+
+            if delay < self.min_delay:
+                delay = self.min_delay
+            if self.max_delay is not None and delay > self.max_delay:
+                delay = self.max_delay
+
+            self._delay = delay
+
+        return self._delay
+
+    def observe(self, latency):
+        """
+        Records the latency of a completed request.
+        """
+        self._latencies.append(latency)
+
+        # Sorting the window for every request is wasteful, the percentile
+        # barely moves between two samples.
+        if len(self._latencies) <= self.min_samples or self.requests % 16 == 0:
+            self._delay = None
+
+    def is_success(self, resp):
+        """
+        Returns whether ``resp`` can win the race. Server errors cannot, the
+        other request may still succeed.
+        """
+        return resp.status_code < 500
+
+    def _earn(self):
+        self.requests += 1
+        self._tokens = min(self._tokens + self.budget, self.burst)
+
+    def _spend(self):
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        self.hedges += 1
+        return True
+
+    async def run(self, send):
+        """
+        Runs ``send``, a callable returning an awaitable of the response,
+        hedging it as the policy allows.
+        """
+        loop = asyncio.get_event_loop()
+        start = loop.time()
+        self._earn()
+
+        primary = asyncio.ensure_future(send())
+        tasks = [primary]
+
+        # Whatever happens to the caller, cancellation or deadline included,
+        # no attempt is left running without anyone waiting for it.
+        try:
+            done, _ = await asyncio.wait([primary], timeout=self.delay())
+
+            if done or not self._spend():
+                resp = await primary
+                self.observe(loop.time() - start)
+                return resp
+
+            hedge = asyncio.ensure_future(send())
+            tasks.append(hedge)
+            pending = set(tasks)
+            failed = []
+
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+
+                for task in (primary, hedge):
+                    if task not in done:
+                        continue
+
+                    if task.exception() is None and self.is_success(task.result()):
+                        self.observe(loop.time() - start)
+                        if task is hedge:
+                            self.hedge_wins += 1
+                        for other in done:
+                            if other is not task:
+                                _release(other)
+                        return task.result()
+
+                    failed.append(task)
+
+            # Neither request succeeded, report how the primary one went.
+            for task in failed:
+                if task is not primary:
+                    _release(task)
+            return primary.result()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+                    task.add_done_callback(_release)
+
+
+def _release(task):
+    if task.cancelled() or task.exception() is not None:
+        return
+
+    release = getattr(task.result(), "release", None)
+    if release is not None:
+        release()
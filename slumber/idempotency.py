@@ -0,0 +1,182 @@
+"""
+Idempotency keys and safe retries for unsafe verbs.
+
+Retrying a POST that timed out may create the record twice. APIs supporting
+the ``Idempotency-Key`` header remember the key of each write and answer a
+repeated one with the original result, so an ``IdempotencyPolicy`` sends one
+key per logical call, keeps it across retries and hedges of that call, and can
+then retry writes on transient failures.
+
+An ``IdempotencyJournal`` also dedupes identical submissions made within a
+window locally: they share the key and the response of the first one.
+"""
+import asyncio
+import collections
+import hashlib
+import time
+
+try:
+    from urllib.parse import urlencode
+except ImportError:
+    from urllib import urlencode
+
+from .utils import parse_retry_after
+
+
+class IdempotencyJournal(object):
+    """
+    Remembers the submissions of the last ``window`` seconds, at most
+    ``max_entries`` of them, by a fingerprint of their method, url, query and
+    body.
+    """
+
+    def __init__(self, window=60.0, max_entries=10000):
+        self.window = window
+        self.max_entries = max_entries
+        self.deduplicated = 0
+
+        self._entries = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def fingerprint(self, method, url, params=None, data=None):
+        digest = hashlib.sha256()
+        query = urlencode(sorted(params.items()), doseq=True) if params else ""
+        for part in (method, url, query):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        if data is not None:
+            digest.update(data if isinstance(data, bytes) else str(data).encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, fingerprint):
+        """
+        Returns the ``(key, future)`` of a submission still in the window, or
+        None.
+        """
+        self._expire()
+        entry = self._entries.get(fingerprint)
+        return entry[1:] if entry is not None else None
+
+    def add(self, fingerprint, key, future):
+        self._entries[fingerprint] = (time.monotonic() + self.window, key, future)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def discard(self, fingerprint):
+        self._entries.pop(fingerprint, None)
+
+    def _expire(self):
+        now = time.monotonic()
+        while self._entries:
+            fingerprint, (expires, _, _) = next(iter(self._entries.items()))
+            if expires > now:
+                break
+            del self._entries[fingerprint]
+
+
+def _random_key():
+    import uuid
+    return uuid.uuid4().hex
+
+
+class IdempotencyPolicy(object):
+    """
+    Sends an idempotency key with the requests of ``methods`` and retries
+    them up to ``retries`` times when they fail with a transport error or a
+    status of ``retry_statuses``, waiting ``backoff`` seconds doubled each
+    time unless the server asks otherwise with ``Retry-After``.
+
+    ``journal``, an ``IdempotencyJournal`` or a window in seconds, dedupes
+    identical submissions locally. ``generate`` returns new keys, by default
+    random UUIDs.
+    """
+
+    def __init__(self, header="Idempotency-Key", methods=("POST", "PATCH"), retries=2, backoff=0.1,
+                 max_backoff=5.0, retry_statuses=(408, 409, 425, 429, 500, 502, 503, 504),
+                 journal=None, generate=None):
+        if journal is not None and not isinstance(journal, IdempotencyJournal):
+            journal = IdempotencyJournal(window=journal)
+
+        self.header = header
+        self.methods = frozenset(method.upper() for method in methods)
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.retry_statuses = frozenset(retry_statuses)
+        self.journal = journal
+        self.generate = generate if generate is not None else _random_key
+
+        self.retried = 0
+
+    @classmethod
+    def coerce(cls, value):
+        """
+        Accepts an IdempotencyPolicy, True for the defaults, or None/False
+        to send no keys.
+        """
+        if value is None or value is False:
+            return None
+        if value is True:
+            return cls()
+        return value
+
+    def applies(self, method):
+        return method in self.methods
+
+    async def run(self, method, url, params, data, headers, send, key=None):
+        """
+        Runs ``send``, called with the request headers and returning an
+        awaitable of the response, with the idempotency key and retries.
+        ``key`` overrides the generated key.
+        """
+        if self.journal is None or key is not None:
+            return await self._attempts(dict(headers, **{self.header: key or self.generate()}), send)
+
+        fingerprint = self.journal.fingerprint(method, url, params, data)
+        entry = self.journal.get(fingerprint)
+        if entry is not None:
+            self.journal.deduplicated += 1
+            return await asyncio.shield(entry[1])
+
+        key = self.generate()
+        future = asyncio.ensure_future(self._attempts(dict(headers, **{self.header: key}), send))
+        self.journal.add(fingerprint, key, future)
+
+        def forget(future):
+            # Failed submissions may be made again.
+            if future.cancelled() or future.exception() is not None or future.result().status_code >= 400:
+                self.journal.discard(fingerprint)
+
+        future.add_done_callback(forget)
+        return await asyncio.shield(future)
+
+    async def _attempts(self, headers, send):
+        delay = self.backoff
+        attempt = 0
+
+        while True:
+            try:
+                resp = await send(headers)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                if attempt >= self.retries:
+                    raise
+                wait = delay
+            else:
+                if attempt >= self.retries or resp.status_code not in self.retry_statuses:
+                    return resp
+
+                wait = parse_retry_after(resp.headers.get("retry-after"))
+                if wait is None:
+                    wait = delay
+                release = getattr(resp, "release", None)
+                if release is not None:
+                    release()
+
+            attempt += 1
+            self.retried += 1
+            await asyncio.sleep(min(wait, self.max_backoff))
+            delay *= 2
@@ -0,0 +1,245 @@
+"""
+Transports dispatching requests into an application in the same process.
+
+They make for fast and deterministic tests and load tests of slumber based
+clients, with realistic responses, and for measuring the client overhead
+apart from the network. They are only imported when used, as they aren't
+needed to talk to a server.
+"""
+import asyncio
+import os
+import shutil
+import socket
+import tempfile
+from contextlib import asynccontextmanager
+
+try:
+    from urllib.parse import urlencode, urlsplit, unquote
+except ImportError:
+    from urllib import urlencode, unquote
+    from urlparse import urlsplit
+
+import aiohttp
+from aiohttp import web
+from multidict import CIMultiDict
+
+from . import exceptions
+from .transports import AiohttpTransport, BaseTransport, Response, StreamedResponse, _make_form
+
+
+class _BufferWriter(object):
+
+    def __init__(self):
+        self.chunks = []
+
+    async def write(self, chunk):
+        self.chunks.append(bytes(chunk))
+
+
+async def _encode_body(data, files, headers):
+    """
+    Returns the body of a request as bytes, for the transports that do not
+    go through an HTTP client.
+    """
+    if files:
+        payload = _make_form(data, files)()
+        headers["content-type"] = payload.content_type
+        writer = _BufferWriter()
+        await payload.write(writer)
+        return b"".join(writer.chunks)
+
+    if data is None:
+        return b""
+    if isinstance(data, bytes):
+        return data
+    return data.encode("utf-8")
+
+
+def _target(url, params):
+    parts = urlsplit(url)
+    query = parts.query
+    if params:
+        query = "&".join(x for x in (query, urlencode(params, doseq=True)) if x)
+    return parts, query
+
+
+class AiohttpAppTransport(AiohttpTransport):
+    """
+    Serves an ``aiohttp.web.Application`` on a unix socket and sends the
+    requests to it, whatever the host of the urls. Handlers, middlewares and
+    signals run as they do behind any server, and streamed responses,
+    WebSockets and timeouts work as they do with the ``AiohttpTransport``.
+
+    This is not socketless: requests don't leave the machine, but they are
+    still written to and read from a socket by the kernel, as aiohttp only
+    serves applications that way through its public API. The socket is a
+    file created in a new temporary directory when the application is started
+    on the first request, and removed with the directory by ``close()``.
+    Platforms without unix sockets raise ``ImproperlyConfigured``, the
+    ``ASGITransport`` calls its application without any socket. Redirects
+    are returned as the application answers them.
+    """
+
+    allow_redirects = False
+
+    def __init__(self, app, **session_kwargs):
+        if not hasattr(socket, "AF_UNIX"):
+            raise exceptions.ImproperlyConfigured("The AiohttpAppTransport needs unix sockets")
+
+        super(AiohttpAppTransport, self).__init__(**session_kwargs)
+        self.app = app
+        self._runner = None
+        self._directory = None
+        self._starting = None
+
+    async def _serve(self):
+        self._directory = tempfile.mkdtemp(prefix="slumber-")
+        path = os.path.join(self._directory, "app.sock")
+
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        await web.UnixSite(self._runner, path).start()
+        self.session = aiohttp.ClientSession(connector=aiohttp.UnixConnector(path), **self.session_kwargs)
+
+    async def _start(self):
+        # Concurrent first requests wait for the same start.
+        if self._starting is None:
+            self._starting = asyncio.ensure_future(self._serve())
+        await self._starting
+
+    async def request(self, *args, **kwargs):
+        await self._start()
+        return await super(AiohttpAppTransport, self).request(*args, **kwargs)
+
+    @asynccontextmanager
+    async def stream(self, *args, **kwargs):
+        await self._start()
+        async with super(AiohttpAppTransport, self).stream(*args, **kwargs) as resp:
+            yield resp
+
+    async def websocket(self, *args, **kwargs):
+        await self._start()
+        return await super(AiohttpAppTransport, self).websocket(*args, **kwargs)
+
+    async def close(self):
+        if self._starting is None:
+            return
+
+        self._starting = None
+        await super(AiohttpAppTransport, self).close()
+        self.session = None
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+        shutil.rmtree(self._directory, ignore_errors=True)
+
+
+class ASGITransport(BaseTransport):
+    """
+    Dispatches requests straight into an ASGI application, in the same
+    process and without sockets.
+
+    ``client`` is the ``(host, port)`` the requests appear to come from.
+    Lifespan events are not sent, the application is expected to be ready.
+    """
+
+    def __init__(self, app, root_path="", client=("127.0.0.1", 123)):
+        self.app = app
+        self.root_path = root_path
+        self.client = client
+
+    def _scope(self, method, url, params, headers):
+        parts, query = _target(url, params)
+        headers.setdefault("host", parts.netloc)
+        default_port = 443 if parts.scheme == "https" else 80
+
+        return {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": parts.scheme,
+            "path": unquote(parts.path),
+            "raw_path": parts.path.encode("ascii"),
+            "query_string": query.encode("ascii"),
+            "root_path": self.root_path,
+            "headers": [(key.lower().encode("latin-1"), str(value).encode("latin-1"))
+                        for key, value in headers.items()],
+            "server": (parts.hostname, parts.port or default_port),
+            "client": self.client,
+        }
+
+    async def request(self, method, url, data=None, params=None, files=None, headers=None, timeout=None):
+        headers = CIMultiDict(headers or {})
+        body = await _encode_body(data, files, headers)
+
+        exchange = self._exchange(method, url, body, params, headers)
+        if timeout is None or timeout.total is None:
+            return await exchange
+        return await asyncio.wait_for(exchange, timeout.total)
+
+    async def _exchange(self, method, url, body, params, headers):
+        async with self._stream(method, url, body, params, headers) as resp:
+            content = await resp.read()
+
+        return Response(resp.status_code, resp.headers, content, url=url)
+
+    def stream(self, method, url, params=None, headers=None, timeout=None):
+        return self._stream(method, url, b"", params, CIMultiDict(headers or {}))
+
+    @asynccontextmanager
+    async def _stream(self, method, url, body, params, headers):
+        scope = self._scope(method, url, params, headers)
+        messages = asyncio.Queue()
+        disconnected = asyncio.Event()
+        request_sent = []
+
+        async def receive():
+            if not request_sent:
+                request_sent.append(True)
+                return {"type": "http.request", "body": body, "more_body": False}
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            await messages.put(message)
+
+        async def call():
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                await messages.put(None)
+
+        app = asyncio.ensure_future(call())
+
+        try:
+            message = await messages.get()
+            while message is not None and message["type"] != "http.response.start":
+                message = await messages.get()
+            if message is None:
+                await app
+                raise RuntimeError("The ASGI application did not send a response")
+
+            response_headers = CIMultiDict()
+            for key, value in message.get("headers", []):
+                response_headers.add(key.decode("latin-1"), value.decode("latin-1"))
+
+            async def chunks():
+                while True:
+                    message = await messages.get()
+                    if message is None:
+                        return
+                    if message["type"] == "http.response.body":
+                        yield message.get("body", b"")
+                        if not message.get("more_body", False):
+                            return
+
+            yield StreamedResponse(message["status"], response_headers, chunks(), url=url)
+        finally:
+            disconnected.set()
+            if not app.done():
+                app.cancel()
+            try:
+                await app
+            except asyncio.CancelledError:
+                pass
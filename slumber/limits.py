@@ -0,0 +1,217 @@
+"""
+Adaptive concurrency limits per host.
+
+A fixed number of requests in flight is either too low and wastes
+throughput, or too high and overloads the upstream when it slows down. A
+``ConcurrencyLimiter`` finds the limit of each host as it goes, in the
+manner of Netflix's concurrency-limits: it grows while latency stays near
+its baseline and is cut back when latency spikes or the host answers 429 or
+a server error. Requests over the limit wait in a queue.
+"""
+import asyncio
+import collections
+import math
+
+try:
+    from urllib.parse import urlsplit
+except ImportError:
+    from urlparse import urlsplit
+
+from . import exceptions
+
+
+class AIMDLimit(object):
+    """
+    Additive increase, multiplicative decrease: the limit grows by one after
+    every request that went well while it was put to use, and is multiplied
+    by ``backoff`` after a drop, or a latency over ``tolerance`` times the
+    baseline.
+    """
+
+    def __init__(self, initial=20, min_limit=1, max_limit=1000, backoff=0.9, tolerance=2.0, smoothing=0.05):
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.tolerance = tolerance
+        self.smoothing = smoothing
+        self.baseline = None
+
+    def update(self, latency, inflight, dropped):
+        if not dropped and self.baseline is None:
+            self.baseline = latency
+
+        spike = self.baseline is not None and latency > self.tolerance * self.baseline
+        if dropped or spike:
+            self.limit = max(self.min_limit, self.limit * self.backoff)
+        else:
+            # The baseline only follows the latencies that are not spikes.
+            self.baseline += self.smoothing * (latency - self.baseline)
+            if inflight * 2 >= self.limit:
+                self.limit = min(self.max_limit, self.limit + 1)
+
+
+class GradientLimit(object):
+    """
+    Follows the ratio between the long-term and the short-term average
+    latencies: the limit stays put while they match and shrinks as the short
+    term one grows, down to half at once. A queue of the square root of the
+    limit is allowed on top so that it can still grow.
+    """
+
+    def __init__(self, initial=20, min_limit=1, max_limit=1000, tolerance=1.5, smoothing=0.2,
+                 short_window=10, long_window=600):
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.tolerance = tolerance
+        self.smoothing = smoothing
+        self.short_decay = 2.0 / (short_window + 1)
+        self.long_decay = 2.0 / (long_window + 1)
+        self.short = None
+        self.long = None
+
+    def update(self, latency, inflight, dropped):
+        if self.short is None:
+            self.short = self.long = latency
+        else:
+            self.short += self.short_decay * (latency - self.short)
+            self.long += self.long_decay * (self.short - self.long)
+
+        if dropped:
+            gradient = 0.5
+        else:
+            gradient = max(0.5, min(1.0, self.tolerance * self.long / self.short))
+
+        # A limit that is not put to use has no reason to grow.
+        if gradient == 1.0 and inflight * 2 < self.limit:
+            return
+
+        target = self.limit * gradient + math.sqrt(self.limit)
+        limit = self.limit * (1 - self.smoothing) + target * self.smoothing
+        self.limit = max(self.min_limit, min(self.max_limit, limit))
+
+
+_STRATEGIES = {
+    "aimd": AIMDLimit,
+    "gradient": GradientLimit,
+}
+
+
+class _Host(object):
+
+    __slots__ = ("strategy", "inflight", "waiters")
+
+    def __init__(self, strategy):
+        self.strategy = strategy
+        self.inflight = 0
+        self.waiters = collections.deque()
+
+    @property
+    def limit(self):
+        return max(1, int(self.strategy.limit))
+
+
+class ConcurrencyLimiter(object):
+    """
+    Bounds the requests in flight to each host to a limit found by
+    ``strategy``: ``"aimd"``, ``"gradient"``, or a callable returning a new
+    object with a ``limit`` and an ``update(latency, inflight, dropped)``
+    method for each host. ``options`` are given to the strategy.
+
+    A request is dropped when it times out or is answered with a status in
+    ``drop_statuses``.
+    """
+
+    def __init__(self, strategy="aimd", drop_statuses=(429, 500, 502, 503, 504), **options):
+        if isinstance(strategy, str):
+            if strategy not in _STRATEGIES:
+                raise exceptions.ImproperlyConfigured("%s is not an available strategy" % strategy)
+            strategy = _STRATEGIES[strategy]
+
+        self.strategy = strategy
+        self.options = options
+        self.drop_statuses = frozenset(drop_statuses)
+
+        self._hosts = {}
+
+    @classmethod
+    def coerce(cls, value):
+        """
+        Accepts a ConcurrencyLimiter, True for the defaults, a strategy name
+        or None.
+        """
+        if value is None or value is False:
+            return None
+        if value is True:
+            return cls()
+        if isinstance(value, str):
+            return cls(strategy=value)
+        return value
+
+    def _host(self, url):
+        key = urlsplit(url).netloc
+        host = self._hosts.get(key)
+        if host is None:
+            host = self._hosts[key] = _Host(self.strategy(**self.options))
+        return host
+
+    def limit(self, url):
+        """
+        Returns the current limit of the host of ``url``.
+        """
+        return self._host(url).limit
+
+    def stats(self):
+        """
+        Returns the limit, requests in flight and queue depth of each host.
+        """
+        return dict((key, {"limit": host.limit, "inflight": host.inflight, "queued": len(host.waiters)})
+                    for key, host in self._hosts.items())
+
+    async def _acquire(self, host):
+        if host.inflight < host.limit and not host.waiters:
+            host.inflight += 1
+            return
+
+        future = asyncio.get_event_loop().create_future()
+        host.waiters.append(future)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was handed over as the wait was cancelled.
+                self._release(host)
+            elif future in host.waiters:
+                host.waiters.remove(future)
+            raise
+
+    def _release(self, host):
+        host.inflight -= 1
+        while host.waiters and host.inflight < host.limit:
+            future = host.waiters.popleft()
+            if not future.done():
+                host.inflight += 1
+                future.set_result(None)
+
+    async def run(self, url, send):
+        """
+        Runs ``send``, a callable returning an awaitable of the response to
+        ``url``, once the host has room for it.
+        """
+        host = self._host(url)
+        await self._acquire(host)
+
+        loop = asyncio.get_event_loop()
+        start = loop.time()
+        inflight = host.inflight
+        try:
+            resp = await send()
+        except asyncio.TimeoutError:
+            host.strategy.update(loop.time() - start, inflight, True)
+            raise
+        else:
+            host.strategy.update(loop.time() - start, inflight, resp.status_code in self.drop_statuses)
+            return resp
+        finally:
+            self._release(host)
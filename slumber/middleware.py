@@ -0,0 +1,97 @@
+"""
+Middleware wrapping the requests of an API.
+
+Adding headers, logging or retries used to mean subclassing ``Resource``
+and overriding ``_request``, which doesn't compose. Middleware are async
+callables taking the ``Request`` about to be sent and the ``handler`` sending
+it, and returning the response::
+
+    async def log(request, handler):
+        resp = await handler(request)
+        logger.info("%s %s %s", request.method, request.url, resp.status_code)
+        return resp
+
+The middleware of an API are compiled into a single chain of calls when they
+are registered, rather than on every request, and the requests of an API
+without middleware don't go through a chain at all.
+"""
+
+
+class Request(object):
+    """
+    A request about to be sent to the transport. Middleware may change it,
+    or hand another one to the handler.
+    """
+
+    __slots__ = ("method", "url", "params", "data", "files", "headers", "timeout")
+
+    def __init__(self, method, url, params=None, data=None, files=None, headers=None, timeout=None):
+        self.method = method
+        self.url = url
+        self.params = params
+        self.data = data
+        self.files = files
+        self.headers = headers if headers is not None else {}
+        self.timeout = timeout
+
+    def __repr__(self):
+        return "<Request [%s %s]>" % (self.method, self.url)
+
+
+def _wrap(middleware, handler):
+    def call(request):
+        return middleware(request, handler)
+    return call
+
+
+class Pipeline(object):
+    """
+    The middleware of an API, in the order they see the request, compiled
+    into ``handler``, a callable taking a ``Request`` and returning an
+    awaitable of the response. The last handler of the chain authenticates
+    the request with ``auth`` and sends it through ``transport``.
+    """
+
+    def __init__(self, transport, auth=None, middlewares=()):
+        self.transport = transport
+        self.auth = auth
+        self.middlewares = ()
+        self.handler = self._send
+        self.use(*middlewares)
+
+    def __bool__(self):
+        return bool(self.middlewares)
+
+    __nonzero__ = __bool__
+
+    def __len__(self):
+        return len(self.middlewares)
+
+    def use(self, *middlewares):
+        """
+        Appends ``middlewares``, which see the requests after the ones
+        already registered, and compiles the chain again.
+        """
+        self.middlewares += tuple(middlewares)
+        handler = self._send
+        for middleware in reversed(self.middlewares):
+            handler = _wrap(middleware, handler)
+        self.handler = handler
+
+    def extended(self, *middlewares):
+        """
+        Returns a new pipeline with ``middlewares`` after these ones.
+        """
+        return Pipeline(self.transport, auth=self.auth, middlewares=self.middlewares + tuple(middlewares))
+
+    def _send(self, request):
+        kwargs = {"data": request.data, "params": request.params, "files": request.files}
+        if request.timeout is not None:
+            kwargs["timeout"] = request.timeout
+
+        if self.auth is None:
+            return self.transport.request(request.method, request.url, headers=request.headers, **kwargs)
+
+        return self.auth.run(request.method, request.url, request.params, request.data, request.headers,
+                             lambda headers: self.transport.request(request.method, request.url, headers=headers,
+                                                                    **kwargs))
@@ -0,0 +1,43 @@
+"""
+Reading the records and the link to the next page of list responses.
+"""
+import re
+
+try:
+    from urllib.parse import urljoin
+except ImportError:
+    from urlparse import urljoin
+
+from . import exceptions
+
+_NEXT_LINK = re.compile(r'<([^>]*)>[^,]*;\s*rel="?next"?')
+
+
+def records(body, key=None):
+    """
+    Returns the list of records of ``body``, found under ``key`` when the
+    body is an object.
+    """
+    if key is not None and isinstance(body, dict):
+        body = body.get(key)
+    if body is None:
+        return []
+    if not isinstance(body, list):
+        raise exceptions.SchemaError("Expected a list of records, got %s" % type(body).__name__)
+    return body
+
+
+def next_url(resp, body, url, key=None):
+    """
+    Returns the absolute url of the page following the response to ``url``,
+    found under ``key`` in the body, or in the ``Link`` header when ``key``
+    is ``"link"``, or None on the last page.
+    """
+    if key is None:
+        return None
+    if key == "link":
+        match = _NEXT_LINK.search(resp.headers.get("link", "") or "")
+        location = match.group(1) if match else None
+    else:
+        location = body.get(key) if isinstance(body, dict) else None
+    return urljoin(url, location) if location else None
@@ -0,0 +1,192 @@
+"""
+A scheduler polling the status urls of many long-running operations.
+
+APIs running long operations answer ``202 Accepted`` with the url of a status
+resource, which answers 202 until the operation completes. Rather than a
+sleep loop per operation, a ``PollScheduler`` keeps every pending operation
+in a single timer heap, polls the due ones with bounded concurrency and can
+check many of them with one batched request when the API allows it.
+"""
+import asyncio
+import contextvars
+import heapq
+import itertools
+
+from . import exceptions
+from . import timeouts
+from .utils import parse_retry_after
+
+
+class _Operation(object):
+
+    __slots__ = ("resource", "future", "interval", "started")
+
+    def __init__(self, resource, future, interval, started):
+        self.resource = resource
+        self.future = future
+        self.interval = interval
+        self.started = started
+
+
+class PollScheduler(object):
+    """
+    Polls status resources until they stop answering ``202 Accepted``.
+
+    A status is first polled after ``interval`` seconds, then ``backoff``
+    times later each time up to ``max_interval``, unless it asks otherwise
+    with ``Retry-After``. At most ``concurrency`` polls are in flight, and an
+    operation still pending after ``timeout`` seconds fails with
+    ``RequestTimeout``.
+
+    ``batch``, when given, is a coroutine function called with the urls of
+    the statuses due at once, returning a dict telling for each url whether
+    the operation is done. Only the done ones are then requested, so thousands
+    of pending operations cost one request per round.
+    """
+
+    def __init__(self, interval=0.1, backoff=1.5, max_interval=30.0,
+                 concurrency=64, timeout=None, batch=None):
+        self.interval = interval
+        self.backoff = backoff
+        self.max_interval = max_interval
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.batch = batch
+
+        self._heap = []
+        self._counter = itertools.count()
+        self._task = None
+        self._wakeup = None
+        self._semaphore = None
+        self._loop = None
+        self._polls = set()
+
+    def __len__(self):
+        return len(self._heap)
+
+    def close(self):
+        """
+        Stops polling, cancelling the operations still pending.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        for poll in list(self._polls):
+            poll.cancel()
+        for _, _, operation in self._heap:
+            operation.future.cancel()
+        self._heap = []
+
+    async def wait(self, resource):
+        """
+        Returns the first response of ``resource`` that is not a 202.
+        """
+        loop = asyncio.get_event_loop()
+        future = loop.create_future()
+        self._schedule(_Operation(resource, future, self.interval, loop.time()), self.interval)
+
+        budget = timeouts.remaining()
+        if budget is None:
+            return await future
+
+        try:
+            return await asyncio.wait_for(future, budget)
+        except asyncio.TimeoutError:
+            raise exceptions.DeadlineExceeded("Deadline exceeded while waiting for %s" % resource.url())
+
+    def _schedule(self, operation, delay):
+        loop = asyncio.get_event_loop()
+        heapq.heappush(self._heap, (loop.time() + delay, next(self._counter), operation))
+
+        # The task stops whenever the heap is empty, even with polls still in
+        # flight, so the semaphore bounding them outlives it.
+        if self._loop is not loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            # The task is shared by every waiter, so it must not inherit the
+            # deadline of the one that happened to start it. Each waiter
+            # bounds its own wait instead.
+            self._task = contextvars.Context().run(asyncio.ensure_future, self._run())
+        else:
+            self._wakeup.set()
+
+    def _reschedule(self, operation, resp):
+        delay = parse_retry_after(resp.headers.get("retry-after")) if resp is not None else None
+        if delay is None:
+            delay = operation.interval
+            operation.interval = min(operation.interval * self.backoff, self.max_interval)
+
+        loop = asyncio.get_event_loop()
+        if self.timeout is not None and loop.time() - operation.started + delay > self.timeout:
+            message = "Still pending after %ss: %s" % (self.timeout, operation.resource.url())
+            _resolve(operation.future, exception=exceptions.RequestTimeout(message))
+            return
+
+        self._schedule(operation, delay)
+
+    async def _run(self):
+        loop = asyncio.get_event_loop()
+
+        while self._heap:
+            delay = self._heap[0][0] - loop.time()
+            if delay > 0:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            now = loop.time()
+            due = []
+            while self._heap and self._heap[0][0] <= now:
+                operation = heapq.heappop(self._heap)[2]
+                # Operations whose waiter went away are dropped.
+                if not operation.future.done():
+                    due.append(operation)
+
+            if due:
+                poll = asyncio.ensure_future(self._poll(due))
+                self._polls.add(poll)
+                poll.add_done_callback(self._polls.discard)
+
+    async def _poll(self, operations):
+        if self.batch is not None:
+            try:
+                done = await self.batch([operation.resource.url() for operation in operations])
+            except Exception:
+                # The batch endpoint is only an optimization, poll one by one.
+                done = None
+
+            if done is not None:
+                for operation in operations:
+                    if not done.get(operation.resource.url()):
+                        self._reschedule(operation, None)
+                operations = [operation for operation in operations if done.get(operation.resource.url())]
+
+        await asyncio.gather(*[self._check(operation) for operation in operations])
+
+    async def _check(self, operation):
+        async with self._semaphore:
+            try:
+                resp = await operation.resource._request("GET")
+            except Exception as exc:
+                _resolve(operation.future, exception=exc)
+                return
+
+        if resp.status_code == 202:
+            self._reschedule(operation, resp)
+        else:
+            _resolve(operation.future, result=resp)
+
+
+def _resolve(future, result=None, exception=None):
+    if future.done():
+        return
+    if exception is not None:
+        future.set_exception(exception)
+    else:
+        future.set_result(result)
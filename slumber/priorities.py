@@ -0,0 +1,138 @@
+"""
+Priority classes sharing a connection pool.
+
+Interactive calls and bulk backfills made through the same `API` compete for
+the same connections, and the bulk traffic wins by sheer volume. A
+``PriorityScheduler`` sits in front of the pool: it lets at most
+``capacity`` requests through at once, serves the waiting ones by weighted
+fair queueing between their classes and keeps slots in reserve for the
+classes that need them, so backfills can't starve foreground work.
+"""
+import asyncio
+import collections
+import itertools
+
+from . import exceptions
+
+
+class _Class(object):
+
+    __slots__ = ("name", "weight", "reserved", "inflight", "finish", "waiters")
+
+    def __init__(self, name, weight, reserved):
+        self.name = name
+        self.weight = float(weight)
+        self.reserved = reserved
+        self.inflight = 0
+        self.finish = 0.0
+        self.waiters = collections.deque()
+
+
+class PriorityScheduler(object):
+    """
+    Lets ``capacity`` requests in flight at once, which should match the
+    size of the connection pool, sharing them between priority classes.
+
+    Waiting requests are served in proportion to the ``weights`` of their
+    classes, a class with twice the weight getting twice the slots while
+    both are waiting. ``reserved`` slots of a class can't be taken by the
+    other ones, even when it is idle. Requests without a priority are in the
+    ``default`` class.
+    """
+
+    def __init__(self, capacity=100, weights=None, reserved=None, default="normal"):
+        if weights is None:
+            weights = {"high": 8, "normal": 4, "low": 1}
+        reserved = reserved if reserved is not None else {"high": min(10, capacity // 10)}
+
+        if default not in weights:
+            raise exceptions.ImproperlyConfigured("The default priority %s has no weight" % default)
+        if sum(reserved.values()) >= capacity:
+            raise exceptions.ImproperlyConfigured("Reserved slots must leave room for the other classes")
+
+        self.capacity = capacity
+        self.default = default
+
+        self._classes = dict((name, _Class(name, weight, reserved.get(name, 0)))
+                             for name, weight in weights.items())
+        self._inflight = 0
+        self._vtime = 0.0
+        self._counter = itertools.count()
+
+    def _class(self, priority):
+        priority = self.default if priority is None else priority
+        if priority not in self._classes:
+            raise exceptions.ImproperlyConfigured("%s is not a priority class" % priority)
+        return self._classes[priority]
+
+    def stats(self):
+        """
+        Returns the requests in flight and waiting of each class.
+        """
+        return dict((name, {"inflight": cls.inflight, "queued": len(cls.waiters)})
+                    for name, cls in self._classes.items())
+
+    def _available(self, cls):
+        # The reserve of the other classes is kept free, except the part
+        # they are using themselves.
+        held = sum(max(0, other.reserved - other.inflight) for other in self._classes.values() if other is not cls)
+        return self._inflight < self.capacity - held
+
+    def _grant(self, cls):
+        cls.inflight += 1
+        self._inflight += 1
+
+    def _dispatch(self):
+        while self._inflight < self.capacity:
+            # The eligible class whose next request has the earliest
+            # virtual finish time goes first.
+            best = None
+            for cls in self._classes.values():
+                while cls.waiters and cls.waiters[0][1].done():
+                    cls.waiters.popleft()
+                if cls.waiters and self._available(cls) and (best is None or cls.waiters[0][0] < best.waiters[0][0]):
+                    best = cls
+            if best is None:
+                return
+
+            finish, future = best.waiters.popleft()
+            self._vtime = finish
+            self._grant(best)
+            future.set_result(None)
+
+    async def _acquire(self, cls):
+        if not cls.waiters and self._available(cls) and not any(
+                other.waiters for other in self._classes.values() if other is not cls):
+            self._grant(cls)
+            return
+
+        finish = max(self._vtime, cls.finish) + 1.0 / cls.weight
+        cls.finish = finish
+        future = asyncio.get_event_loop().create_future()
+        cls.waiters.append((finish, future))
+        self._dispatch()
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was granted as the wait was cancelled.
+                self._release(cls)
+            raise
+
+    def _release(self, cls):
+        cls.inflight -= 1
+        self._inflight -= 1
+        self._dispatch()
+
+    async def run(self, priority, send):
+        """
+        Runs ``send``, a callable returning an awaitable of the response,
+        once a slot is granted to its ``priority`` class.
+        """
+        cls = self._class(priority)
+        await self._acquire(cls)
+        try:
+            return await send()
+        finally:
+            self._release(cls)
@@ -0,0 +1,366 @@
+"""
+Recording and replaying traffic.
+
+Slowdowns seen in production are hard to reproduce on a laptop. A
+``Recorder`` is a middleware writing a sample of the requests of an API and
+their responses, with how long they took, to a log, either NDJSON or HAR.
+A ``ReplayTransport`` then answers the same requests from the log, with the
+recorded latencies or scaled ones, without a network.
+"""
+import asyncio
+import base64
+import collections
+import json
+import random
+import time
+from contextlib import asynccontextmanager
+
+from multidict import CIMultiDict
+
+try:
+    from urllib.parse import parse_qsl, urlencode
+except ImportError:
+    from urllib import urlencode
+    from urlparse import parse_qsl
+
+from . import exceptions
+from .transports import BaseTransport, Response, StreamedResponse
+
+REDACTED = "[redacted]"
+
+_SENSITIVE_HEADERS = ("authorization", "proxy-authorization", "cookie", "set-cookie", "x-api-key")
+
+
+def _encode(content):
+    """
+    Returns the text of ``content`` and its encoding, None or base64.
+    """
+    if content is None:
+        return "", None
+    if isinstance(content, str):
+        return content, None
+    content = bytes(content)
+    try:
+        return content.decode("utf-8"), None
+    except UnicodeDecodeError:
+        return base64.b64encode(content).decode("ascii"), "base64"
+
+
+def _decode(text, encoding):
+    if encoding == "base64":
+        return base64.b64decode(text)
+    return text.encode("utf-8")
+
+
+def _key(method, url, params):
+    # The query may be in the url or in the params, the way a next page
+    # link or a HAR log has it.
+    url, _, query = url.partition("?")
+    pairs = parse_qsl(query, keep_blank_values=True)
+    pairs.extend((str(name), str(value)) for name, value in (params or {}).items())
+    return method, url, tuple(sorted(pairs))
+
+
+def _matches(recorded, key):
+    """
+    Tells whether the ``key`` of a request matches the ``recorded`` one, a
+    redacted value matching any value.
+    """
+    if recorded[:2] != key[:2] or len(recorded[2]) != len(key[2]):
+        return False
+
+    values = collections.defaultdict(list)
+    for name, value in key[2]:
+        values[name].append(value)
+    # Redacted values take what is left once the others are matched.
+    for name, value in sorted(recorded[2], key=lambda pair: pair[1] == REDACTED):
+        if name not in values or not values[name]:
+            return False
+        if value == REDACTED:
+            values[name].pop()
+        elif value in values[name]:
+            values[name].remove(value)
+        else:
+            return False
+    return True
+
+
+class Recorder(object):
+    """
+    A middleware writing the requests of an API and their responses to the
+    log at ``path``, in the ``"ndjson"`` or ``"har"`` ``format``::
+
+        recorder = slumber.Recorder("traffic.ndjson", sample=0.1)
+        api = slumber.API("https://example.com/api/", middlewares=[recorder])
+
+    ``sample`` is the share of the requests recorded. The values of the
+    ``redact_headers`` and ``redact_params`` are replaced, and ``redact``, a
+    callable given each entry as a dict, may change it or return None to
+    leave it out. NDJSON entries are appended as they come, a HAR log is
+    written by ``close``.
+    """
+
+    def __init__(self, path, format="ndjson", sample=1.0, redact_headers=_SENSITIVE_HEADERS, redact_params=(),
+                 redact=None, bodies=True, flush_every=100, seed=None):
+        if format not in ("ndjson", "har"):
+            raise exceptions.ImproperlyConfigured("%s is not an available recording format" % format)
+
+        self.path = path
+        self.format = format
+        self.sample = sample
+        self.redact_headers = frozenset(name.lower() for name in redact_headers)
+        self.redact_params = frozenset(redact_params)
+        self.redact = redact
+        self.bodies = bodies
+        self.flush_every = flush_every
+        self.random = random.Random(seed).random
+        self.recorded = 0
+
+        self._file = None
+        self._unflushed = 0
+        self._entries = []
+
+    def _headers(self, headers):
+        return [[name, REDACTED if name.lower() in self.redact_headers else str(value)]
+                for name, value in (headers or {}).items()]
+
+    def _entry(self, request, resp, started, elapsed):
+        params = dict((name, REDACTED if name in self.redact_params else value)
+                      for name, value in (request.params or {}).items())
+        entry = {
+            "started": started,
+            "elapsed": elapsed,
+            "method": request.method,
+            "url": request.url,
+            "params": params,
+            "request_headers": self._headers(request.headers),
+            "status": resp.status_code,
+            "headers": self._headers(resp.headers),
+        }
+        if self.bodies:
+            if isinstance(request.data, (str, bytes)):
+                entry["body"], entry["body_encoding"] = _encode(request.data)
+            entry["content"], entry["encoding"] = _encode(resp.content)
+        return entry
+
+    async def __call__(self, request, handler):
+        if self.sample < 1.0 and self.random() >= self.sample:
+            return await handler(request)
+
+        started = time.time()
+        start = time.perf_counter()
+        resp = await handler(request)
+        elapsed = time.perf_counter() - start
+
+        entry = self._entry(request, resp, started, elapsed)
+        if self.redact is not None:
+            entry = self.redact(entry)
+        if entry is not None:
+            self.write(entry)
+        return resp
+
+    def write(self, entry):
+        """
+        Adds ``entry`` to the log.
+        """
+        self.recorded += 1
+        if self.format == "har":
+            self._entries.append(entry)
+            return
+
+        if self._file is None:
+            self._file = open(self.path, "a")
+        self._file.write(json.dumps(entry, separators=(",", ":")) + "\n")
+        self._unflushed += 1
+        if self._unflushed >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        self._unflushed = 0
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self):
+        """
+        Writes what is left of the log.
+        """
+        if self.format == "har":
+            with open(self.path, "w") as f:
+                json.dump(to_har(self._entries), f)
+        elif self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def _isoformat(started):
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(started)) + ".%03dZ" % (started % 1 * 1000)
+
+
+def _content_type(headers):
+    for name, value in headers:
+        if name.lower() == "content-type":
+            return value
+    return ""
+
+
+def to_har(entries):
+    """
+    Returns a HAR log of recorded ``entries``.
+    """
+    har = []
+    for entry in entries:
+        wait = entry["elapsed"] * 1000
+        url = entry["url"]
+        if entry["params"]:
+            url += ("&" if "?" in url else "?") + urlencode(entry["params"])
+        request = {
+            "method": entry["method"],
+            "url": url,
+            "httpVersion": "HTTP/1.1",
+            "headers": [{"name": name, "value": value} for name, value in entry["request_headers"]],
+            "queryString": [{"name": name, "value": str(value)} for name, value in entry["params"].items()],
+            "cookies": [],
+            "headersSize": -1,
+            "bodySize": -1,
+        }
+        if "body" in entry:
+            request["postData"] = {"mimeType": _content_type(entry["request_headers"]), "text": entry["body"]}
+            if entry.get("body_encoding"):
+                # HAR has no encoding for request bodies, custom fields start
+                # with an underscore.
+                request["postData"]["_encoding"] = entry["body_encoding"]
+
+        content = {"size": -1, "mimeType": _content_type(entry["headers"]), "text": entry.get("content", "")}
+        if entry.get("encoding"):
+            content["encoding"] = entry["encoding"]
+
+        har.append({
+            "startedDateTime": _isoformat(entry["started"]),
+            "time": wait,
+            "request": request,
+            "response": {
+                "status": entry["status"],
+                "statusText": "",
+                "httpVersion": "HTTP/1.1",
+                "headers": [{"name": name, "value": value} for name, value in entry["headers"]],
+                "cookies": [],
+                "content": content,
+                "redirectURL": "",
+                "headersSize": -1,
+                "bodySize": -1,
+            },
+            "cache": {},
+            "timings": {"send": 0, "wait": wait, "receive": 0},
+        })
+    return {"log": {"version": "1.2", "creator": {"name": "slumber", "version": "1"}, "entries": har}}
+
+
+def _from_har(har):
+    for entry in har["log"]["entries"]:
+        request, response = entry["request"], entry["response"]
+        url = request["url"].split("?")[0]
+        content = response.get("content", {})
+        entry = {
+            "elapsed": entry.get("time", 0) / 1000.0,
+            "method": request["method"],
+            "url": url,
+            "params": dict((item["name"], item["value"]) for item in request.get("queryString", [])),
+            "status": response["status"],
+            "headers": [[item["name"], item["value"]] for item in response.get("headers", [])],
+            "content": content.get("text", ""),
+            "encoding": content.get("encoding"),
+        }
+        if "postData" in request:
+            entry["body"] = request["postData"].get("text", "")
+            entry["body_encoding"] = request["postData"].get("_encoding")
+        yield entry
+
+
+def load(path):
+    """
+    Returns the entries of the NDJSON or HAR log at ``path``.
+    """
+    with open(path) as f:
+        text = f.read()
+    try:
+        document = json.loads(text)
+    except ValueError:
+        # More than one line of NDJSON.
+        document = None
+    if isinstance(document, dict) and "log" in document:
+        return list(_from_har(document))
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+class ReplayTransport(BaseTransport):
+    """
+    Answers requests with the responses recorded in the log at ``path``, or
+    given as ``entries``.
+
+    Requests are matched on their method, url and query, a redacted value
+    matching any value. The recorded responses to the same request are
+    served in turn, starting over after the last one. Each response is
+    delayed by its recorded latency times ``latency``, 0 answering at once,
+    within the ``total`` of the timeout of the request. A request that
+    wasn't recorded raises ``NotRecorded``.
+    """
+
+    def __init__(self, path=None, entries=None, latency=1.0):
+        if entries is None:
+            entries = load(path)
+
+        self.latency = latency
+        self.replayed = 0
+        self._responses = collections.defaultdict(list)
+        self._positions = collections.defaultdict(int)
+        self._redacted = {}
+        for entry in entries:
+            key = _key(entry["method"], entry["url"], entry["params"])
+            self._responses[key].append(entry)
+            if any(value == REDACTED for name, value in key[2]):
+                self._redacted.setdefault(key[:2], []).append(key)
+
+    def _lookup(self, key):
+        if key in self._responses:
+            return key
+        for recorded in self._redacted.get(key[:2], ()):
+            if _matches(recorded, key):
+                return recorded
+        return None
+
+    def _next(self, method, url, params):
+        key = self._lookup(_key(method, url, params))
+        responses = self._responses.get(key)
+        if not responses:
+            raise exceptions.NotRecorded("No recorded response to %s %s" % (method, url))
+
+        position = self._positions[key]
+        self._positions[key] = (position + 1) % len(responses)
+        self.replayed += 1
+        return responses[position]
+
+    async def _respond(self, method, url, params, timeout=None):
+        entry = self._next(method, url, params)
+        if self.latency:
+            delay = entry["elapsed"] * self.latency
+            if timeout is not None and timeout.total is not None and timeout.total < delay:
+                await asyncio.sleep(timeout.total)
+                raise asyncio.TimeoutError("No response within %ss: %s %s" % (timeout.total, method, url))
+            await asyncio.sleep(delay)
+
+        headers = CIMultiDict()
+        for name, value in entry["headers"]:
+            headers.add(name, value)
+        return Response(entry["status"], headers, _decode(entry.get("content", ""), entry.get("encoding")), url=url)
+
+    async def request(self, method, url, data=None, params=None, files=None, headers=None, timeout=None):
+        return await self._respond(method, url, params, timeout)
+
+    @asynccontextmanager
+    async def stream(self, method, url, params=None, headers=None, timeout=None):
+        resp = await self._respond(method, url, params, timeout)
+
+        async def chunks():
+            yield resp.content
+
+        yield StreamedResponse(resp.status_code, resp.headers, chunks(), url=url)
@@ -0,0 +1,112 @@
+"""
+Following ``Location`` headers of created, accepted and see-other responses.
+"""
+import asyncio
+
+try:
+    from urllib.parse import urljoin
+except ImportError:
+    from urlparse import urljoin
+
+from . import exceptions
+from . import timeouts
+from .utils import parse_retry_after
+
+
+class LocationPolicy(object):
+    """
+    What to do with a response whose status is in ``statuses`` and that has a
+    ``Location`` header.
+
+    ``"location"`` returns the absolute url of the Location without requesting
+    it. ``"follow"`` GETs it and returns what it answers, following further
+    Locations up to ``max_hops`` times. ``"poll"`` does the same, except that
+    the Location of a ``202 Accepted`` is a status url that is polled until it
+    stops answering 202. Polls are ``interval`` seconds apart at first, then
+    ``backoff`` times longer each time up to ``max_interval``, unless the
+    server asks otherwise with ``Retry-After``. Polling gives up with
+    ``RequestTimeout`` after ``timeout`` seconds. With a ``scheduler``, the
+    polling is handed to that ``PollScheduler`` instead.
+    """
+
+    modes = ("location", "follow", "poll")
+
+    def __init__(self, mode="follow", max_hops=5, statuses=(201, 202, 303),
+                 interval=0.5, backoff=2.0, max_interval=30.0, timeout=None,
+                 scheduler=None):
+        if mode not in self.modes:
+            raise exceptions.ImproperlyConfigured("%s is not an available location mode" % mode)
+
+        self.mode = mode
+        self.max_hops = max_hops
+        self.statuses = statuses
+        self.interval = interval
+        self.backoff = backoff
+        self.max_interval = max_interval
+        self.timeout = timeout
+        self.scheduler = scheduler
+
+    @classmethod
+    def coerce(cls, value):
+        """
+        Accepts a LocationPolicy, the name of a mode or None.
+        """
+        if value is None or isinstance(value, cls):
+            return value
+        return cls(mode=value)
+
+    def applies(self, resp):
+        return resp.status_code in self.statuses and bool(resp.headers.get("location"))
+
+    def location(self, resource, resp):
+        return urljoin(getattr(resp, "url", None) or resource.url(), resp.headers["location"])
+
+    async def resolve(self, resource, resp):
+        """
+        Returns the response the Location of ``resp`` leads to.
+        """
+        hops = 0
+
+        while self.applies(resp):
+            if hops >= self.max_hops:
+                raise exceptions.TooManyRedirects("More than %s Locations followed from %s" % (self.max_hops, resource.url()))
+            hops += 1
+
+            target = resource(url_override=self.location(resource, resp))
+
+            if self.mode == "poll" and resp.status_code == 202:
+                if self.scheduler is not None:
+                    resp = await self.scheduler.wait(target)
+                else:
+                    resp = await self.poll(target)
+            else:
+                resp = await target._request("GET")
+
+        return resp
+
+    async def poll(self, resource):
+        """
+        GETs ``resource`` until it stops answering ``202 Accepted``.
+        """
+        loop = asyncio.get_event_loop()
+        started = loop.time()
+        interval = self.interval
+
+        while True:
+            resp = await resource._request("GET")
+            if resp.status_code != 202:
+                return resp
+
+            delay = parse_retry_after(resp.headers.get("retry-after"))
+            if delay is None:
+                delay = interval
+                interval = min(interval * self.backoff, self.max_interval)
+
+            if self.timeout is not None and loop.time() - started + delay > self.timeout:
+                raise exceptions.RequestTimeout("Still pending after %ss: %s" % (self.timeout, resource.url()))
+
+            budget = timeouts.remaining()
+            if budget is not None and delay >= budget:
+                raise exceptions.DeadlineExceeded("Deadline exceeded while polling %s" % resource.url())
+
+            await asyncio.sleep(delay)
@@ -0,0 +1,171 @@
+"""
+Spreading a large workload over several processes.
+
+One event loop saturates a core decoding responses long before the network
+is saturated. A ``ProcessRunner`` shards a workload, such as a list of ids,
+over a pool of worker processes, each with its own event loop and `API` built
+from a picklable config, and streams the results back.
+"""
+import asyncio
+import collections
+import concurrent.futures
+import itertools
+import multiprocessing.util
+import os
+
+from . import exceptions
+
+# The event loop and API of a worker process.
+_worker = {}
+
+
+def _build_api(config):
+    from . import API, APIConfig
+
+    if isinstance(config, APIConfig):
+        return config.build()
+    if callable(config):
+        return config()
+    if isinstance(config, dict):
+        return API(**config)
+    raise exceptions.ImproperlyConfigured("%r can't be used to build an API" % (config,))
+
+
+def _start_worker(config):
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    _worker["loop"] = loop
+    _worker["api"] = _build_api(config)
+    multiprocessing.util.Finalize(None, _stop_worker, exitpriority=10)
+
+
+def _stop_worker():
+    loop = _worker.pop("loop", None)
+    api = _worker.pop("api", None)
+    if loop is None:
+        return
+
+    try:
+        if api is not None:
+            loop.run_until_complete(api.close())
+    finally:
+        loop.close()
+
+
+def _run_chunk(worker, items, concurrency):
+    api = _worker["api"]
+
+    async def run():
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one(item):
+            async with semaphore:
+                return await worker(api, item)
+
+        return await asyncio.gather(*[one(item) for item in items])
+
+    return _worker["loop"].run_until_complete(run())
+
+
+def _chunks(items, size):
+    items = iter(items)
+    while True:
+        chunk = list(itertools.islice(items, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class ProcessRunner(object):
+    """
+    Runs ``worker(api, item)``, a coroutine function, for many items over
+    ``processes`` worker processes::
+
+        async def fetch(api, id):
+            return await api.reports(id).get()
+
+        async with slumber.ProcessRunner({"base_url": "https://example.com/api/"}, fetch) as runner:
+            async for report in runner.map(ids):
+                ...
+
+    ``config`` is what every worker builds its `API` from: an ``APIConfig``,
+    a dict of `API` arguments, or a callable returning the `API`. It and
+    ``worker`` are pickled, so they must be module level objects.
+
+    Items are sent to the workers in chunks of ``chunk_size``, and each
+    worker runs up to ``concurrency`` of them at once. At most
+    ``max_pending`` chunks are in flight: the next ones are only sent as
+    results are consumed. Results come in the order of the items, or in the
+    order they complete with ``ordered=False``.
+    """
+
+    def __init__(self, config, worker, processes=None, chunk_size=16, concurrency=16,
+                 max_pending=None, ordered=True, mp_context=None):
+        self.config = config
+        self.worker = worker
+        self.processes = processes or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.concurrency = concurrency
+        self.max_pending = max_pending or 2 * self.processes
+        self.ordered = ordered
+        self.mp_context = mp_context
+
+        self._pool = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def _get_pool(self):
+        if self._pool is None:
+            self._pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.processes, mp_context=self.mp_context,
+                initializer=_start_worker, initargs=(self.config,))
+        return self._pool
+
+    async def map(self, items):
+        """
+        Yields the result of ``worker`` for each of ``items``.
+        """
+        loop = asyncio.get_event_loop()
+        pool = self._get_pool()
+        chunks = _chunks(items, self.chunk_size)
+        pending = collections.deque() if self.ordered else set()
+
+        def submit():
+            chunk = next(chunks, None)
+            if chunk is None:
+                return
+            future = loop.run_in_executor(pool, _run_chunk, self.worker, chunk, self.concurrency)
+            if self.ordered:
+                pending.append(future)
+            else:
+                pending.add(future)
+
+        for _ in range(self.max_pending):
+            submit()
+
+        try:
+            while pending:
+                if self.ordered:
+                    done = [await pending[0]]
+                    pending.popleft()
+                else:
+                    finished, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    pending.difference_update(finished)
+                    done = [future.result() for future in finished]
+
+                for results in done:
+                    submit()
+                    for result in results:
+                        yield result
+        finally:
+            for future in pending:
+                future.cancel()
+
+    async def close(self):
+        if self._pool is not None:
+            pool, self._pool = self._pool, None
+            await asyncio.get_event_loop().run_in_executor(None, pool.shutdown)
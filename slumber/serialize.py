@@ -1,8 +1,9 @@
 from slumber import exceptions
 
+# Availability of each codec, None until it is first looked up.
 _SERIALIZERS = {
     "json": True,
-    "yaml": True,
+    "yaml": None,
 }
 
 try:
@@ -10,10 +11,25 @@ try:
 except ImportError:
     _SERIALIZERS["json"] = False
 
-try:
-    import yaml
-except ImportError:
-    _SERIALIZERS["yaml"] = False
+
+def _is_available(key):
+    # yaml is slow to import, it is only looked up when serializers are first
+    # created and imported when a YAML document is first loaded or dumped.
+    if _SERIALIZERS[key] is None:
+        import importlib.util
+        _SERIALIZERS[key] = importlib.util.find_spec(key) is not None
+    return _SERIALIZERS[key]
+
+
+yaml = None
+
+
+def _import_yaml():
+    global yaml
+    if yaml is None:
+        import yaml as module
+        yaml = module
+    return yaml
 
 
 class BaseSerializer(object):
@@ -59,10 +75,21 @@ class YamlSerializer(BaseSerializer):
     key = "yaml"
 
     def loads(self, data):
-        return yaml.safe_load(str(data))
+        return _import_yaml().safe_load(str(data))
 
     def dumps(self, data):
-        return yaml.dump(data)
+        return _import_yaml().dump(data)
+
+
+_DEFAULT_SERIALIZERS = None
+
+
+def _default_serializers():
+    # Serializers are stateless, every Serializer shares the same instances.
+    global _DEFAULT_SERIALIZERS
+    if _DEFAULT_SERIALIZERS is None:
+        _DEFAULT_SERIALIZERS = [x() for x in [JsonSerializer, YamlSerializer] if _is_available(x.key)]
+    return _DEFAULT_SERIALIZERS
 
 
 class Serializer(object):
@@ -72,7 +99,7 @@ class Serializer(object):
             default = "json" if _SERIALIZERS["json"] else "yaml"
 
         if serializers is None:
-            serializers = [x() for x in [JsonSerializer, YamlSerializer] if _SERIALIZERS[x.key]]
+            serializers = _default_serializers()
 
         if not serializers:
             raise exceptions.SerializerNoAvailable("There are no Available Serializers.")
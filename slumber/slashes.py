@@ -0,0 +1,152 @@
+"""
+Learning whether endpoints want a trailing slash.
+
+``append_slash=True`` costs a redirect on every call to an endpoint that
+wants no slash, ``False`` on every call to one that does. With
+``append_slash="auto"`` the `API` watches for the redirects that only add or
+remove the slash, remembers the preferred form of the url template in a
+``SlashTable`` and requests the right url directly from then on.
+"""
+import collections
+import json
+import re
+
+try:
+    from urllib.parse import urljoin, urlsplit
+except ImportError:
+    from urlparse import urljoin, urlsplit
+
+# Redirects resent as they were, and those only followed by safe verbs.
+_PRESERVING = (307, 308)
+_REWRITING = (301, 302)
+
+# Path segments that look like ids rather than names of resources.
+_ID_SEGMENT = re.compile(r"^(\d+|[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}|"
+                         r"[0-9a-fA-F]{16,})$")
+
+
+def template(url):
+    """
+    Returns the template of ``url``: its scheme, host and path without the
+    trailing slash, with the segments looking like ids replaced by ``*``.
+    """
+    parts = urlsplit(url)
+    segments = parts.path.rstrip("/").split("/")
+    path = "/".join("*" if _ID_SEGMENT.match(segment) else segment for segment in segments)
+    return "%s://%s%s" % (parts.scheme, parts.netloc, path)
+
+
+def toggled(url, other):
+    """
+    Returns whether ``other`` is ``url`` with the trailing slash added or
+    removed, and nothing else changed.
+    """
+    if not isinstance(other, str) or url == other:
+        return False
+
+    # The query is left out, the url of a request doesn't include it.
+    url, other = urlsplit(url), urlsplit(other)
+    if (url.scheme, url.netloc) != (other.scheme, other.netloc):
+        return False
+    return url.path.rstrip("/") == other.path.rstrip("/") and url.path != other.path
+
+
+class SlashTable(object):
+    """
+    The preferred form of up to ``max_entries`` url templates, the least
+    recently used ones being forgotten first.
+
+    ``entries``, a dict of templates to whether they want a slash, restores
+    what ``dump`` returned, so that what was learned survives restarts.
+    ``default`` is the form used for templates not learned yet.
+    """
+
+    def __init__(self, entries=None, max_entries=1024, default=True):
+        self.max_entries = max_entries
+        self.default = default
+        self.learned = 0
+
+        self._entries = collections.OrderedDict()
+        for key, slash in (entries or {}).items():
+            self._set(key, slash)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _set(self, key, slash):
+        self._entries[key] = bool(slash)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def wants_slash(self, url):
+        key = template(url)
+        slash = self._entries.get(key)
+        if slash is None:
+            return self.default
+
+        self._entries.move_to_end(key)
+        return slash
+
+    def learn(self, url, slash):
+        """
+        Records that the template of ``url`` wants a trailing slash or not.
+        """
+        self.learned += 1
+        self._set(template(url), slash)
+
+    def apply(self, url):
+        """
+        Returns ``url`` in the preferred form of its template.
+        """
+        if self.wants_slash(url):
+            return url if url.endswith("/") else url + "/"
+        return url.rstrip("/")
+
+    def learning(self, method, url, send):
+        """
+        Wraps ``send``, called with the request headers and a url, so that
+        the responses to ``url`` teach the table. A redirect only toggling
+        the slash is followed once, which a transport following redirects
+        itself has already done.
+        """
+        async def learn(headers):
+            resp = await send(headers, url)
+
+            if toggled(url, resp.url):
+                self.learn(url, urlsplit(resp.url).path.endswith("/"))
+                return resp
+
+            if resp.status_code in _PRESERVING or (resp.status_code in _REWRITING and method in ("GET", "HEAD")):
+                location = urljoin(url, resp.headers.get("location") or "")
+                if toggled(url, location):
+                    slash = urlsplit(location).path.endswith("/")
+                    self.learn(url, slash)
+                    release = getattr(resp, "release", None)
+                    if release is not None:
+                        release()
+                    return await send(headers, self.apply(url))
+
+            return resp
+
+        return learn
+
+    def dump(self):
+        return dict(self._entries)
+
+    def save(self, path):
+        with open(path, "w") as f:
+            json.dump(self.dump(), f)
+
+    @classmethod
+    def load(cls, path, **kwargs):
+        """
+        Returns the table saved at ``path``, or an empty one if there is
+        none yet.
+        """
+        try:
+            with open(path) as f:
+                entries = json.load(f)
+        except (IOError, ValueError):
+            entries = None
+        return cls(entries=entries, **kwargs)
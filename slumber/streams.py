@@ -0,0 +1,207 @@
+"""
+Subscriptions to Server-Sent Events and newline delimited streams.
+
+Instead of polling a resource, ``Resource.subscribe()`` keeps a GET open and
+decodes what the server pushes as it arrives. Items are only read from the
+connection as fast as they are consumed, and a stream of Server-Sent Events
+is reopened when it ends, resuming from the last event id.
+"""
+import asyncio
+import codecs
+import re
+
+from . import exceptions
+from . import timeouts
+from .timeouts import Timeout
+
+_LINE_BREAK = re.compile(r"\r\n|\r|\n")
+
+EVENT_STREAM = "text/event-stream"
+NDJSON_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl", "application/json-seq")
+
+
+class Event(object):
+    """
+    A Server-Sent Event. ``data`` is decoded by the serializer, unless the
+    subscription was made with ``decode=False``.
+    """
+
+    __slots__ = ("data", "event", "id")
+
+    def __init__(self, data, event="message", id=None):
+        self.data = data
+        self.event = event
+        self.id = id
+
+    def __repr__(self):
+        return "<Event %s id=%r>" % (self.event, self.id)
+
+
+class EventStreamParser(object):
+    """
+    Incremental parser of ``text/event-stream`` bodies.
+    """
+
+    def __init__(self, loads=None, last_event_id=None):
+        self.loads = loads
+        self.last_event_id = last_event_id
+        self.retry = None
+
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._buffer = ""
+        self._data = []
+        self._event = None
+
+    def feed(self, chunk):
+        """
+        Returns the events completed by ``chunk``.
+        """
+        text = self._buffer + self._decoder.decode(chunk)
+
+        # A trailing \r may be the first half of a \r\n.
+        hold = ""
+        if text.endswith("\r"):
+            text, hold = text[:-1], "\r"
+
+        lines = _LINE_BREAK.split(text)
+        self._buffer = lines.pop() + hold
+
+        events = []
+        for line in lines:
+            event = self._line(line)
+            if event is not None:
+                events.append(event)
+        return events
+
+    def _line(self, line):
+        if not line:
+            return self._dispatch()
+
+        if line.startswith(":"):
+            return None
+
+        field, _, value = line.partition(":")
+        if value.startswith(" "):
+            value = value[1:]
+
+        if field == "data":
+            self._data.append(value)
+        elif field == "event":
+            self._event = value
+        elif field == "id":
+            if "\0" not in value:
+                self.last_event_id = value
+        elif field == "retry":
+            if value.isdigit():
+                self.retry = int(value) / 1000.0
+
+        return None
+
+    def _dispatch(self):
+        if not self._data:
+            self._event = None
+            return None
+
+        data = "\n".join(self._data)
+        if self.loads is not None:
+            data = self.loads(data)
+
+        event = Event(data, event=self._event or "message", id=self.last_event_id)
+        self._data = []
+        self._event = None
+        return event
+
+
+class LineParser(object):
+    """
+    Incremental parser of newline delimited bodies, such as NDJSON.
+    """
+
+    last_event_id = None
+    retry = None
+
+    def __init__(self, loads=None):
+        self.loads = loads
+        self._buffer = b""
+
+    def feed(self, chunk):
+        lines = (self._buffer + chunk).split(b"\n")
+        self._buffer = lines.pop()
+
+        items = []
+        for line in lines:
+            # Record separators of json-seq are stripped along with spaces.
+            line = line.strip(b"\r\x1e \t")
+            if line:
+                items.append(self.loads(line) if self.loads is not None else line)
+        return items
+
+
+def _reopens(reconnect, parser):
+    if reconnect is not None:
+        return reconnect
+    # Newline delimited streams have no way to resume, reopening them would
+    # replay them from the start.
+    return not isinstance(parser, LineParser)
+
+
+async def subscribe(resource, mode=None, params=None, last_event_id=None, decode=True,
+                    reconnect=None, retry=3.0, max_retries=None, timeout=None):
+    """
+    Yields the items pushed by ``resource``, see ``Resource.subscribe``.
+    """
+    serializer = resource._store["serializer"].get_serializer(resource._store.get("format"))
+    loads = serializer.loads if decode else None
+    url = resource.url()
+    failures = 0
+
+    timeout = (timeouts.resolve(resource._store.get("timeout"), timeout) or Timeout()).without_total()
+
+    if mode is None:
+        accept = "%s, %s" % (EVENT_STREAM, NDJSON_TYPES[0])
+    elif mode == "sse":
+        accept = EVENT_STREAM
+    elif mode == "ndjson":
+        accept = NDJSON_TYPES[0]
+    else:
+        raise exceptions.ImproperlyConfigured("%s is not an available stream mode" % mode)
+
+    while True:
+        headers = {"accept": accept, "cache-control": "no-cache"}
+        if last_event_id is not None:
+            headers["last-event-id"] = last_event_id
+
+        parser = None
+        try:
+            async with resource._stream(url, params=params, headers=headers, timeout=timeout) as resp:
+                # Per the Server-Sent Events spec, 204 means don't reconnect.
+                if resp.status_code == 204:
+                    return
+
+                content_type = (resp.headers.get("content-type") or "").split(";")[0].strip()
+                if mode == "sse" or (mode is None and content_type == EVENT_STREAM):
+                    parser = EventStreamParser(loads, last_event_id=last_event_id)
+                else:
+                    parser = LineParser(loads)
+
+                failures = 0
+                async for chunk in resp.chunks:
+                    for item in parser.feed(chunk):
+                        last_event_id = parser.last_event_id
+                        yield item
+
+                if parser.retry is not None:
+                    retry = parser.retry
+        except exceptions.PERMANENT_ERRORS:
+            raise
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            failures += 1
+            if not _reopens(reconnect, parser) or (max_retries is not None and failures > max_retries):
+                raise
+
+        if not _reopens(reconnect, parser):
+            return
+
+        await asyncio.sleep(retry)
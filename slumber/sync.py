@@ -0,0 +1,161 @@
+"""
+Incremental mirrors of collections.
+
+Keeping a local copy of a collection by GETting all of it on every cycle
+takes as long as the collection is large. A ``Mirror`` only fetches what
+changed: the records updated since the last cycle when the endpoint takes
+such a parameter, or the pages whose ETag changed otherwise, and merges them
+into a local store keyed by id, from which records are then looked up.
+"""
+import asyncio
+
+try:
+    from urllib.parse import urlencode
+except ImportError:
+    from urllib import urlencode
+
+from . import paging
+
+_MISSING = object()
+
+
+class Mirror(object):
+    """
+    A local copy of the collection at ``resource``, brought up to date by
+    ``sync``, and read like a mapping of the records by their ``id_field``.
+
+    ``since`` is the query parameter taking the greatest ``updated_field``
+    seen so far, so that only the records updated after it are fetched.
+    Deletions are seen through tombstones, records whose ``deleted_field``
+    is set, or by a full reconcile every ``reconcile_every`` cycles, which
+    walks the whole collection and drops the records it no longer holds.
+    Without ``since`` every cycle is a full reconcile, where pages are
+    fetched conditionally on their ETag and unchanged ones cost a 304.
+
+    ``records`` and ``next`` locate the records and the next page of the
+    responses as with ``Columnar``. ``params`` are sent with the first
+    page. ``store`` is any mutable mapping, a dict by default.
+    """
+
+    def __init__(self, resource, id_field="id", since=None, updated_field="updated_at", deleted_field=None,
+                 reconcile_every=None, records=None, next=None, params=None, store=None):
+        self.resource = resource
+        self.id_field = id_field
+        self.since = since
+        self.updated_field = updated_field
+        self.deleted_field = deleted_field
+        self.reconcile_every = reconcile_every
+        self.records = records
+        self.next = next
+        self.params = params or {}
+        self.store = store if store is not None else {}
+
+        self.watermark = None
+        self.cycles = 0
+        # The ETag, next url and ids of each page of the last full walk.
+        self._pages = {}
+        self._lock = None
+
+    def __getitem__(self, id):
+        return self.store[id]
+
+    def __contains__(self, id):
+        return id in self.store
+
+    def __len__(self):
+        return len(self.store)
+
+    def __iter__(self):
+        return iter(self.store)
+
+    def get(self, id, default=None):
+        """
+        Returns the local copy of the record ``id``.
+        """
+        return self.store.get(id, default)
+
+    def _full(self):
+        if self.since is None or self.watermark is None:
+            return True
+        return bool(self.reconcile_every) and self.cycles % self.reconcile_every == 0
+
+    async def sync(self, full=None):
+        """
+        Runs a cycle, a full reconcile when ``full`` or when it is due, and
+        returns what it did: the pages fetched and not modified, and the
+        records updated and deleted.
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        # Concurrent cycles would merge the same pages twice.
+        async with self._lock:
+            return await self._sync(self._full() if full is None else full)
+
+    def _merge(self, records, stats, watermark):
+        ids = []
+        for record in records:
+            id = record[self.id_field]
+            updated = record.get(self.updated_field)
+            if updated is not None and (watermark is None or updated > watermark):
+                watermark = updated
+
+            if self.deleted_field is not None and record.get(self.deleted_field):
+                if self.store.pop(id, _MISSING) is not _MISSING:
+                    stats["deleted"] += 1
+                continue
+
+            self.store[id] = record
+            ids.append(id)
+            stats["updated"] += 1
+        return ids, watermark
+
+    async def _sync(self, full):
+        stats = {"pages": 0, "not_modified": 0, "updated": 0, "deleted": 0}
+        watermark = self.watermark
+        resource = self.resource
+        params = dict(self.params)
+        if not full:
+            params[self.since] = self.watermark
+
+        key = resource.url() + ("?" + urlencode(sorted(params.items())) if params else "")
+        pages = {}
+        seen = set()
+
+        while key is not None:
+            page = self._pages.get(key) if full else None
+            headers = {"if-none-match": page[0]} if page is not None else None
+
+            resp, body = await resource.get(raw=True, cache=False, headers=headers, params=params)
+            stats["pages"] += 1
+
+            if resp.status_code == 304 and page is not None:
+                stats["not_modified"] += 1
+                etag, url, ids = page
+            else:
+                ids, watermark = self._merge(paging.records(body, self.records), stats, watermark)
+                url = paging.next_url(resp, body, resource.url(), self.next)
+                etag = resp.headers.get("etag")
+            body = None
+
+            if full:
+                seen.update(ids)
+                if etag:
+                    pages[key] = (etag, url, ids)
+
+            key = url
+            if url is not None:
+                resource = resource(url_override=url)
+                params = {}
+
+        if full:
+            for id in [id for id in self.store if id not in seen]:
+                del self.store[id]
+                stats["deleted"] += 1
+            self._pages = pages
+
+        # Only moved once the cycle went through, so that a failed one is
+        # fetched again.
+        self.watermark = watermark
+        self.cycles += 1
+        return stats
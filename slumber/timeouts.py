@@ -0,0 +1,132 @@
+"""
+Timeout budgets and deadline propagation.
+
+A ``Timeout`` bounds a single request. A ``deadline`` bounds every request
+made while it is active, so nested slumber calls issued while handling one
+inbound request all share what is left of a single budget.
+"""
+import contextvars
+import time
+
+_deadline = contextvars.ContextVar("slumber_deadline", default=None)
+
+
+class Timeout(object):
+    """
+    Time budget for a single request, in seconds.
+
+    ``total`` bounds the whole request, ``connect`` the time spent getting a
+    connection and ``read`` the time between two reads of the response. Any
+    of them left as ``None`` is not enforced.
+    """
+
+    __slots__ = ("total", "connect", "read")
+
+    def __init__(self, total=None, connect=None, read=None):
+        self.total = total
+        self.connect = connect
+        self.read = read
+
+    def __repr__(self):
+        return "Timeout(total=%r, connect=%r, read=%r)" % (self.total, self.connect, self.read)
+
+    def __eq__(self, other):
+        if not isinstance(other, Timeout):
+            return NotImplemented
+        return (self.total, self.connect, self.read) == (other.total, other.connect, other.read)
+
+    @classmethod
+    def coerce(cls, value):
+        """
+        Accepts a Timeout, a number of seconds (used as the total) or None.
+        """
+        if value is None or isinstance(value, cls):
+            return value
+        return cls(total=value)
+
+    def merge(self, other):
+        """
+        Returns a new Timeout where the fields set on ``other`` win.
+        """
+        if other is None:
+            return self
+
+        return Timeout(
+            total=other.total if other.total is not None else self.total,
+            connect=other.connect if other.connect is not None else self.connect,
+            read=other.read if other.read is not None else self.read,
+        )
+
+    def without_total(self):
+        """
+        Returns this timeout without its total, for streams and downloads
+        which have no total duration. Passing it on to the transport also
+        lifts the total of the transport default.
+        """
+        return Timeout(connect=self.connect, read=self.read)
+
+    def capped(self, budget=None):
+        """
+        Returns the timeout for a request, with the total capped to what is
+        left of ``budget``.
+        """
+        total = self.total
+        if budget is not None and (total is None or budget < total):
+            total = budget
+
+        return Timeout(total=total, connect=self.connect, read=self.read)
+
+
+def resolve(default, override):
+    """
+    Combines the timeout configured on a resource with a per-call override.
+    """
+    default = Timeout.coerce(default)
+    override = Timeout.coerce(override)
+
+    if default is None:
+        return override
+
+    return default.merge(override)
+
+
+class deadline(object):
+    """
+    Bounds every slumber request made inside the block to a shared budget of
+    ``seconds``. Deadlines nest, an inner one can only shorten the budget::
+
+        with slumber.deadline(2.5):
+            user = await api.users(1).get()
+            posts = await api.posts.get(author=user["id"])
+
+    Tasks created inside the block inherit the deadline, as contextvars are
+    copied into them.
+    """
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self._token = None
+
+    def __enter__(self):
+        expires = time.monotonic() + self.seconds
+        current = _deadline.get()
+        if current is not None and current < expires:
+            expires = current
+
+        self._token = _deadline.set(expires)
+        return self
+
+    def __exit__(self, *exc_info):
+        _deadline.reset(self._token)
+        self._token = None
+
+
+def remaining():
+    """
+    Returns the seconds left before the active deadline, or None if there is
+    no deadline.
+    """
+    expires = _deadline.get()
+    if expires is None:
+        return None
+    return expires - time.monotonic()
@@ -0,0 +1,258 @@
+"""
+Transports send the requests built by a ``Resource`` over the wire.
+
+Every transport returns a ``Response`` with the body already read, so
+serializers, exceptions and the verb methods work the same whatever client is
+used underneath.
+"""
+import asyncio
+from contextlib import asynccontextmanager
+
+import aiohttp
+
+from . import exceptions
+from .utils import iterator
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+
+class Response(object):
+    """
+    A response whose body has been read.
+
+    ``raw`` is the response object of the client library that produced it.
+    """
+
+    __slots__ = ("status_code", "headers", "content", "url", "raw")
+
+    def __init__(self, status_code, headers, content, url=None, raw=None):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.url = url
+        self.raw = raw
+
+    def __repr__(self):
+        return "<Response [%s]>" % self.status_code
+
+    def release(self):
+        pass
+
+
+class StreamedResponse(object):
+    """
+    A response whose body is read as it arrives, by iterating over
+    ``chunks``.
+    """
+
+    __slots__ = ("status_code", "headers", "chunks", "url", "raw")
+
+    def __init__(self, status_code, headers, chunks, url=None, raw=None):
+        self.status_code = status_code
+        self.headers = headers
+        self.chunks = chunks
+        self.url = url
+        self.raw = raw
+
+    def __repr__(self):
+        return "<StreamedResponse [%s]>" % self.status_code
+
+    async def read(self):
+        """
+        Reads the rest of the body.
+        """
+        return b"".join([chunk async for chunk in self.chunks])
+
+
+class BaseTransport(object):
+    """
+    Sends a request and returns its ``Response``.
+
+    ``data`` is the serialized body, or a dict of form fields when ``files`` is
+    given. ``timeout`` is a ``slumber.Timeout``. Timeouts are reported by
+    raising ``asyncio.TimeoutError``.
+    """
+
+    async def request(self, method, url, data=None, params=None, files=None, headers=None, timeout=None):
+        raise NotImplementedError()
+
+    def stream(self, method, url, params=None, headers=None, timeout=None):
+        """
+        Returns an async context manager of the ``StreamedResponse`` to a
+        request without a body, for responses that are consumed as they
+        arrive.
+        """
+        raise NotImplementedError()
+
+    async def websocket(self, url, params=None, headers=None, timeout=None, heartbeat=None):
+        """
+        Opens a WebSocket to ``url``, returning an ``aiohttp``
+        ``ClientWebSocketResponse`` or an object with the same interface.
+        """
+        raise NotImplementedError("%s does not support WebSockets" % self.__class__.__name__)
+
+    async def close(self):
+        pass
+
+
+def _make_form(data, files):
+    form = aiohttp.FormData()
+    for key, value in iterator(data or {}):
+        form.add_field(key, str(value))
+    for key, value in iterator(files):
+        form.add_field(key, value)
+    return form
+
+
+class AiohttpTransport(BaseTransport):
+    """
+    Transport over an ``aiohttp.ClientSession``, HTTP/1.1 with keep-alive.
+
+    The session is created on the first request unless one is given, as
+    ``aiohttp`` needs a running event loop to create it.
+    """
+
+    allow_redirects = True
+
+    def __init__(self, session=None, auth=None, **session_kwargs):
+        if isinstance(auth, tuple):
+            auth = aiohttp.BasicAuth(*auth)
+
+        self.session = session
+        self.auth = auth
+        self.session_kwargs = session_kwargs
+
+    def get_session(self):
+        if self.session is None:
+            self.session = aiohttp.ClientSession(**self.session_kwargs)
+        return self.session
+
+    async def request(self, method, url, data=None, params=None, files=None, headers=None, timeout=None):
+        kwargs = {}
+
+        if files:
+            data = _make_form(data, files)
+
+        if timeout is not None:
+            kwargs["timeout"] = aiohttp.ClientTimeout(total=timeout.total, connect=timeout.connect,
+                                                      sock_read=timeout.read)
+
+        if self.auth is not None:
+            kwargs["auth"] = self.auth
+
+        async with self.get_session().request(method, url, data=data, params=params, headers=headers,
+                                              allow_redirects=self.allow_redirects, **kwargs) as resp:
+            content = await resp.read()
+
+        return Response(resp.status, resp.headers, content, url=str(resp.url), raw=resp)
+
+    @asynccontextmanager
+    async def stream(self, method, url, params=None, headers=None, timeout=None):
+        kwargs = {}
+
+        if timeout is not None:
+            kwargs["timeout"] = aiohttp.ClientTimeout(total=timeout.total, connect=timeout.connect,
+                                                      sock_read=timeout.read)
+
+        if self.auth is not None:
+            kwargs["auth"] = self.auth
+
+        async with self.get_session().request(method, url, params=params, headers=headers,
+                                              allow_redirects=self.allow_redirects, **kwargs) as resp:
+            yield StreamedResponse(resp.status, resp.headers, resp.content.iter_any(), url=str(resp.url), raw=resp)
+
+    async def websocket(self, url, params=None, headers=None, timeout=None, heartbeat=None):
+        kwargs = {}
+
+        if self.auth is not None:
+            kwargs["auth"] = self.auth
+
+        connect = self.get_session().ws_connect(url, params=params, headers=headers, heartbeat=heartbeat, **kwargs)
+
+        handshake = (timeout.connect or timeout.total) if timeout is not None else None
+        if handshake is None:
+            return await connect
+        return await asyncio.wait_for(connect, handshake)
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+
+
+class HttpxTransport(BaseTransport):
+    """
+    Transport over an ``httpx.AsyncClient`` speaking HTTP/2, so that many
+    concurrent requests to a host are multiplexed over a few connections.
+
+    Requires ``httpx`` with its ``http2`` extra. With ``prior_knowledge`` the
+    client skips HTTP/1.1 entirely, which is what cleartext ``http://`` servers
+    need to be spoken to in HTTP/2.
+    """
+
+    def __init__(self, client=None, auth=None, prior_knowledge=False, **client_kwargs):
+        if httpx is None:
+            raise exceptions.ImproperlyConfigured("httpx is required for the HttpxTransport")
+
+        if client is None:
+            client_kwargs.setdefault("http2", True)
+            if prior_knowledge:
+                client_kwargs["http1"] = False
+            client = httpx.AsyncClient(**client_kwargs)
+
+        self.client = client
+        self.auth = auth
+
+    async def request(self, method, url, data=None, params=None, files=None, headers=None, timeout=None):
+        kwargs = {}
+
+        if files:
+            kwargs["data"] = data
+            kwargs["files"] = files
+        elif data is not None:
+            kwargs["content"] = data
+
+        if timeout is not None:
+            kwargs["timeout"] = httpx.Timeout(timeout.total, connect=timeout.connect, read=timeout.read)
+
+        if self.auth is not None:
+            kwargs["auth"] = self.auth
+
+        request = self.client.request(method, url, params=params, headers=headers, **kwargs)
+
+        try:
+            if timeout is None or timeout.total is None:
+                resp = await request
+            else:
+                resp = await asyncio.wait_for(request, timeout.total)
+        except httpx.TimeoutException as exc:
+            raise asyncio.TimeoutError(str(exc))
+
+        return Response(resp.status_code, resp.headers, resp.content, url=str(resp.url), raw=resp)
+
+    @asynccontextmanager
+    async def stream(self, method, url, params=None, headers=None, timeout=None):
+        kwargs = {}
+
+        if timeout is not None:
+            kwargs["timeout"] = httpx.Timeout(timeout.total, connect=timeout.connect, read=timeout.read)
+
+        if self.auth is not None:
+            kwargs["auth"] = self.auth
+
+        async with self.client.stream(method, url, params=params, headers=headers, **kwargs) as resp:
+            yield StreamedResponse(resp.status_code, resp.headers, resp.aiter_bytes(), url=str(resp.url), raw=resp)
+
+    async def close(self):
+        await self.client.aclose()
+
+
+def __getattr__(name):
+    # The in-process transports moved to slumber.inprocess, which is only
+    # imported when they are used.
+    if name in ("AiohttpAppTransport", "ASGITransport"):
+        from . import inprocess
+        return getattr(inprocess, name)
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
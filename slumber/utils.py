@@ -1,4 +1,5 @@
 import posixpath
+import time
 
 try:
     from urllib.parse import urlsplit, urlunsplit
@@ -30,3 +31,27 @@ def iterator(d):
         return d.iteritems()
     except AttributeError:
         return d.items()
+
+def parse_retry_after(value):
+    """
+    Returns the seconds to wait from a Retry-After header value, given either
+    as seconds or as an HTTP date, or None if it can't be parsed.
+    """
+    if not value:
+        return None
+
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+
+    from email.utils import parsedate_to_datetime
+
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    if when is None:
+        return None
+    return max(when.timestamp() - time.time(), 0.0)
@@ -0,0 +1,201 @@
+"""
+WebSocket connections to resources.
+
+``Resource.websocket()`` opens a WebSocket on the url of the resource, through
+the transport of the API so it shares its session, connection pool and auth.
+Messages are encoded and decoded by the serializer of the resource, and
+``WebSocket.call`` matches replies to requests by id, so many RPCs can be in
+flight on one connection without the overhead of an HTTP request each.
+"""
+import asyncio
+import itertools
+
+import aiohttp
+
+from . import exceptions
+from . import timeouts
+
+
+def websocket_url(url):
+    """
+    Turns an http(s) url into the ws(s) url of the same resource.
+    """
+    if url.startswith("https://"):
+        return "wss://" + url[len("https://"):]
+    elif url.startswith("http://"):
+        return "ws://" + url[len("http://"):]
+    return url
+
+
+class WebSocket(object):
+    """
+    A WebSocket to a resource.
+
+    It connects when awaited or entered, and is closed when the ``async with``
+    block exits::
+
+        async with api.prices.websocket() as ws:
+            await ws.send({"subscribe": "EURUSD"})
+            async for message in ws:
+                print(message)
+
+    Replies to ``call`` carry the id of their request in ``id_field``, every
+    other message is returned by ``receive`` and iteration. At most
+    ``max_queue`` of those are buffered. The connection is read whether they
+    are consumed or not, so that replies keep reaching ``call``, and once the
+    buffer is full the oldest message is dropped and counted in ``dropped``.
+    """
+
+    def __init__(self, resource, params=None, format=None, id_field="id", heartbeat=None,
+                 timeout=None, max_queue=1024):
+        self.url = websocket_url(resource.url())
+        self.params = params
+        self.serializer = resource._store["serializer"].get_serializer(format or resource._store.get("format"))
+        self.id_field = id_field
+        self.heartbeat = heartbeat
+        self.timeout = timeouts.resolve(resource._store.get("timeout"), timeout)
+        self.max_queue = max_queue
+
+        self._resource = resource
+        self._transport = resource._store["transport"]
+        self._ws = None
+        self._ids = itertools.count(1)
+        self.dropped = 0
+        self._pending = {}
+        self._messages = None
+        self._reader = None
+        self._closed = None
+
+    def __await__(self):
+        return self.connect().__await__()
+
+    async def __aenter__(self):
+        return await self.connect()
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return await self.receive()
+        except exceptions.ConnectionClosed:
+            raise StopAsyncIteration
+
+    @property
+    def closed(self):
+        return self._ws is None or self._ws.closed
+
+    async def connect(self):
+        if self._ws is None:
+            headers = await self._resource._authorize("GET", self.url, self.params, None)
+            self._ws = await self._transport.websocket(self.url, params=self.params, headers=headers,
+                                                       timeout=self.timeout, heartbeat=self.heartbeat)
+            self._messages = asyncio.Queue(self.max_queue)
+            self._closed = asyncio.Event()
+            self._reader = asyncio.ensure_future(self._read())
+        return self
+
+    async def send(self, data):
+        """
+        Sends ``data`` encoded by the serializer, as a text or a binary
+        message depending on what the serializer produces.
+        """
+        if self.closed:
+            raise exceptions.ConnectionClosed("WebSocket to %s is closed" % self.url)
+
+        payload = self.serializer.dumps(data)
+        if isinstance(payload, bytes):
+            await self._ws.send_bytes(payload)
+        else:
+            await self._ws.send_str(payload)
+
+    async def receive(self):
+        """
+        Returns the next decoded message that is not a reply to a ``call``.
+        """
+        if self._messages is None:
+            raise exceptions.ConnectionClosed("WebSocket to %s is not connected" % self.url)
+
+        if self._messages.empty() and self._closed.is_set():
+            raise exceptions.ConnectionClosed("WebSocket to %s is closed" % self.url)
+
+        get = asyncio.ensure_future(self._messages.get())
+        closed = asyncio.ensure_future(self._closed.wait())
+        try:
+            await asyncio.wait([get, closed], return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            closed.cancel()
+            if not get.done():
+                get.cancel()
+
+        if get.cancelled() or not get.done():
+            raise exceptions.ConnectionClosed("WebSocket to %s is closed" % self.url)
+        return get.result()
+
+    async def call(self, data, timeout=None):
+        """
+        Sends ``data``, a dict, and returns the message replying to it. An id
+        is set in ``data`` unless it already has one.
+        """
+        if self.id_field not in data:
+            data = dict(data)
+            data[self.id_field] = next(self._ids)
+
+        key = data[self.id_field]
+        future = asyncio.get_event_loop().create_future()
+        self._pending[key] = future
+
+        if timeout is None and self.timeout is not None:
+            timeout = self.timeout.total
+        budget = timeouts.remaining()
+        if budget is not None and (timeout is None or budget < timeout):
+            timeout = budget
+
+        try:
+            await self.send(data)
+            if timeout is None:
+                return await future
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            if budget is not None and timeouts.remaining() <= 0:
+                raise exceptions.DeadlineExceeded("Deadline exceeded: call %r on %s" % (key, self.url))
+            raise exceptions.RequestTimeout("Timed out: call %r on %s" % (key, self.url))
+        finally:
+            self._pending.pop(key, None)
+
+    async def close(self):
+        if self._ws is None:
+            return
+
+        await self._ws.close()
+        if self._reader is not None:
+            await asyncio.gather(self._reader, return_exceptions=True)
+
+    async def _read(self):
+        try:
+            async for message in self._ws:
+                if message.type in (aiohttp.WSMsgType.TEXT, aiohttp.WSMsgType.BINARY):
+                    self._dispatch(self.serializer.loads(message.data))
+                elif message.type == aiohttp.WSMsgType.ERROR:
+                    break
+        finally:
+            self._closed.set()
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(exceptions.ConnectionClosed("WebSocket to %s is closed" % self.url))
+
+    def _dispatch(self, message):
+        if isinstance(message, dict):
+            future = self._pending.get(message.get(self.id_field))
+            if future is not None:
+                if not future.done():
+                    future.set_result(message)
+                return
+
+        if self._messages.full():
+            self._messages.get_nowait()
+            self.dropped += 1
+        self._messages.put_nowait(message)
@@ -9,10 +9,66 @@ def full_suite():
     from .resource import ResourceTestCase
     from .serializer import ResourceTestCase as SerializerTestCase
     from .utils import UtilsTestCase
+    from .timeouts import TimeoutTestCase
+    from .hedging import HedgingTestCase
+    from .balancing import BalancingTestCase
+    from .transports import AiohttpTransportTestCase, HttpxTransportTestCase
+    from .transports import AiohttpAppTransportTestCase, ASGITransportTestCase
+    from .redirects import LocationPolicyTestCase
+    from .polling import PollSchedulerTestCase
+    from .streams import EventStreamParserTestCase, SubscribeTestCase
+    from .websockets import WebSocketTestCase
+    from .caching import DiskCacheTestCase
+    from .idempotency import IdempotencyTestCase
+    from .runners import ProcessRunnerTestCase
+    from .config import APIConfigTestCase
+    from .imports import ImportTestCase
+    from .slashes import SlashTableTestCase
+    from .limits import ConcurrencyLimiterTestCase
+    from .priorities import PrioritySchedulerTestCase
+    from .columnar import ColumnarTestCase
+    from .sync import MirrorTestCase
+    from .downloads import DownloadTestCase
+    from .auth import AuthTestCase
+    from .middleware import MiddlewareTestCase
+    from .recording import RecordingTestCase
 
     resourcesuite = unittest.TestLoader().loadTestsFromTestCase(ResourceTestCase)
     serializersuite = unittest.TestLoader().loadTestsFromTestCase(SerializerTestCase)
     utilssuite = unittest.TestLoader().loadTestsFromTestCase(UtilsTestCase)
+    timeoutsuite = unittest.TestLoader().loadTestsFromTestCase(TimeoutTestCase)
+    hedgingsuite = unittest.TestLoader().loadTestsFromTestCase(HedgingTestCase)
+    balancingsuite = unittest.TestLoader().loadTestsFromTestCase(BalancingTestCase)
+    aiohttpsuite = unittest.TestLoader().loadTestsFromTestCase(AiohttpTransportTestCase)
+    httpxsuite = unittest.TestLoader().loadTestsFromTestCase(HttpxTransportTestCase)
+    appsuite = unittest.TestLoader().loadTestsFromTestCase(AiohttpAppTransportTestCase)
+    asgisuite = unittest.TestLoader().loadTestsFromTestCase(ASGITransportTestCase)
+    redirectssuite = unittest.TestLoader().loadTestsFromTestCase(LocationPolicyTestCase)
+    pollingsuite = unittest.TestLoader().loadTestsFromTestCase(PollSchedulerTestCase)
+    parsersuite = unittest.TestLoader().loadTestsFromTestCase(EventStreamParserTestCase)
+    subscribesuite = unittest.TestLoader().loadTestsFromTestCase(SubscribeTestCase)
+    websocketsuite = unittest.TestLoader().loadTestsFromTestCase(WebSocketTestCase)
+    cachingsuite = unittest.TestLoader().loadTestsFromTestCase(DiskCacheTestCase)
+    idempotencysuite = unittest.TestLoader().loadTestsFromTestCase(IdempotencyTestCase)
+    runnersuite = unittest.TestLoader().loadTestsFromTestCase(ProcessRunnerTestCase)
+    configsuite = unittest.TestLoader().loadTestsFromTestCase(APIConfigTestCase)
+    importsuite = unittest.TestLoader().loadTestsFromTestCase(ImportTestCase)
+    slashsuite = unittest.TestLoader().loadTestsFromTestCase(SlashTableTestCase)
+    limitsuite = unittest.TestLoader().loadTestsFromTestCase(ConcurrencyLimiterTestCase)
+    prioritysuite = unittest.TestLoader().loadTestsFromTestCase(PrioritySchedulerTestCase)
+    columnarsuite = unittest.TestLoader().loadTestsFromTestCase(ColumnarTestCase)
+    syncsuite = unittest.TestLoader().loadTestsFromTestCase(MirrorTestCase)
+    downloadsuite = unittest.TestLoader().loadTestsFromTestCase(DownloadTestCase)
+    authsuite = unittest.TestLoader().loadTestsFromTestCase(AuthTestCase)
+    middlewaresuite = unittest.TestLoader().loadTestsFromTestCase(MiddlewareTestCase)
+    recordingsuite = unittest.TestLoader().loadTestsFromTestCase(RecordingTestCase)
 
-    return unittest.TestSuite([resourcesuite, serializersuite, utilssuite])
+    return unittest.TestSuite([resourcesuite, serializersuite, utilssuite, timeoutsuite,
+                               hedgingsuite, balancingsuite, aiohttpsuite, httpxsuite,
+                               appsuite, asgisuite, redirectssuite, pollingsuite,
+                               parsersuite, subscribesuite, websocketsuite, cachingsuite,
+                               idempotencysuite, runnersuite, configsuite,
+                               importsuite, slashsuite, limitsuite, prioritysuite,
+                               columnarsuite, syncsuite, downloadsuite, authsuite,
+                               middlewaresuite, recordingsuite])
 
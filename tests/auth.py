@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import base64
+import hashlib
+import hmac
+import mock
+import slumber
+import slumber.transports
+import unittest2 as unittest
+
+from .helpers import make_response, run
+
+
+class Clock(object):
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_api(auth, valid=None):
+    """
+    An API whose transport answers 401 unless the request carries one of the
+    ``valid`` authorizations, recording the ones it got.
+    """
+    transport = mock.Mock(spec=slumber.transports.BaseTransport)
+    seen = []
+
+    async def request(method, url, headers=None, **kwargs):
+        await asyncio.sleep(0)
+        seen.append(headers.get("authorization"))
+        if valid is not None and headers.get("authorization") not in valid:
+            return make_response(401)
+        return make_response()
+
+    transport.request.side_effect = request
+    return slumber.API("http://example/api", transport=transport, auth=auth), seen
+
+
+class AuthTestCase(unittest.TestCase):
+
+    def token_auth(self, **kwargs):
+        tokens = []
+
+        async def fetch():
+            await asyncio.sleep(0)
+            tokens.append("t%s" % (len(tokens) + 1))
+            return tokens[-1], 100
+
+        return slumber.TokenAuth(fetch, **kwargs), tokens
+
+    def test_bearer(self):
+        api, seen = make_api(slumber.BearerAuth("secret"))
+        run(api.users.get())
+        self.assertEqual(seen, ["Bearer secret"])
+
+    def test_tokens_are_cached(self):
+        auth, tokens = self.token_auth()
+        api, seen = make_api(auth)
+
+        async def call():
+            await asyncio.gather(*[api.users(n).get() for n in range(10)])
+            await api.users.get()
+
+        run(call())
+        self.assertEqual(tokens, ["t1"])
+        self.assertEqual(seen, ["Bearer t1"] * 11)
+
+    def test_proactive_refresh(self):
+        clock = Clock()
+        auth, tokens = self.token_auth(refresh_ahead=30, leeway=5, clock=clock)
+        api, seen = make_api(auth)
+
+        async def call():
+            await api.users.get()
+            clock.now = 70.0
+            # Within refresh_ahead of the expiry, the current token is still
+            # sent while the next one is fetched.
+            await api.users.get()
+            await asyncio.sleep(0.01)
+            await api.users.get()
+            clock.now = 200.0
+            await api.users.get()
+
+        run(call())
+        self.assertEqual(seen, ["Bearer t1", "Bearer t1", "Bearer t2", "Bearer t3"])
+
+    def test_single_refresh_on_concurrent_401s(self):
+        auth, tokens = self.token_auth()
+        api, seen = make_api(auth, valid=["Bearer t2"])
+
+        async def call():
+            await auth.authorization()
+            return await asyncio.gather(*[api.users(n).get() for n in range(5)])
+
+        results = run(call())
+        self.assertEqual(results, [{"result": "a"}] * 5)
+        self.assertEqual(tokens, ["t1", "t2"])
+        self.assertEqual(sorted(seen), ["Bearer t1"] * 5 + ["Bearer t2"] * 5)
+
+    def test_replayed_once(self):
+        auth, tokens = self.token_auth()
+        api, seen = make_api(auth, valid=[])
+
+        with self.assertRaises(slumber.exceptions.HttpClientError):
+            run(api.users.get())
+        self.assertEqual(seen, ["Bearer t1", "Bearer t2"])
+
+    def test_oauth2_client_credentials(self):
+        transport = mock.Mock(spec=slumber.transports.BaseTransport)
+
+        async def request(method, url, **kwargs):
+            if url == "http://auth/token":
+                return make_response(content='{"access_token": "abc", "expires_in": 3600}')
+            return make_response()
+
+        transport.request.side_effect = request
+        auth = slumber.OAuth2ClientCredentials("http://auth/token", "client", "secret", scope=["read", "write"])
+        api = slumber.API("http://example/api", transport=transport, auth=auth)
+
+        run(api.users.get())
+        run(api.users.get())
+
+        self.assertEqual(transport.request.call_count, 3)
+        token_call = transport.request.call_args_list[0]
+        self.assertEqual(token_call[0], ("POST", "http://auth/token"))
+        self.assertEqual(token_call[1]["data"], "grant_type=client_credentials&scope=read+write")
+        self.assertEqual(token_call[1]["headers"]["authorization"],
+                         "Basic " + base64.b64encode(b"client:secret").decode("ascii"))
+        transport.request.assert_called_with("GET", "http://example/api/users/", data=None, files=None,
+                                             params={}, headers={"accept": "application/json",
+                                                                 "authorization": "Bearer abc"})
+
+    def test_hmac_signature(self):
+        auth = slumber.HMACAuth("key-1", "secret")
+        api, seen = make_api(auth)
+        run(api.users.post({"name": "a"}, q=1))
+
+        headers = api._store["transport"].request.call_args[1]["headers"]
+        body = b'{"name": "a"}'
+        self.assertEqual(headers["x-content-sha256"], base64.b64encode(hashlib.sha256(body).digest()).decode())
+
+        message = "\n".join(["POST", "/api/users/?q=1", headers["date"], headers["x-content-sha256"]])
+        signature = base64.b64encode(hmac.new(b"secret", message.encode(), "sha256").digest()).decode()
+        self.assertEqual(headers["authorization"], 'HMAC keyId="key-1",signature="%s"' % signature)
+
+    def test_hmac_caches_body_digests(self):
+        auth = slumber.HMACAuth("key-1", "secret", cache_size=1)
+        body = b"x" * 1000
+
+        with mock.patch("hashlib.sha256", wraps=hashlib.sha256) as sha256:
+            for _ in range(3):
+                run(auth.apply("PUT", "http://example/a", None, body, {}))
+            self.assertEqual(sha256.call_count, 1)
+            run(auth.apply("PUT", "http://example/a", None, b"y", {}))
+            run(auth.apply("PUT", "http://example/a", None, body, {}))
+            self.assertEqual(sha256.call_count, 3)
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import random
+import mock
+import slumber
+import slumber.transports
+import unittest2 as unittest
+
+from slumber import balancing, exceptions
+from .helpers import make_response, run
+
+
+class BalancingTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.transport = mock.Mock(spec=slumber.transports.BaseTransport)
+        self.transport.request.return_value = make_response()
+
+    def requested_urls(self):
+        return [call[0][1] for call in self.transport.request.call_args_list]
+
+    def test_round_robin_resolves_host_per_request(self):
+        api = slumber.API(base_urls=["http://a/api/v1/", "http://b/api/v1"],
+                          transport=self.transport, append_slash=False)
+
+        resource = api.users(5)
+        for _ in range(3):
+            run(resource.get())
+
+        self.assertEqual(self.requested_urls(), [
+            "http://a/api/v1/users/5",
+            "http://b/api/v1/users/5",
+            "http://a/api/v1/users/5",
+        ])
+
+    def test_url_override_elsewhere_is_not_rebased(self):
+        balancer = slumber.Balancer(["http://a/api", "http://b/api"])
+        endpoint = balancer.endpoints[1]
+
+        self.assertEqual(endpoint.rebase("http://a/api/x", balancer.base_url), "http://b/api/x")
+        self.assertEqual(endpoint.rebase("http://c/other", balancer.base_url), "http://c/other")
+
+    def test_least_outstanding(self):
+        balancer = slumber.Balancer(["http://a", "http://b", "http://c"], strategy="least_outstanding")
+        balancer.endpoints[0].outstanding = 2
+        balancer.endpoints[1].outstanding = 0
+        balancer.endpoints[2].outstanding = 1
+
+        self.assertTrue(balancer.choose() is balancer.endpoints[1])
+
+    def test_power_of_two_choices_prefers_lower_latency(self):
+        strategy = balancing.PowerOfTwoChoices(random=random.Random(0))
+        balancer = slumber.Balancer(["http://a", "http://b"], strategy=strategy)
+        balancer.record(balancer.endpoints[0], 1.0, failed=False)
+        balancer.record(balancer.endpoints[1], 0.1, failed=False)
+
+        for _ in range(10):
+            self.assertTrue(balancer.choose() is balancer.endpoints[1])
+
+    def test_ewma(self):
+        balancer = slumber.Balancer(["http://a"], decay=0.5)
+        endpoint = balancer.endpoints[0]
+
+        balancer.record(endpoint, 1.0, failed=False)
+        balancer.record(endpoint, 3.0, failed=False)
+
+        self.assertEqual(endpoint.ewma, 2.0)
+
+    def test_unknown_strategy(self):
+        with self.assertRaises(exceptions.ImproperlyConfigured):
+            slumber.Balancer(["http://a"], strategy="random")
+
+    def test_passive_ejection(self):
+        balancer = slumber.Balancer(["http://a", "http://b"], max_failures=2)
+        api = slumber.API(balancer=balancer, transport=self.transport, append_slash=False)
+        responses = {"http://a/test": make_response(503), "http://b/test": make_response()}
+        self.transport.request.side_effect = lambda method, url, **kwargs: responses[url]
+
+        for _ in range(4):
+            try:
+                run(api.test.get())
+            except exceptions.HttpServerError:
+                pass
+
+        self.assertFalse(balancer.endpoints[0].is_healthy())
+        self.assertTrue(balancer.endpoints[1].is_healthy())
+
+        self.transport.request.reset_mock()
+        run(api.test.get())
+        run(api.test.get())
+        self.assertEqual(self.requested_urls(), ["http://b/test", "http://b/test"])
+
+    def test_all_ejected_fails_open(self):
+        balancer = slumber.Balancer(["http://a"])
+        balancer.eject(balancer.endpoints[0])
+
+        self.assertTrue(balancer.choose() is balancer.endpoints[0])
+
+    def test_active_health_check(self):
+        balancer = slumber.Balancer(["http://a", "http://b"], health_check_path="/health")
+        balancer.eject(balancer.endpoints[0])
+        responses = {"http://a/health": make_response(200), "http://b/health": make_response(500)}
+        self.transport.request.side_effect = lambda method, url, **kwargs: responses[url]
+
+        async def check():
+            return await asyncio.gather(*[balancer.check(self.transport, e) for e in balancer.endpoints])
+
+        self.assertEqual(run(check()), [True, False])
+        self.assertTrue(balancer.endpoints[0].is_healthy())
+        self.assertFalse(balancer.endpoints[1].is_healthy())
+
+    def test_health_checks_start_with_requests(self):
+        balancer = slumber.Balancer(["http://a"], health_check_path="health",
+                                    health_check_interval=60)
+        api = slumber.API(balancer=balancer, transport=self.transport, append_slash=False)
+
+        async def call():
+            await api.test.get()
+            await asyncio.sleep(0.01)
+            balancer.close()
+
+        run(call())
+
+        self.assertEqual(sorted(self.requested_urls()), ["http://a/health", "http://a/test"])
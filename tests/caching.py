@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import tempfile
+import time
+import slumber
+import slumber.caching
+import slumber.inprocess
+import slumber.transports
+import unittest2 as unittest
+
+from .helpers import run
+
+
+def make_app(requests, body=b'{"rows": [1, 2, 3]}', headers=None):
+    """
+    An ASGI app answering 304 to a matching If-None-Match, recording the
+    headers of the requests.
+    """
+    async def app(scope, receive, send):
+        request = dict(scope["headers"])
+        requests.append(request)
+
+        if request.get(b"if-none-match") == b'"v1"':
+            await send({"type": "http.response.start", "status": 304, "headers": [(b"etag", b'"v1"')]})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        response_headers = [(b"content-type", b"application/json"), (b"etag", b'"v1"')]
+        response_headers.extend(headers or [])
+        await send({"type": "http.response.start", "status": 200, "headers": response_headers})
+        await send({"type": "http.response.body", "body": body})
+
+    return app
+
+
+class DiskCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def get(self, app, api_cache, count=1, **kwargs):
+        async def call():
+            transport = slumber.inprocess.ASGITransport(app)
+            api = slumber.API("http://example/api", transport=transport, cache=api_cache)
+            return [await api.datasets(1).get(**kwargs) for _ in range(count)]
+
+        return run(call())
+
+    def test_revalidates_with_etag(self):
+        requests = []
+        cache = slumber.DiskCache(self.directory)
+
+        self.assertEqual(self.get(make_app(requests), cache, count=2), [{"rows": [1, 2, 3]}] * 2)
+        self.assertFalse(b"if-none-match" in requests[0])
+        self.assertEqual(requests[1][b"if-none-match"], b'"v1"')
+        self.assertEqual((cache.misses, cache.revalidations, cache.hits), (1, 1, 0))
+
+    def test_shared_across_instances(self):
+        requests = []
+        self.get(make_app(requests), self.directory)
+
+        # A new cache on the same directory, as another process would have.
+        cache = slumber.DiskCache(self.directory)
+        self.assertEqual(self.get(make_app(requests), cache), [{"rows": [1, 2, 3]}])
+        self.assertEqual(cache.revalidations, 1)
+
+    def test_fresh_responses_skip_the_request(self):
+        requests = []
+        cache = slumber.DiskCache(self.directory)
+        app = make_app(requests, headers=[(b"cache-control", b"max-age=60")])
+
+        self.assertEqual(self.get(app, cache, count=3), [{"rows": [1, 2, 3]}] * 3)
+        self.assertEqual(len(requests), 1)
+        self.assertEqual(cache.hits, 2)
+
+    def test_no_store_and_per_call_opt_out(self):
+        requests = []
+        cache = slumber.DiskCache(self.directory, max_age=60)
+
+        self.get(make_app(requests, headers=[(b"cache-control", b"no-store")]), cache, count=2)
+        self.assertEqual(len(requests), 2)
+
+        requests = []
+        self.get(make_app(requests), cache, count=2, cache=False)
+        self.assertEqual(len(requests), 2)
+        self.assertFalse(b"if-none-match" in requests[1])
+
+    def test_params_are_part_of_the_key(self):
+        cache = slumber.DiskCache(self.directory)
+        self.assertEqual(cache.key("http://x/", {"b": 2, "a": 1}), cache.key("http://x/", {"a": 1, "b": 2}))
+        self.assertNotEqual(cache.key("http://x/", {"a": 1}), cache.key("http://x/", {"a": 2}))
+
+    def test_bodies_are_content_addressed(self):
+        cache = slumber.DiskCache(self.directory)
+        resp = slumber.transports.Response(200, {"etag": '"a"'}, b"same", url="http://x/1")
+        first = cache.store("1", resp)
+        second = cache.store("2", resp)
+
+        self.assertEqual(first.digest, second.digest)
+        self.assertEqual(len(os.listdir(os.path.join(self.directory, "objects", first.digest[:2]))), 1)
+        self.assertEqual(cache.read(cache.load("2")), b"same")
+
+        cache.clear()
+        self.assertEqual(cache.load("1"), None)
+
+    def test_expires(self):
+        entry = slumber.caching.CacheEntry("http://x/", 200, {"expires": "Thu, 01 Jan 1970 00:00:00 GMT"},
+                                           "digest", time.time())
+        self.assertTrue(entry.max_age() < 0)
+        self.assertEqual(slumber.caching.CacheEntry("http://x/", 200, {}, "digest", 0).max_age(), None)
+
+    def test_credentials_and_vary_are_part_of_the_key(self):
+        cache = slumber.DiskCache(self.directory)
+        resp = slumber.transports.Response(200, {"etag": '"a"', "vary": "Accept-Language"}, b"hello")
+        cache.store(cache.key("http://x/", headers={"authorization": "Bearer a"}), resp,
+                    {"authorization": "Bearer a", "accept-language": "en"})
+
+        def lookup(headers):
+            return cache.lookup(cache.key("http://x/", headers=headers), headers)[1]
+
+        self.assertEqual(cache.read(lookup({"authorization": "Bearer a", "accept-language": "en"})), b"hello")
+        self.assertEqual(lookup({"authorization": "Bearer b", "accept-language": "en"}), None)
+        self.assertEqual(lookup({"authorization": "Bearer a", "accept-language": "fr"}), None)
+        for name in os.listdir(os.path.join(self.directory, "index")):
+            self.assertNotIn(b"Bearer", open(os.path.join(self.directory, "index", name), "rb").read())
+
+    def test_users_do_not_share_responses(self):
+        async def app(scope, receive, send):
+            user = dict(scope["headers"]).get(b"authorization", b"")
+            await send({"type": "http.response.start", "status": 200,
+                        "headers": [(b"content-type", b"application/json"), (b"cache-control", b"max-age=60")]})
+            await send({"type": "http.response.body", "body": b'{"user": "%s"}' % user})
+
+        def get(auth):
+            async def call():
+                transport = slumber.inprocess.ASGITransport(app)
+                api = slumber.API("http://example/api", transport=transport, cache=self.directory, auth=auth)
+                return await api.me.get()
+            return run(call())
+
+        self.assertEqual(get(slumber.BearerAuth("a")), {"user": "Bearer a"})
+        self.assertEqual(get(slumber.BearerAuth("b")), {"user": "Bearer b"})
+        self.assertEqual(get(None), {"user": ""})
+        self.assertEqual(get(slumber.BearerAuth("a")), {"user": "Bearer a"})
+
+    def test_private_responses_are_not_stored(self):
+        cache = slumber.DiskCache(self.directory)
+        self.assertFalse(cache.is_storable(slumber.transports.Response(200, {"cache-control": "private"}, b"")))
+        self.assertFalse(cache.is_storable(slumber.transports.Response(200, {"vary": "*"}, b"")))
+
+    def test_replaced_bodies_are_collected(self):
+        cache = slumber.DiskCache(self.directory, collect_every=2)
+        cache.grace = 0
+
+        def objects():
+            return sum(len(files) for _, _, files in os.walk(os.path.join(self.directory, "objects")))
+
+        for n in range(3):
+            cache.store("1", slumber.transports.Response(200, {}, b"version %d" % n))
+            cache.store("2", slumber.transports.Response(200, {}, b"shared"))
+            cache.store("3", slumber.transports.Response(200, {}, b"shared"))
+        self.assertEqual(objects(), 2)
+        self.assertEqual(cache.read(cache.load("1")), b"version 2")
+
+    def test_max_size_evicts_the_oldest_entries(self):
+        cache = slumber.DiskCache(self.directory, max_size=250)
+        for n in range(5):
+            cache.store(str(n), slumber.transports.Response(200, {}, b"%d" % n * 100))
+
+        self.assertEqual([cache.load(str(n)) is not None for n in range(5)], [False] * 3 + [True] * 2)
+        self.assertEqual(cache.read(cache.load("4")), b"4" * 100)
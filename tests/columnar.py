@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+import array
+import gc
+import json
+import math
+import mock
+import slumber
+import slumber.columnar
+import slumber.transports
+import unittest2 as unittest
+import weakref
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+from . import helpers
+from .helpers import run
+
+
+def make_response(data, headers=None):
+    return helpers.make_response(content=json.dumps(data), headers=headers)
+
+
+def make_api(responses, **kwargs):
+    transport = mock.Mock(spec=slumber.transports.BaseTransport)
+
+    async def request(*args, **kwargs):
+        return responses.pop(0)
+
+    transport.request.side_effect = request
+    return slumber.API("http://example/api", transport=transport, **kwargs), transport
+
+
+class ColumnarTestCase(unittest.TestCase):
+
+    def test_inferred_kinds(self):
+        builder = slumber.columnar.ColumnBuilder()
+        builder.extend([{"id": 1, "score": 0.5, "ok": True, "name": "a", "parent": 3},
+                        {"id": 2, "score": 1, "ok": False, "name": "b", "parent": None}])
+        builder.extend([{"id": 3, "score": 2.5, "ok": True, "name": 4, "parent": 4, "tag": "x"}])
+
+        self.assertEqual(builder.kinds(), {"id": "int64", "score": "float64", "ok": "bool", "name": "object",
+                                           "parent": "float64", "tag": "str"})
+        columns = builder.columns()
+        self.assertEqual(columns["id"], array.array("q", [1, 2, 3]))
+        self.assertEqual(columns["score"], array.array("d", [0.5, 1.0, 2.5]))
+        self.assertEqual(columns["ok"], array.array("b", [1, 0, 1]))
+        self.assertEqual(columns["name"], ["a", "b", 4])
+        self.assertEqual(columns["tag"], [None, None, "x"])
+        self.assertEqual(columns["parent"][0], 3.0)
+        self.assertTrue(math.isnan(columns["parent"][1]))
+
+    def test_widening_keeps_the_values(self):
+        builder = slumber.columnar.ColumnBuilder()
+        builder.extend([{"ok": True}, {"ok": False}])
+        builder.extend([{"ok": None}])
+        builder.extend([{"ok": 2 ** 70}])
+        self.assertEqual(builder.columns()["ok"], [True, False, None, 2 ** 70])
+
+        builder = slumber.columnar.ColumnBuilder()
+        builder.extend([{"n": 1}])
+        builder.extend([{"n": 2 ** 70}])
+        self.assertEqual(builder.columns()["n"], [1, 2 ** 70])
+
+    def test_declared_schema(self):
+        builder = slumber.columnar.ColumnBuilder({"id": "int64", "score": "float64"})
+        builder.extend([{"id": 1, "score": 1, "name": "a"}, {"id": 2, "score": None}])
+        self.assertEqual(sorted(builder.columns()), ["id", "score"])
+        self.assertEqual(builder.columns()["id"], array.array("q", [1, 2]))
+
+        with self.assertRaises(slumber.exceptions.SchemaError):
+            builder.extend([{"id": 1.5, "score": 1.0}])
+        with self.assertRaises(slumber.exceptions.ImproperlyConfigured):
+            slumber.Columnar(schema={"id": "decimal"})
+
+    def test_get_columnar(self):
+        api, transport = make_api([make_response([{"id": 1, "v": 0.5}, {"id": 2, "v": 1.5}])])
+        columns = run(api.events.get(columnar="array", kind="click"))
+        self.assertEqual(columns, {"id": array.array("q", [1, 2]), "v": array.array("d", [0.5, 1.5])})
+        transport.request.assert_called_with("GET", "http://example/api/events/", data=None, files=None,
+                                             params={"kind": "click"}, headers={"accept": "application/json"})
+
+    def test_pages_are_appended(self):
+        api, transport = make_api([
+            make_response({"results": [{"id": 1}, {"id": 2}], "next": "/api/events/?page=2"}),
+            make_response({"results": [{"id": 3}], "next": None}),
+        ])
+        columnar = slumber.Columnar(records="results", next="next", backend="array")
+        columns = run(api.events.get(columnar=columnar, kind="click"))
+
+        self.assertEqual(columns, {"id": array.array("q", [1, 2, 3])})
+        transport.request.assert_called_with("GET", "http://example/api/events/?page=2", data=None, files=None,
+                                             params={}, headers={"accept": "application/json"})
+
+    def test_one_page_is_held_at_a_time(self):
+        class Page(list):
+            pass
+
+        pages = []
+
+        def loads(content):
+            page = Page(json.loads(content)["results"])
+            pages.append(weakref.ref(page))
+            return {"results": page, "next": "/api/events/?page=%d" % len(pages)}
+
+        held = []
+        api, transport = make_api([make_response({"results": [{"id": n}]}) for n in range(3)])
+        request = transport.request.side_effect
+
+        async def observe(*args, **kwargs):
+            gc.collect()
+            held.append(sum(1 for page in pages if page() is not None))
+            return await request(*args, **kwargs)
+
+        transport.request.side_effect = observe
+        columnar = slumber.Columnar(records="results", next="next", backend="array", max_pages=3)
+        with mock.patch.object(slumber.serialize.JsonSerializer, "loads", side_effect=loads):
+            run(api.events.get(columnar=columnar))
+
+        self.assertEqual(held, [0, 0, 0])
+
+    def test_link_header_and_max_pages(self):
+        link = '<http://example/api/events/?cursor=%s>; rel="next"'
+        api, transport = make_api([make_response([{"id": n}], {"link": link % (n + 1)}) for n in range(5)])
+        columnar = slumber.Columnar(next="link", max_pages=3, backend="array")
+        columns = run(api.events.get(columnar=columnar))
+
+        self.assertEqual(columns, {"id": array.array("q", [0, 1, 2])})
+        self.assertEqual(transport.request.call_count, 3)
+
+    def test_not_a_list(self):
+        api, transport = make_api([make_response({"id": 1})])
+        with self.assertRaises(slumber.exceptions.SchemaError):
+            run(api.events.get(columnar="array"))
+
+    @unittest.skipIf(numpy is None, "numpy is required")
+    def test_numpy(self):
+        api, transport = make_api([make_response([{"id": 1, "ok": True, "name": "a"},
+                                                  {"id": 2, "ok": False, "name": "b"}])])
+        columns = run(api.events.get(columnar="numpy"))
+        self.assertEqual(columns["id"].dtype, numpy.int64)
+        self.assertEqual(columns["ok"].tolist(), [True, False])
+        self.assertEqual(columns["name"].tolist(), ["a", "b"])
+
+    @unittest.skipIf(pyarrow is None, "pyarrow is required")
+    def test_arrow(self):
+        api, transport = make_api([make_response([{"id": 1, "ok": True}, {"id": 2, "ok": False}])])
+        table = run(api.events.get(columnar="arrow"))
+        self.assertEqual(table.to_pydict(), {"id": [1, 2], "ok": [True, False]})
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+import pickle
+import slumber
+import slumber.serialize
+import unittest2 as unittest
+
+from slumber import exceptions
+
+
+class APIConfigTestCase(unittest.TestCase):
+
+    def test_options_are_attributes(self):
+        config = slumber.APIConfig("http://example/api", timeout=10, append_slash=False)
+        self.assertEqual(config.base_url, "http://example/api")
+        self.assertEqual(config.timeout, 10)
+        self.assertEqual(config.format, None)
+        self.assertEqual(config.as_dict(), {"base_url": "http://example/api", "timeout": 10,
+                                            "append_slash": False})
+
+    def test_frozen(self):
+        config = slumber.APIConfig("http://example/api")
+        with self.assertRaises(AttributeError):
+            config.base_url = "http://other/api"
+
+        other = config.replace(base_url="http://other/api")
+        self.assertEqual(config.base_url, "http://example/api")
+        self.assertEqual(other.base_url, "http://other/api")
+
+    def test_pickle(self):
+        config = slumber.APIConfig("http://example/api", auth=("user", "pass"),
+                                   timeout=slumber.Timeout(total=5, connect=1))
+        self.assertEqual(pickle.loads(pickle.dumps(config)), config)
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(exceptions.ImproperlyConfigured):
+            slumber.APIConfig("http://example/api", nope=1)
+        with self.assertRaises(exceptions.ImproperlyConfigured):
+            slumber.APIConfig("http://example/api", session=object())
+
+    def test_build(self):
+        config = slumber.APIConfig("http://example/api", append_slash=False, timeout=3)
+        api = config.build()
+
+        self.assertEqual(api.users(1).url(), "http://example/api/users/1")
+        self.assertEqual(api._store["timeout"], slumber.Timeout(total=3))
+        # The session is only opened by the first request, inside a loop.
+        self.assertEqual(api._store["transport"].session, None)
+        self.assertFalse(api._store["transport"] is config.build()._store["transport"])
+
+    def test_serializers_are_shared(self):
+        first = slumber.serialize.Serializer()
+        second = slumber.serialize.Serializer(default="yaml")
+        self.assertTrue(first.get_serializer("json") is second.get_serializer("json"))
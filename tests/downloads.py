@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import os
+import mock
+import shutil
+import tempfile
+import slumber
+import slumber.inprocess
+import slumber.transports
+import unittest2 as unittest
+
+from .helpers import run
+
+
+def make_app(blob, requests, etag=b'"v1"', ranges=True, fail=None):
+    """
+    An ASGI app serving ``blob``, by ranges when ``ranges``, recording the
+    requested ranges. The ranges starting at an offset of ``fail`` are cut
+    halfway the first time.
+    """
+    fail = set(fail or ())
+
+    async def app(scope, receive, send):
+        headers = dict(scope["headers"])
+        requests.append((scope["method"], headers.get(b"range")))
+
+        response_headers = [(b"content-type", b"application/octet-stream"), (b"etag", etag)]
+        if ranges:
+            response_headers.append((b"accept-ranges", b"bytes"))
+
+        if scope["method"] == "HEAD":
+            response_headers.append((b"content-length", str(len(blob)).encode("ascii")))
+            await send({"type": "http.response.start", "status": 200, "headers": response_headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        requested = headers.get(b"range") if ranges else None
+        if requested is not None and headers.get(b"if-range", etag) == etag:
+            start, end = [int(value) for value in requested.decode("ascii")[6:].split("-")]
+            body = blob[start:end + 1]
+            await send({"type": "http.response.start", "status": 206, "headers": response_headers})
+            if start in fail:
+                fail.discard(start)
+                await send({"type": "http.response.body", "body": body[:len(body) // 2], "more_body": True})
+                return
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        await send({"type": "http.response.start", "status": 200, "headers": response_headers})
+        await send({"type": "http.response.body", "body": blob})
+
+    return app
+
+
+class DownloadTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.path = os.path.join(self.directory, "artifact.bin")
+        self.blob = os.urandom(100000)
+
+    def download(self, app, **kwargs):
+        api = slumber.API("http://example/api", transport=slumber.inprocess.ASGITransport(app))
+        return run(api.artifacts(1).download(self.path, **kwargs))
+
+    def read(self):
+        with open(self.path, "rb") as f:
+            return f.read()
+
+    def test_ranged(self):
+        requests = []
+        path = self.download(make_app(self.blob, requests), parts=4, min_part_size=1000)
+
+        self.assertEqual(path, self.path)
+        self.assertEqual(self.read(), self.blob)
+        self.assertEqual(requests[0], ("HEAD", None))
+        self.assertEqual(sorted(value for method, value in requests[1:]),
+                         [b"bytes=0-24999", b"bytes=25000-49999", b"bytes=50000-74999", b"bytes=75000-99999"])
+        self.assertEqual(os.listdir(self.directory), ["artifact.bin"])
+
+    def test_single_get_without_ranges(self):
+        requests = []
+        self.download(make_app(self.blob, requests, ranges=False), parts=4, min_part_size=1000)
+
+        self.assertEqual(self.read(), self.blob)
+        self.assertEqual(requests, [("HEAD", None), ("GET", None)])
+
+    def test_interrupted_parts_are_resumed(self):
+        requests = []
+        self.download(make_app(self.blob, requests, fail=[50000]), parts=4, min_part_size=1000)
+
+        self.assertEqual(self.read(), self.blob)
+        self.assertIn(("GET", b"bytes=62500-74999"), requests)
+
+    def test_failed_downloads_resume_on_the_next_call(self):
+        requests = []
+        app = make_app(self.blob, requests, fail=[50000])
+
+        with self.assertRaises(ConnectionError):
+            self.download(app, parts=4, min_part_size=1000, retries=0)
+        self.assertTrue(os.path.exists(self.path + ".part.json"))
+        self.assertFalse(os.path.exists(self.path))
+
+        del requests[:]
+        self.download(app, parts=4, min_part_size=1000, retries=0)
+        self.assertEqual(self.read(), self.blob)
+        # The cut part goes on from where it stopped, the other ones may
+        # have been cancelled along.
+        ranges = [value for method, value in requests[1:]]
+        self.assertIn(b"bytes=62500-74999", ranges)
+        self.assertNotIn(b"bytes=50000-74999", ranges)
+
+    def test_incomplete_parts_fail(self):
+        async def fetch(download, part, validator):
+            if part.start == 0:
+                await download._write(part, bytearray(b"x" * 10))
+
+        with mock.patch("slumber.downloads.Download._fetch", fetch):
+            with self.assertRaises(slumber.exceptions.DownloadError):
+                self.download(make_app(self.blob, []), parts=4, min_part_size=1000)
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_changed_resource(self):
+        requests = []
+        app = make_app(self.blob, requests, fail=[0], etag=b'"v1"')
+        with self.assertRaises(ConnectionError):
+            self.download(app, parts=2, min_part_size=1000, retries=0)
+
+        app = make_app(self.blob[::-1], requests, etag=b'"v2"')
+        self.download(app, parts=2, min_part_size=1000)
+        self.assertEqual(self.read(), self.blob[::-1])
+
+    def test_checksum(self):
+        digest = hashlib.sha256(self.blob).hexdigest()
+        self.download(make_app(self.blob, []), parts=4, min_part_size=1000, checksum="sha256:" + digest)
+        self.assertEqual(self.read(), self.blob)
+
+        os.remove(self.path)
+        with self.assertRaises(slumber.exceptions.DownloadError):
+            self.download(make_app(self.blob, []), parts=4, min_part_size=1000, checksum="sha256:" + "0" * 64)
+        self.assertEqual(os.listdir(self.directory), [])
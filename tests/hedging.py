@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import mock
+import slumber
+import slumber.transports
+import unittest2 as unittest
+
+from .helpers import make_response, run
+
+
+class HedgingTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.transport = mock.Mock(spec=slumber.transports.BaseTransport)
+        self.api = slumber.API("http://example/api/v1", transport=self.transport)
+
+    def delayed(self, *steps):
+        """
+        Makes the transport answer each request after the given delay.
+        """
+        steps = list(steps)
+
+        async def request(*args, **kwargs):
+            delay, resp = steps.pop(0)
+            await asyncio.sleep(delay)
+            return resp
+
+        self.transport.request.side_effect = request
+
+    def test_delay_uses_percentile_of_window(self):
+        policy = slumber.HedgePolicy(percentile=90, initial_delay=0.5, min_samples=10)
+        self.assertEqual(policy.delay(), 0.5)
+
+        for latency in range(1, 101):
+            policy.observe(latency / 100.0)
+
+        self.assertAlmostEqual(policy.delay(), 0.91)
+
+    def test_delay_is_clamped(self):
+        policy = slumber.HedgePolicy(initial_delay=5, max_delay=1)
+        self.assertEqual(policy.delay(), 1)
+
+    def test_fast_response_is_not_hedged(self):
+        policy = slumber.HedgePolicy(initial_delay=0.5, budget=1)
+        self.delayed((0, make_response()))
+
+        resp = run(self.api.test.get(hedge=policy))
+
+        self.assertEqual(resp["result"], "a")
+        self.assertEqual(self.transport.request.call_count, 1)
+        self.assertEqual(policy.hedges, 0)
+
+    def test_slow_response_is_hedged_and_loser_cancelled(self):
+        policy = slumber.HedgePolicy(initial_delay=0.01, budget=1)
+        slow = make_response(content='{"result": "slow"}')
+        self.delayed((1, slow), (0, make_response(content='{"result": "fast"}')))
+
+        resp = run(self.api.test.get(hedge=policy))
+
+        self.assertEqual(resp["result"], "fast")
+        self.assertEqual(self.transport.request.call_count, 2)
+        self.assertEqual(policy.hedges, 1)
+        self.assertEqual(policy.hedge_wins, 1)
+
+    def test_server_error_does_not_win(self):
+        policy = slumber.HedgePolicy(initial_delay=0.01, budget=1)
+        self.delayed((0.05, make_response(status_code=503, content='')),
+                     (0.1, make_response(content='{"result": "ok"}')))
+
+        resp = run(self.api.test.get(hedge=policy))
+
+        self.assertEqual(resp["result"], "ok")
+
+    def test_budget_limits_hedges(self):
+        policy = slumber.HedgePolicy(initial_delay=0, budget=0.5)
+        self.delayed(*[(0.01, make_response()) for _ in range(10)])
+
+        for _ in range(4):
+            run(self.api.test.get(hedge=policy))
+
+        self.assertEqual(policy.requests, 4)
+        self.assertEqual(policy.hedges, 2)
+
+    def test_only_get_is_hedged(self):
+        policy = slumber.HedgePolicy(initial_delay=0, budget=1)
+        api = slumber.API("http://example/api/v1", transport=self.transport, hedge=policy)
+        self.delayed((0.01, make_response()))
+
+        run(api.test.post({"a": 1}))
+
+        self.assertEqual(self.transport.request.call_count, 1)
+        self.assertEqual(policy.requests, 0)
+
+    def test_cancelled_during_hedge_delay(self):
+        policy = slumber.HedgePolicy(initial_delay=1, budget=1)
+        cancelled = []
+
+        async def request(*args, **kwargs):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+
+        self.transport.request.side_effect = request
+
+        async def call():
+            get = asyncio.ensure_future(self.api.test.get(hedge=policy))
+            await asyncio.sleep(0.01)
+            get.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await get
+            await asyncio.sleep(0)
+            # The attempt is cancelled with the caller, not when the loop
+            # closes.
+            self.assertEqual(cancelled, [True])
+
+            # The same goes for a deadline running out while waiting.
+            with self.assertRaises(slumber.exceptions.DeadlineExceeded):
+                with slumber.deadline(0.01):
+                    await self.api.test.get(hedge=policy)
+            await asyncio.sleep(0)
+            self.assertEqual(cancelled, [True, True])
+
+        run(call())
@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import os
+import mock
+import aiohttp
+import unittest2 as unittest
+
+# Timing tests depend on the machine and its load, they only run on demand.
+benchmark = unittest.skipUnless(os.environ.get("SLUMBER_BENCHMARKS"), "set SLUMBER_BENCHMARKS=1 to run benchmarks")
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def make_response(status_code=200, content='{"result": "a"}', headers=None):
+    """
+    A JSON response of the transport, with ``headers`` along the content
+    type.
+    """
+    r = mock.Mock(spec=aiohttp.ClientResponse)
+    r.status_code = status_code
+    r.headers = dict({"content-type": "application/json"}, **(headers or {}))
+    r.content = content
+    return r
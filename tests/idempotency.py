@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import mock
+import aiohttp
+import slumber
+import slumber.transports
+import unittest2 as unittest
+
+from slumber import exceptions
+from . import helpers
+from .helpers import run
+
+
+def make_response(status_code=200, content='{"id": 1}', headers=None):
+    return helpers.make_response(status_code, content, headers)
+
+
+class IdempotencyTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.transport = mock.Mock(spec=slumber.transports.BaseTransport)
+        self.sent = []
+
+    def answer(self, *steps, **kwargs):
+        """
+        Makes the transport go through ``steps``, responses or exceptions,
+        after ``delay`` seconds each, recording the headers sent.
+        """
+        steps = list(steps)
+        delay = kwargs.get("delay", 0)
+
+        async def request(method, url, headers=None, **kwargs):
+            self.sent.append(headers)
+            await asyncio.sleep(delay)
+            step = steps.pop(0)
+            if isinstance(step, Exception):
+                raise step
+            return step
+
+        self.transport.request.side_effect = request
+
+    def api(self, **kwargs):
+        return slumber.API("http://example/api/v1", transport=self.transport, **kwargs)
+
+    def test_key_is_stable_across_retries(self):
+        self.answer(aiohttp.ClientConnectionError(), make_response(503), make_response(201))
+        policy = slumber.IdempotencyPolicy(backoff=0)
+
+        self.assertEqual(run(self.api(idempotency=policy).test.post({"a": 1})), {"id": 1})
+        keys = set(headers["Idempotency-Key"] for headers in self.sent)
+        self.assertEqual(len(self.sent), 3)
+        self.assertEqual(len(keys), 1)
+        self.assertEqual(policy.retried, 2)
+
+        self.answer(make_response(201))
+        run(self.api(idempotency=policy).test.post({"a": 1}))
+        self.assertFalse(self.sent[-1]["Idempotency-Key"] in keys)
+
+    def test_retries_are_bounded(self):
+        self.answer(make_response(503), make_response(503))
+        api = self.api(idempotency=slumber.IdempotencyPolicy(retries=1, backoff=0))
+
+        with self.assertRaises(exceptions.HttpServerError):
+            run(api.test.post({"a": 1}))
+
+    def test_safe_verbs_and_opt_out(self):
+        self.answer(make_response(), make_response(), make_response())
+        api = self.api(idempotency=True)
+
+        run(api.test.get())
+        run(api.test.put({"a": 1}))
+        run(api.test.post({"a": 1}, idempotency=False))
+        self.assertEqual([headers.get("Idempotency-Key") for headers in self.sent], [None, None, None])
+
+    def test_explicit_key(self):
+        self.answer(make_response(201))
+        run(self.api(idempotency=True).test.post({"a": 1}, idempotency="order-42"))
+        self.assertEqual(self.sent[0]["Idempotency-Key"], "order-42")
+
+    def test_explicit_key_without_a_policy(self):
+        self.answer(make_response(201), make_response(201))
+        run(self.api().test.post({"a": 1}, idempotency="order-42"))
+        run(self.api().test(1).put({"a": 1}, idempotency="order-43"))
+        self.assertEqual([headers["Idempotency-Key"] for headers in self.sent], ["order-42", "order-43"])
+
+    def test_journal_dedupes_identical_submissions(self):
+        self.answer(make_response(201), make_response(201), delay=0.01)
+        policy = slumber.IdempotencyPolicy(journal=60)
+        api = self.api(idempotency=policy)
+
+        async def submit():
+            return await asyncio.gather(api.test.post({"a": 1}), api.test.post({"a": 1}),
+                                        api.test.post({"a": 2}))
+
+        self.assertEqual(run(submit()), [{"id": 1}] * 3)
+        self.assertEqual(len(self.sent), 2)
+        self.assertEqual(policy.journal.deduplicated, 1)
+
+    def test_journal_forgets_failures(self):
+        self.answer(make_response(400), make_response(201))
+        policy = slumber.IdempotencyPolicy(journal=60)
+        api = self.api(idempotency=policy)
+
+        with self.assertRaises(exceptions.HttpClientError):
+            run(api.test.post({"a": 1}))
+        self.assertEqual(run(api.test.post({"a": 1})), {"id": 1})
+        self.assertEqual(len(policy.journal), 1)
+
+    def test_writes_with_keys_are_hedged(self):
+        steps = [(0.2, make_response(201)), (0, make_response(201))]
+
+        async def request(method, url, headers=None, **kwargs):
+            self.sent.append(headers)
+            delay, resp = steps.pop(0)
+            await asyncio.sleep(delay)
+            return resp
+
+        self.transport.request.side_effect = request
+        hedge = slumber.HedgePolicy(initial_delay=0.01, budget=1)
+        api = self.api(idempotency=True, hedge=hedge)
+
+        self.assertEqual(run(api.test.post({"a": 1})), {"id": 1})
+        self.assertEqual(hedge.hedge_wins, 1)
+        self.assertEqual(self.sent[0]["Idempotency-Key"], self.sent[1]["Idempotency-Key"])
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+import subprocess
+import sys
+import slumber
+import unittest2 as unittest
+
+from .helpers import benchmark
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(slumber.__file__)))
+
+# Dependencies that ``import slumber`` must not pay for.
+HEAVY = ("aiohttp", "yaml", "httpx", "multidict", "slumber.transports", "slumber.caching", "slumber.runners")
+
+
+def python(code, *options):
+    return subprocess.run([sys.executable] + list(options) + ["-c", code], cwd=ROOT, check=True,
+                          stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+
+
+def import_time(module):
+    """
+    Returns the cumulative microseconds spent importing ``module`` in a new
+    interpreter, the best of three runs.
+    """
+    times = []
+    for _ in range(3):
+        output = python("import %s" % module, "-X", "importtime").stderr
+        for line in output.splitlines():
+            fields = [field.strip() for field in line.split("|")]
+            if len(fields) == 3 and fields[2] == module:
+                times.append(int(fields[1]))
+    return min(times)
+
+
+class ImportTestCase(unittest.TestCase):
+
+    def test_heavy_dependencies_are_not_imported(self):
+        code = "import json, sys, slumber; print(json.dumps([m for m in %r if m in sys.modules]))" % (HEAVY,)
+        self.assertEqual(json.loads(python(code).stdout), [])
+
+    def test_transports_do_not_import_test_utils(self):
+        code = "import sys, slumber.transports; print('aiohttp.test_utils' in sys.modules, " \
+               "'slumber.inprocess' in sys.modules)"
+        self.assertEqual(python(code).stdout.split(), ["False", "False"])
+
+    def test_lazy_attributes(self):
+        import slumber.transports
+
+        self.assertTrue(slumber.AiohttpTransport is slumber.transports.AiohttpTransport)
+        self.assertTrue(slumber.transports.ASGITransport is slumber.inprocess.ASGITransport)
+        self.assertTrue(slumber.DiskCache is not None)
+        self.assertTrue("ProcessRunner" in dir(slumber))
+        with self.assertRaises(AttributeError):
+            slumber.nope
+
+    @unittest.skipIf(sys.version_info < (3, 10), "sys.stdlib_module_names is new in 3.10")
+    def test_only_the_standard_library_is_imported(self):
+        code = "import json, sys; before = set(sys.modules); import slumber; " \
+               "print(json.dumps(sorted({m.split('.')[0] for m in set(sys.modules) - before})))"
+        imported = set(json.loads(python(code).stdout)) - {"slumber"}
+        self.assertEqual(sorted(imported - sys.stdlib_module_names), [])
+
+    @benchmark
+    def test_import_time(self):
+        # aiohttp alone is the floor of what an eager import would cost.
+        self.assertLess(import_time("slumber"), import_time("aiohttp") / 2)
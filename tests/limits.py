@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import mock
+import slumber
+import slumber.limits
+import slumber.transports
+import unittest2 as unittest
+
+from .helpers import make_response, run
+
+
+class ConcurrencyLimiterTestCase(unittest.TestCase):
+
+    def test_aimd(self):
+        limit = slumber.limits.AIMDLimit(initial=10, backoff=0.5, tolerance=2.0)
+
+        limit.update(0.1, 8, False)
+        self.assertEqual(limit.limit, 11)
+        # Not put to use, no reason to grow.
+        limit.update(0.1, 1, False)
+        self.assertEqual(limit.limit, 11)
+
+        limit.update(0.1, 8, True)
+        self.assertEqual(limit.limit, 5.5)
+        limit.update(0.5, 5, False)
+        self.assertEqual(limit.limit, 2.75)
+
+    def test_gradient_shrinks_as_latency_grows(self):
+        limit = slumber.limits.GradientLimit(initial=20, short_window=2)
+        for _ in range(50):
+            limit.update(0.1, 20, False)
+        steady = limit.limit
+
+        for _ in range(20):
+            limit.update(1.0, 20, False)
+        self.assertTrue(limit.limit < steady / 2)
+
+    def test_unknown_strategy(self):
+        with self.assertRaises(slumber.exceptions.ImproperlyConfigured):
+            slumber.ConcurrencyLimiter("nope")
+
+    def test_queues_over_the_limit(self):
+        limiter = slumber.ConcurrencyLimiter(initial=2, max_limit=2)
+        peak = []
+        stats = []
+
+        async def send():
+            peak.append(limiter.stats()["example"]["inflight"])
+            await asyncio.sleep(0.01)
+            return make_response()
+
+        async def call():
+            tasks = [asyncio.ensure_future(limiter.run("http://example/a", send)) for _ in range(5)]
+            await asyncio.sleep(0)
+            stats.append(limiter.stats()["example"])
+            await asyncio.gather(*tasks)
+
+        run(call())
+        self.assertEqual(max(peak), 2)
+        self.assertEqual(stats[0], {"limit": 2, "inflight": 2, "queued": 3})
+        self.assertEqual(limiter.stats()["example"], {"limit": 2, "inflight": 0, "queued": 0})
+
+    def test_cancelled_waiters_leave_the_queue(self):
+        limiter = slumber.ConcurrencyLimiter(initial=1, max_limit=1)
+
+        async def send():
+            await asyncio.sleep(0.01)
+            return make_response()
+
+        async def call():
+            first = asyncio.ensure_future(limiter.run("http://example/a", send))
+            second = asyncio.ensure_future(limiter.run("http://example/a", send))
+            await asyncio.sleep(0)
+            second.cancel()
+            await first
+            await asyncio.gather(second, return_exceptions=True)
+            return await limiter.run("http://example/a", send)
+
+        run(call())
+        self.assertEqual(limiter.stats()["example"], {"limit": 1, "inflight": 0, "queued": 0})
+
+    def test_api_cuts_the_limit_on_server_errors(self):
+        transport = mock.Mock(spec=slumber.transports.BaseTransport)
+        responses = [make_response(503), make_response()]
+
+        async def request(*args, **kwargs):
+            return responses.pop(0)
+
+        transport.request.side_effect = request
+        api = slumber.API("http://example/api", transport=transport, limiter="aimd")
+
+        with self.assertRaises(slumber.exceptions.HttpServerError):
+            run(api.test.get())
+        self.assertEqual(api._store["limiter"].limit("http://example/"), 18)
+        self.assertEqual(run(api.test.get()), {"result": "a"})
+        transport.request.assert_called_with("GET", "http://example/api/test/", data=None, files=None,
+                                             params={}, headers={"accept": "application/json"})
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+import time
+import mock
+import slumber
+import slumber.transports
+import unittest2 as unittest
+
+from .helpers import benchmark, make_response, run
+
+
+def make_transport(statuses=None):
+    transport = mock.Mock(spec=slumber.transports.BaseTransport)
+    statuses = list(statuses or [])
+
+    async def request(*args, **kwargs):
+        return make_response(statuses.pop(0) if statuses else 200)
+
+    transport.request.side_effect = request
+    return transport
+
+
+def tagging(name, seen):
+    async def middleware(request, handler):
+        seen.append("> " + name)
+        request.headers["x-" + name] = "1"
+        resp = await handler(request)
+        seen.append("< " + name)
+        return resp
+    return middleware
+
+
+async def passthrough(request, handler):
+    return await handler(request)
+
+
+class _Transport(slumber.transports.BaseTransport):
+
+    response = slumber.transports.Response(200, {"content-type": "application/json"}, '{"result": "a"}')
+
+    async def request(self, method, url, data=None, params=None, files=None, headers=None, timeout=None):
+        return self.response
+
+
+def per_request(middlewares, requests=5000):
+    """
+    Returns the best of three runs of the seconds a GET takes, middleware
+    included, on a transport answering at once.
+    """
+    api = slumber.API("http://example/api", transport=_Transport(), middlewares=middlewares)
+    resource = api.users
+
+    async def call():
+        for _ in range(requests // 10):
+            await resource.get()
+        start = time.perf_counter()
+        for _ in range(requests):
+            await resource.get()
+        return (time.perf_counter() - start) / requests
+
+    return min(run(call()) for _ in range(3))
+
+
+class MiddlewareTestCase(unittest.TestCase):
+
+    def test_order(self):
+        seen = []
+        transport = make_transport()
+        api = slumber.API("http://example/api", transport=transport,
+                          middlewares=[tagging("a", seen), tagging("b", seen)])
+
+        self.assertEqual(run(api.users.get()), {"result": "a"})
+        self.assertEqual(seen, ["> a", "> b", "< b", "< a"])
+        transport.request.assert_called_with("GET", "http://example/api/users/", data=None, files=None,
+                                             params={}, headers={"accept": "application/json", "x-a": "1",
+                                                                 "x-b": "1"})
+
+    def test_short_circuit(self):
+        transport = make_transport()
+
+        async def cached(request, handler):
+            return make_response(content='{"cached": true}')
+
+        api = slumber.API("http://example/api", transport=transport, middlewares=[cached])
+        self.assertEqual(run(api.users.get()), {"cached": True})
+        self.assertFalse(transport.request.called)
+
+    def test_retries_compose_with_auth(self):
+        transport = make_transport([503, 200])
+
+        async def retry(request, handler):
+            resp = await handler(request)
+            if resp.status_code == 503:
+                resp = await handler(request)
+            return resp
+
+        api = slumber.API("http://example/api", transport=transport, auth=slumber.BearerAuth("t"),
+                          middlewares=[retry])
+        self.assertEqual(run(api.users.get()), {"result": "a"})
+        self.assertEqual(transport.request.call_count, 2)
+        self.assertEqual(transport.request.call_args[1]["headers"]["authorization"], "Bearer t")
+
+    def test_inherited_and_compiled_once(self):
+        seen = []
+        transport = make_transport()
+        api = slumber.API("http://example/api", transport=transport)
+        users = api.users(5)
+
+        api.add_middleware(tagging("a", seen))
+        handler = api._store["pipeline"].handler
+        run(users.get())
+        run(api.groups.get())
+        self.assertEqual(seen, ["> a", "< a"] * 2)
+        self.assertTrue(api._store["pipeline"].handler is handler)
+
+        del seen[:]
+        run(users.with_middleware(tagging("b", seen)).get())
+        run(users.get())
+        self.assertEqual(seen, ["> a", "> b", "< b", "< a", "> a", "< a"])
+
+    def test_chain_is_compiled_once(self):
+        calls = []
+
+        async def counting(request, handler):
+            calls.append(request.url)
+            return await handler(request)
+
+        api = slumber.API("http://example/api", transport=_Transport(), middlewares=[counting] * 10)
+        handler = api._store["pipeline"].handler
+        with mock.patch("slumber.middleware._wrap") as wrap:
+            for _ in range(3):
+                run(api.users.get())
+        self.assertFalse(wrap.called)
+        self.assertTrue(api._store["pipeline"].handler is handler)
+        self.assertEqual(len(calls), 30)
+
+    def test_no_chain_without_middleware(self):
+        api = slumber.API("http://example/api", transport=_Transport())
+        pipeline = api._store["pipeline"]
+        self.assertFalse(pipeline)
+        self.assertEqual(pipeline.handler, pipeline._send)
+
+    @benchmark
+    def test_overhead(self):
+        zero = per_request([])
+        ten = per_request([passthrough] * 10)
+        # Ten middleware that do nothing cost far less than the request.
+        self.assertLess(ten, zero * 1.5, "%.1fus without middleware, %.1fus with 10" % (zero * 1e6, ten * 1e6))
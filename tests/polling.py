@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import slumber
+import slumber.inprocess
+import slumber.transports
+import unittest2 as unittest
+
+from aiohttp import web
+
+from slumber import exceptions
+from .helpers import run
+
+
+def make_app(pending_polls=2):
+    jobs = {}
+    status_requests = []
+
+    async def submit(request):
+        job = len(jobs) + 1
+        jobs[job] = 0
+        return web.json_response({}, status=202, headers={"location": "/api/jobs/%s/status" % job})
+
+    async def status(request):
+        job = int(request.match_info["job"])
+        status_requests.append(job)
+        jobs[job] += 1
+        if jobs[job] <= pending_polls:
+            return web.json_response({"state": "running"}, status=202)
+        return web.json_response({}, status=303, headers={"location": "/api/jobs/%s/result" % job})
+
+    async def result(request):
+        return web.json_response({"job": int(request.match_info["job"])})
+
+    app = web.Application()
+    app.router.add_post("/api/jobs", submit)
+    app.router.add_get("/api/jobs/{job}/status", status)
+    app.router.add_get("/api/jobs/{job}/result", result)
+    return app, jobs, status_requests
+
+
+class PollSchedulerTestCase(unittest.TestCase):
+
+    def with_api(self, test, app, **kwargs):
+        async def call():
+            transport = slumber.inprocess.AiohttpAppTransport(app)
+            api = slumber.API("http://example/api", append_slash=False, transport=transport, **kwargs)
+            try:
+                return await test(api)
+            finally:
+                await transport.close()
+
+        return run(call())
+
+    def test_post_and_wait(self):
+        app, jobs, status_requests = make_app(pending_polls=2)
+        scheduler = slumber.PollScheduler(interval=0.001)
+
+        resp = self.with_api(lambda api: api.jobs.post_and_wait({}), app, scheduler=scheduler)
+
+        self.assertEqual(resp, {"job": 1})
+        self.assertEqual(status_requests, [1, 1, 1])
+
+    def test_many_operations_share_one_scheduler(self):
+        app, jobs, status_requests = make_app(pending_polls=3)
+        scheduler = slumber.PollScheduler(interval=0.001)
+        tasks = []
+
+        async def test(api):
+            waits = [api.jobs.post_and_wait({}) for _ in range(200)]
+            results = asyncio.gather(*waits)
+            while scheduler._task is None:
+                await asyncio.sleep(0.001)
+            tasks.append(scheduler._task)
+            return await results
+
+        results = self.with_api(test, app, scheduler=scheduler)
+
+        self.assertEqual(sorted(result["job"] for result in results), list(range(1, 201)))
+        self.assertEqual(len(status_requests), 200 * 4)
+        self.assertEqual(len(scheduler), 0)
+        self.assertTrue(tasks[0] is not None)
+
+    def test_concurrency_is_shared_by_every_round(self):
+        scheduler = slumber.PollScheduler(interval=0.001, backoff=1, concurrency=2)
+        in_flight = []
+        counts = []
+
+        class Status(object):
+
+            def url(self):
+                return "http://example/api/jobs/1/status/"
+
+            async def _request(self, method):
+                in_flight.append(self)
+                counts.append(len(in_flight))
+                await asyncio.sleep(0.01)
+                in_flight.remove(self)
+                return slumber.transports.Response(200, {}, b"")
+
+        async def test():
+            first = [asyncio.ensure_future(scheduler.wait(Status())) for _ in range(4)]
+            # The heap is empty once the first round is due, with polls
+            # still in flight.
+            while scheduler._heap or not in_flight:
+                await asyncio.sleep(0.001)
+            second = [asyncio.ensure_future(scheduler.wait(Status())) for _ in range(4)]
+            await asyncio.gather(*(first + second))
+
+        run(test())
+        self.assertEqual(len(counts), 8)
+        self.assertEqual(max(counts), 2)
+
+    def test_close_cancels_pending_operations(self):
+        scheduler = slumber.PollScheduler(interval=10)
+
+        async def test():
+            api = slumber.API("http://example/api", scheduler=scheduler)
+            waiter = asyncio.ensure_future(scheduler.wait(api.jobs(1).status))
+            await asyncio.sleep(0)
+            await api.close()
+            with self.assertRaises(asyncio.CancelledError):
+                await waiter
+            return scheduler._task, len(scheduler)
+
+        self.assertEqual(run(test()), (None, 0))
+
+    def test_backoff_is_adaptive(self):
+        scheduler = slumber.PollScheduler(interval=1, backoff=2, max_interval=3)
+        operation = slumber.polling._Operation(None, None, 1, 0)
+
+        async def schedule():
+            delays = []
+            for _ in range(4):
+                delays.append(operation.interval)
+                scheduler._reschedule(operation, None)
+            scheduler._task.cancel()
+            return delays
+
+        self.assertEqual(run(schedule()), [1, 2, 3, 3])
+
+    def test_retry_after_is_honored(self):
+        scheduler = slumber.PollScheduler(interval=10)
+        operation = slumber.polling._Operation(None, None, 10, 0)
+        resp = slumber.transports.Response(202, {"retry-after": "0.5"}, b"")
+
+        async def schedule():
+            loop = asyncio.get_event_loop()
+            scheduler._reschedule(operation, resp)
+            scheduler._task.cancel()
+            return scheduler._heap[0][0] - loop.time()
+
+        self.assertTrue(0.4 < run(schedule()) <= 0.5)
+        self.assertEqual(operation.interval, 10)
+
+    def test_batched_status_checks(self):
+        app, jobs, status_requests = make_app(pending_polls=0)
+        batches = []
+        rounds = {}
+
+        async def batch(urls):
+            batches.append(len(urls))
+            done = {}
+            for url in urls:
+                rounds[url] = rounds.get(url, 0) + 1
+                done[url] = rounds[url] > 2
+            return done
+
+        scheduler = slumber.PollScheduler(interval=0.001, backoff=1, batch=batch)
+
+        async def test(api):
+            return await asyncio.gather(*[api.jobs.post_and_wait({}) for _ in range(50)])
+
+        results = self.with_api(test, app, scheduler=scheduler)
+
+        self.assertEqual(len(results), 50)
+        self.assertEqual(sorted(status_requests), list(range(1, 51)))
+        self.assertTrue(len(batches) < 50 * 3)
+
+    def test_timeout(self):
+        app, jobs, status_requests = make_app(pending_polls=10 ** 6)
+        scheduler = slumber.PollScheduler(interval=0.001, backoff=1, timeout=0.05)
+
+        with self.assertRaises(exceptions.RequestTimeout):
+            self.with_api(lambda api: api.jobs.post_and_wait({}), app, scheduler=scheduler)
+
+    def test_deadline(self):
+        app, jobs, status_requests = make_app(pending_polls=10 ** 6)
+        scheduler = slumber.PollScheduler(interval=0.001, backoff=1)
+
+        async def test(api):
+            with slumber.deadline(0.05):
+                await api.jobs.post_and_wait({})
+
+        with self.assertRaises(exceptions.DeadlineExceeded):
+            self.with_api(test, app, scheduler=scheduler)
+
+    def test_waiters_keep_their_own_deadline(self):
+        app, jobs, status_requests = make_app(pending_polls=20)
+        scheduler = slumber.PollScheduler(interval=0.005, backoff=1)
+
+        async def test(api):
+            async def short():
+                with slumber.deadline(0.02):
+                    await api.jobs.post_and_wait({})
+
+            first = asyncio.ensure_future(short())
+            while scheduler._task is None:
+                await asyncio.sleep(0.001)
+            second = asyncio.ensure_future(api.jobs.post_and_wait({}))
+            with self.assertRaises(exceptions.DeadlineExceeded):
+                await first
+            return await second
+
+        # The waiter without a deadline outlives the one that started the
+        # shared poll task.
+        self.assertEqual(self.with_api(test, app, scheduler=scheduler), {"job": 2})
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import mock
+import slumber
+import slumber.transports
+import unittest2 as unittest
+
+from .helpers import make_response, run
+
+
+class PrioritySchedulerTestCase(unittest.TestCase):
+
+    def test_weighted_fair_queueing(self):
+        scheduler = slumber.PriorityScheduler(capacity=1, weights={"high": 3, "low": 1}, reserved={},
+                                              default="low")
+        served = []
+
+        def send(name):
+            async def send():
+                served.append(name)
+                await asyncio.sleep(0)
+                return make_response()
+            return send
+
+        async def call():
+            tasks = [asyncio.ensure_future(scheduler.run(name, send(name)))
+                     for name in ["low"] * 8 + ["high"] * 8]
+            await asyncio.gather(*tasks)
+
+        run(call())
+        # The first low request had the pool to itself.
+        self.assertEqual(served[0], "low")
+        self.assertEqual(served[1:9].count("high"), 6)
+        self.assertEqual(sorted(served), ["high"] * 8 + ["low"] * 8)
+
+    def test_reserved_capacity(self):
+        scheduler = slumber.PriorityScheduler(capacity=4, reserved={"high": 2})
+        observed = []
+
+        async def call():
+            done = asyncio.Event()
+
+            async def slow():
+                await done.wait()
+                return make_response()
+
+            async def fast():
+                observed.append(scheduler.stats())
+                return make_response()
+
+            low = [asyncio.ensure_future(scheduler.run("low", slow)) for _ in range(5)]
+            await asyncio.sleep(0)
+            await scheduler.run("high", fast)
+            done.set()
+            await asyncio.gather(*low)
+
+        run(call())
+        self.assertEqual(observed[0]["low"], {"inflight": 2, "queued": 3})
+        self.assertEqual(observed[0]["high"], {"inflight": 1, "queued": 0})
+        self.assertEqual(scheduler.stats()["low"], {"inflight": 0, "queued": 0})
+
+    def test_cancelled_waiters_are_skipped(self):
+        scheduler = slumber.PriorityScheduler(capacity=1, reserved={})
+
+        async def send():
+            await asyncio.sleep(0.01)
+            return make_response()
+
+        async def call():
+            first = asyncio.ensure_future(scheduler.run("low", send))
+            second = asyncio.ensure_future(scheduler.run("low", send))
+            await asyncio.sleep(0)
+            second.cancel()
+            await first
+            await asyncio.gather(second, return_exceptions=True)
+            await scheduler.run("high", send)
+
+        run(call())
+        self.assertEqual(scheduler.stats()["low"], {"inflight": 0, "queued": 0})
+
+    def test_invalid_configuration(self):
+        with self.assertRaises(slumber.exceptions.ImproperlyConfigured):
+            slumber.PriorityScheduler(capacity=2, reserved={"high": 2})
+        with self.assertRaises(slumber.exceptions.ImproperlyConfigured):
+            run(slumber.PriorityScheduler().run("urgent", None))
+
+    def test_api_priorities(self):
+        transport = mock.Mock(spec=slumber.transports.BaseTransport)
+        scheduler = slumber.PriorityScheduler(capacity=4)
+        seen = []
+
+        async def request(*args, **kwargs):
+            seen.append(dict((name, stats["inflight"]) for name, stats in scheduler.stats().items()))
+            return make_response()
+
+        transport.request.side_effect = request
+        api = slumber.API("http://example/api", transport=transport, priorities=scheduler)
+
+        run(api.users(5).get(priority="high"))
+        run(api.backfill(priority="low").get())
+        run(api.users.get())
+
+        self.assertEqual(seen, [{"high": 1, "normal": 0, "low": 0}, {"high": 0, "normal": 0, "low": 1},
+                                {"high": 0, "normal": 1, "low": 0}])
+        transport.request.assert_called_with("GET", "http://example/api/users/", data=None, files=None,
+                                             params={}, headers={"accept": "application/json"})
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import time
+import mock
+import slumber
+import slumber.recording
+import slumber.transports
+import unittest2 as unittest
+
+from .helpers import run
+
+
+def make_transport(delay=0.0):
+    transport = mock.Mock(spec=slumber.transports.BaseTransport)
+
+    async def request(method, url, params=None, **kwargs):
+        await asyncio.sleep(delay)
+        body = json.dumps({"url": url, "params": params})
+        return slumber.transports.Response(200, {"content-type": "application/json", "set-cookie": "s=1"}, body)
+
+    transport.request.side_effect = request
+    return transport
+
+
+class RecordingTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def record(self, calls, delay=0.02, **kwargs):
+        recorder = slumber.Recorder(os.path.join(self.directory, "traffic"), **kwargs)
+        api = slumber.API("http://example/api", transport=make_transport(delay), auth=slumber.BearerAuth("t"),
+                          middlewares=[recorder])
+
+        results = run(calls(api))
+        recorder.close()
+        return recorder, results
+
+    def test_ndjson_round_trip(self):
+        async def calls(api):
+            return [await api.users(5).get(), await api.users.get(page=2, token="secret"),
+                    await api.users.post({"name": "a"})]
+
+        recorder, results = self.record(calls, redact_params=("token",))
+        entries = slumber.recording.load(recorder.path)
+
+        self.assertEqual(len(entries), 3)
+        self.assertEqual(entries[1]["params"], {"page": 2, "token": "[redacted]"})
+        self.assertEqual(dict(entries[0]["headers"])["set-cookie"], "[redacted]")
+        self.assertEqual(entries[2]["body"], '{"name": "a"}')
+        self.assertTrue(entries[0]["elapsed"] >= 0.02)
+        self.assertNotIn("Bearer t", open(recorder.path).read())
+
+        api = slumber.API("http://example/api", transport=slumber.ReplayTransport(recorder.path, latency=0))
+        self.assertEqual(run(api.users(5).get()), results[0])
+        self.assertEqual(run(api.users.get(page=2, token="other")), results[1])
+        self.assertEqual(run(api.users.post({"name": "a"})), results[2])
+        with self.assertRaises(slumber.exceptions.NotRecorded):
+            run(api.groups.get())
+
+    def test_har(self):
+        async def calls(api):
+            return [await api.users.get(page=2)]
+
+        recorder, results = self.record(calls, format="har")
+        with open(recorder.path) as f:
+            har = json.load(f)
+
+        entry = har["log"]["entries"][0]
+        self.assertEqual(entry["request"]["url"], "http://example/api/users/?page=2")
+        self.assertEqual(entry["response"]["content"]["mimeType"], "application/json")
+        self.assertTrue(entry["time"] >= 20)
+
+        api = slumber.API("http://example/api", transport=slumber.ReplayTransport(recorder.path, latency=0))
+        self.assertEqual(run(api.users.get(page=2)), results[0])
+
+    def test_sampling_and_redact(self):
+        async def calls(api):
+            return [await api.users(n).get() for n in range(200)]
+
+        recorder, results = self.record(calls, delay=0, sample=0.25, seed=1)
+        self.assertTrue(20 < recorder.recorded < 80)
+
+        def drop_users(entry):
+            return None if "/users/" in entry["url"] else entry
+
+        recorder, results = self.record(calls, delay=0, redact=drop_users)
+        self.assertEqual(recorder.recorded, 0)
+
+    def test_replay_latencies(self):
+        entries = [{"method": "GET", "url": "http://example/api/users/", "params": {}, "elapsed": 0.1,
+                    "status": 200, "headers": [["content-type", "application/json"]], "content": '{"n": %d}' % n}
+                   for n in range(2)]
+
+        def timed(latency):
+            api = slumber.API("http://example/api", transport=slumber.ReplayTransport(entries=entries,
+                                                                                      latency=latency))
+            start = time.monotonic()
+            results = [run(api.users.get()) for _ in range(3)]
+            return results, time.monotonic() - start
+
+        results, elapsed = timed(1.0)
+        self.assertEqual(results, [{"n": 0}, {"n": 1}, {"n": 0}])
+        self.assertTrue(elapsed >= 0.3)
+
+        results, elapsed = timed(0.1)
+        self.assertTrue(elapsed < 0.2)
+
+        api = slumber.API("http://example/api", transport=slumber.ReplayTransport(entries=entries))
+        start = time.monotonic()
+        with self.assertRaises(slumber.exceptions.RequestTimeout):
+            run(api.users.get(timeout=0.02))
+        self.assertTrue(time.monotonic() - start < 0.09)
+
+    def test_binary_bodies(self):
+        body = bytes(range(256))
+
+        async def handler(request):
+            return slumber.transports.Response(200, {"content-type": "application/octet-stream"}, body[::-1])
+
+        for format in ("ndjson", "har"):
+            recorder = slumber.Recorder(os.path.join(self.directory, "traffic." + format), format=format)
+            run(recorder(slumber.Request("PUT", "http://example/api/blobs/1", data=body), handler))
+            recorder.close()
+
+            entry = slumber.recording.load(recorder.path)[0]
+            self.assertEqual(slumber.recording._decode(entry["body"], entry["body_encoding"]), body)
+            self.assertEqual(slumber.recording._decode(entry["content"], entry["encoding"]), body[::-1])
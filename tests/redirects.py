@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+import slumber
+import slumber.inprocess
+import slumber.transports
+import unittest2 as unittest
+
+from aiohttp import web
+
+from slumber import exceptions
+from .helpers import run
+
+
+def make_app(pending_polls=2):
+    polls = []
+
+    async def create(request):
+        return web.json_response({}, status=201, headers={"location": "/api/things/1"})
+
+    async def thing(request):
+        return web.json_response({"id": 1})
+
+    async def submit(request):
+        return web.json_response({}, status=202, headers={"location": "/api/jobs/1/status"})
+
+    async def status(request):
+        polls.append(True)
+        if len(polls) <= pending_polls:
+            return web.json_response({"state": "running"}, status=202, headers={"retry-after": "0"})
+        return web.json_response({}, status=303, headers={"location": "/api/jobs/1/result"})
+
+    async def result(request):
+        return web.json_response({"answer": 42})
+
+    async def loop(request):
+        return web.json_response({}, status=303, headers={"location": "/api/loop"})
+
+    app = web.Application()
+    app.router.add_post("/api/things", create)
+    app.router.add_get("/api/things/1", thing)
+    app.router.add_post("/api/jobs", submit)
+    app.router.add_get("/api/jobs/1/status", status)
+    app.router.add_get("/api/jobs/1/result", result)
+    app.router.add_get("/api/loop", loop)
+    return app, polls
+
+
+class LocationPolicyTestCase(unittest.TestCase):
+
+    def with_api(self, test, app=None, **kwargs):
+        async def call():
+            transport = slumber.inprocess.AiohttpAppTransport(app if app is not None else make_app()[0])
+            api = slumber.API("http://example/api", append_slash=False, transport=transport, **kwargs)
+            try:
+                return await test(api)
+            finally:
+                await transport.close()
+
+        return run(call())
+
+    def test_default_does_not_follow(self):
+        self.assertEqual(self.with_api(lambda api: api.things.post({})), {})
+
+    def test_follow_created(self):
+        resp = self.with_api(lambda api: api.things.post({}, location="follow"))
+        self.assertEqual(resp, {"id": 1})
+
+    def test_return_location(self):
+        resp = self.with_api(lambda api: api.things.post({}), location="location")
+        self.assertEqual(resp, "http://example/api/things/1")
+
+    def test_follow_does_not_poll(self):
+        resp = self.with_api(lambda api: api.jobs.post({}, location="follow"))
+        self.assertEqual(resp, {"state": "running"})
+
+    def test_poll_accepted_until_done(self):
+        app, polls = make_app(pending_polls=3)
+        policy = slumber.LocationPolicy(mode="poll", interval=0)
+
+        resp = self.with_api(lambda api: api.jobs.post({}, location=policy), app=app)
+
+        self.assertEqual(resp, {"answer": 42})
+        self.assertEqual(len(polls), 4)
+
+    def test_poll_timeout(self):
+        app, polls = make_app(pending_polls=10 ** 6)
+        policy = slumber.LocationPolicy(mode="poll", interval=0.01, backoff=1, timeout=0.05)
+
+        with self.assertRaises(exceptions.RequestTimeout):
+            self.with_api(lambda api: api.jobs.post({}, location=policy), app=app)
+
+    def test_max_hops(self):
+        policy = slumber.LocationPolicy(max_hops=3)
+
+        with self.assertRaises(exceptions.TooManyRedirects):
+            self.with_api(lambda api: api.loop.get(location=policy))
+
+    def test_unknown_mode(self):
+        with self.assertRaises(exceptions.ImproperlyConfigured):
+            slumber.LocationPolicy(mode="teleport")
@@ -1,13 +1,16 @@
 # -*- coding: utf-8 -*-
 import sys
+import pickle
 import mock
 import requests
 import aiohttp
 import slumber
+import slumber.transports
 import slumber.serialize
 import unittest2 as unittest
 
 from slumber import exceptions
+from .helpers import run
 
 
 class ResourceTestCase(unittest.TestCase):
@@ -24,17 +27,17 @@ class ResourceTestCase(unittest.TestCase):
         r.content = '{"result": ["a", "b", "c"]}'
 
         self.base_resource._store.update({
-            "session": mock.Mock(spec=aiohttp.ClientSession),
+            "transport": mock.Mock(spec=slumber.transports.BaseTransport),
             "serializer": slumber.serialize.Serializer(),
         })
-        self.base_resource._store["session"].request.return_value = r
+        self.base_resource._store["transport"].request.return_value = r
 
-        resp = self.base_resource._request("GET")
+        resp = run(self.base_resource._request("GET"))
 
         self.assertTrue(resp is r)
         self.assertEqual(resp.content, r.content)
 
-        self.base_resource._store["session"].request.assert_called_once_with(
+        self.base_resource._store["transport"].request.assert_called_once_with(
             "GET",
             "http://example/api/v1/test",
             data=None,
@@ -43,7 +46,7 @@ class ResourceTestCase(unittest.TestCase):
             headers={"accept": self.base_resource._store["serializer"].get_content_type()}
         )
 
-        resp = self.base_resource.get()
+        resp = run(self.base_resource.get())
         self.assertEqual(resp['result'], ['a', 'b', 'c'])
 
     def test_get_200_text(self):
@@ -53,17 +56,17 @@ class ResourceTestCase(unittest.TestCase):
         r.content = "Mocked Content"
 
         self.base_resource._store.update({
-            "session": mock.Mock(spec=aiohttp.ClientSession),
+            "transport": mock.Mock(spec=slumber.transports.BaseTransport),
             "serializer": slumber.serialize.Serializer(),
         })
-        self.base_resource._store["session"].request.return_value = r
+        self.base_resource._store["transport"].request.return_value = r
 
-        resp = self.base_resource._request("GET")
+        resp = run(self.base_resource._request("GET"))
 
         self.assertTrue(resp is r)
         self.assertEqual(resp.content, "Mocked Content")
 
-        self.base_resource._store["session"].request.assert_called_once_with(
+        self.base_resource._store["transport"].request.assert_called_once_with(
             "GET",
             "http://example/api/v1/test",
             data=None,
@@ -72,7 +75,7 @@ class ResourceTestCase(unittest.TestCase):
             headers={"accept": self.base_resource._store["serializer"].get_content_type()}
         )
 
-        resp = self.base_resource.get()
+        resp = run(self.base_resource.get())
         self.assertEqual(resp, r.content)
 
     def test_options_200_json(self):
@@ -82,17 +85,17 @@ class ResourceTestCase(unittest.TestCase):
         r.content = '{"actions": {"POST": {"foo": {"required": false, "type": "string"}}}}'
 
         self.base_resource._store.update({
-            "session": mock.Mock(spec=aiohttp.ClientSession),
+            "transport": mock.Mock(spec=slumber.transports.BaseTransport),
             "serializer": slumber.serialize.Serializer(),
         })
-        self.base_resource._store["session"].request.return_value = r
+        self.base_resource._store["transport"].request.return_value = r
 
-        resp = self.base_resource._request("OPTIONS")
+        resp = run(self.base_resource._request("OPTIONS"))
 
         self.assertTrue(resp is r)
         self.assertEqual(resp.content, r.content)
 
-        self.base_resource._store["session"].request.assert_called_once_with(
+        self.base_resource._store["transport"].request.assert_called_once_with(
             "OPTIONS",
             "http://example/api/v1/test",
             data=None,
@@ -101,7 +104,7 @@ class ResourceTestCase(unittest.TestCase):
             headers={"accept": self.base_resource._store["serializer"].get_content_type()}
         )
 
-        resp = self.base_resource.options()
+        resp = run(self.base_resource.options())
         self.assertTrue('POST' in resp['actions'])
         self.assertTrue('foo' in resp['actions']['POST'])
         self.assertTrue('type' in resp['actions']['POST']['foo'])
@@ -114,17 +117,17 @@ class ResourceTestCase(unittest.TestCase):
         r.content = ''
 
         self.base_resource._store.update({
-            "session": mock.Mock(spec=aiohttp.ClientSession),
+            "transport": mock.Mock(spec=slumber.transports.BaseTransport),
             "serializer": slumber.serialize.Serializer(),
         })
-        self.base_resource._store["session"].request.return_value = r
+        self.base_resource._store["transport"].request.return_value = r
 
-        resp = self.base_resource._request("HEAD")
+        resp = run(self.base_resource._request("HEAD"))
 
         self.assertTrue(resp is r)
         self.assertEqual(resp.content, r.content)
 
-        self.base_resource._store["session"].request.assert_called_once_with(
+        self.base_resource._store["transport"].request.assert_called_once_with(
             "HEAD",
             "http://example/api/v1/test",
             data=None,
@@ -133,7 +136,7 @@ class ResourceTestCase(unittest.TestCase):
             headers={"accept": self.base_resource._store["serializer"].get_content_type()}
         )
 
-        resp = self.base_resource.head()
+        resp = run(self.base_resource.head())
         self.assertEqual(resp, r.content)
 
     def test_post_201_redirect(self):
@@ -148,17 +151,17 @@ class ResourceTestCase(unittest.TestCase):
         r2.content = '{"result": ["a", "b", "c"]}'
 
         self.base_resource._store.update({
-            "session": mock.Mock(spec=aiohttp.ClientSession),
+            "transport": mock.Mock(spec=slumber.transports.BaseTransport),
             "serializer": slumber.serialize.Serializer(),
         })
-        self.base_resource._store["session"].request.side_effect = (r1, r2)
+        self.base_resource._store["transport"].request.side_effect = (r1, r2)
 
-        resp = self.base_resource._request("POST")
+        resp = run(self.base_resource._request("POST"))
 
         self.assertTrue(resp is r1)
         self.assertEqual(resp.content, r1.content)
 
-        self.base_resource._store["session"].request.assert_called_once_with(
+        self.base_resource._store["transport"].request.assert_called_once_with(
             "POST",
             "http://example/api/v1/test",
             data=None,
@@ -167,7 +170,7 @@ class ResourceTestCase(unittest.TestCase):
             headers={"accept": self.base_resource._store["serializer"].get_content_type()}
         )
 
-        resp = self.base_resource.post(data={'foo': 'bar'})
+        resp = run(self.base_resource.post(data={'foo': 'bar'}))
         self.assertEqual(resp['result'], ['a', 'b', 'c'])
 
     def test_post_decodable_response(self):
@@ -177,17 +180,17 @@ class ResourceTestCase(unittest.TestCase):
         r.headers = {"content-type": "application/json"}
 
         self.base_resource._store.update({
-            "session": mock.Mock(spec=aiohttp.ClientSession),
+            "transport": mock.Mock(spec=slumber.transports.BaseTransport),
             "serializer": slumber.serialize.Serializer(),
         })
-        self.base_resource._store["session"].request.return_value = r
+        self.base_resource._store["transport"].request.return_value = r
 
-        resp = self.base_resource._request("POST")
+        resp = run(self.base_resource._request("POST"))
 
         self.assertTrue(resp is r)
         self.assertEqual(resp.content, r.content)
 
-        self.base_resource._store["session"].request.assert_called_once_with(
+        self.base_resource._store["transport"].request.assert_called_once_with(
             "POST",
             "http://example/api/v1/test",
             data=None,
@@ -196,7 +199,7 @@ class ResourceTestCase(unittest.TestCase):
             headers={"accept": self.base_resource._store["serializer"].get_content_type()}
         )
 
-        resp = self.base_resource.post(data={'foo': 'bar'})
+        resp = run(self.base_resource.post(data={'foo': 'bar'}))
         self.assertEqual(resp['result'], ['a', 'b', 'c'])
 
     def test_patch_201_redirect(self):
@@ -211,17 +214,17 @@ class ResourceTestCase(unittest.TestCase):
         r2.content = '{"result": ["a", "b", "c"]}'
 
         self.base_resource._store.update({
-            "session": mock.Mock(spec=aiohttp.ClientSession),
+            "transport": mock.Mock(spec=slumber.transports.BaseTransport),
             "serializer": slumber.serialize.Serializer(),
         })
-        self.base_resource._store["session"].request.side_effect = (r1, r2)
+        self.base_resource._store["transport"].request.side_effect = (r1, r2)
 
-        resp = self.base_resource._request("PATCH")
+        resp = run(self.base_resource._request("PATCH"))
 
         self.assertTrue(resp is r1)
         self.assertEqual(resp.content, r1.content)
 
-        self.base_resource._store["session"].request.assert_called_once_with(
+        self.base_resource._store["transport"].request.assert_called_once_with(
             "PATCH",
             "http://example/api/v1/test",
             data=None,
@@ -230,7 +233,7 @@ class ResourceTestCase(unittest.TestCase):
             headers={"accept": self.base_resource._store["serializer"].get_content_type()}
         )
 
-        resp = self.base_resource.patch(data={'foo': 'bar'})
+        resp = run(self.base_resource.patch(data={'foo': 'bar'}))
         self.assertEqual(resp['result'], ['a', 'b', 'c'])
 
     def test_patch_decodable_response(self):
@@ -240,17 +243,17 @@ class ResourceTestCase(unittest.TestCase):
         r.headers = {"content-type": "application/json"}
 
         self.base_resource._store.update({
-            "session": mock.Mock(spec=aiohttp.ClientSession),
+            "transport": mock.Mock(spec=slumber.transports.BaseTransport),
             "serializer": slumber.serialize.Serializer(),
         })
-        self.base_resource._store["session"].request.return_value = r
+        self.base_resource._store["transport"].request.return_value = r
 
-        resp = self.base_resource._request("PATCH")
+        resp = run(self.base_resource._request("PATCH"))
 
         self.assertTrue(resp is r)
         self.assertEqual(resp.content, r.content)
 
-        self.base_resource._store["session"].request.assert_called_once_with(
+        self.base_resource._store["transport"].request.assert_called_once_with(
             "PATCH",
             "http://example/api/v1/test",
             data=None,
@@ -259,7 +262,7 @@ class ResourceTestCase(unittest.TestCase):
             headers={"accept": self.base_resource._store["serializer"].get_content_type()}
         )
 
-        resp = self.base_resource.patch(data={'foo': 'bar'})
+        resp = run(self.base_resource.patch(data={'foo': 'bar'}))
         self.assertEqual(resp['result'], ['a', 'b', 'c'])
 
     def test_put_201_redirect(self):
@@ -274,17 +277,17 @@ class ResourceTestCase(unittest.TestCase):
         r2.content = '{"result": ["a", "b", "c"]}'
 
         self.base_resource._store.update({
-            "session": mock.Mock(spec=aiohttp.ClientSession),
+            "transport": mock.Mock(spec=slumber.transports.BaseTransport),
             "serializer": slumber.serialize.Serializer(),
         })
-        self.base_resource._store["session"].request.side_effect = (r1, r2)
+        self.base_resource._store["transport"].request.side_effect = (r1, r2)
 
-        resp = self.base_resource._request("PUT")
+        resp = run(self.base_resource._request("PUT"))
 
         self.assertTrue(resp is r1)
         self.assertEqual(resp.content, r1.content)
 
-        self.base_resource._store["session"].request.assert_called_once_with(
+        self.base_resource._store["transport"].request.assert_called_once_with(
             "PUT",
             "http://example/api/v1/test",
             data=None,
@@ -293,7 +296,7 @@ class ResourceTestCase(unittest.TestCase):
             headers={"accept": self.base_resource._store["serializer"].get_content_type()}
         )
 
-        resp = self.base_resource.put(data={'foo': 'bar'})
+        resp = run(self.base_resource.put(data={'foo': 'bar'}))
         self.assertEqual(resp['result'], ['a', 'b', 'c'])
 
     def test_put_decodable_response(self):
@@ -303,17 +306,17 @@ class ResourceTestCase(unittest.TestCase):
         r.headers = {"content-type": "application/json"}
 
         self.base_resource._store.update({
-            "session": mock.Mock(spec=aiohttp.ClientSession),
+            "transport": mock.Mock(spec=slumber.transports.BaseTransport),
             "serializer": slumber.serialize.Serializer(),
         })
-        self.base_resource._store["session"].request.return_value = r
+        self.base_resource._store["transport"].request.return_value = r
 
-        resp = self.base_resource._request("PUT")
+        resp = run(self.base_resource._request("PUT"))
 
         self.assertTrue(resp is r)
         self.assertEqual(resp.content, r.content)
 
-        self.base_resource._store["session"].request.assert_called_once_with(
+        self.base_resource._store["transport"].request.assert_called_once_with(
             "PUT",
             "http://example/api/v1/test",
             data=None,
@@ -322,7 +325,7 @@ class ResourceTestCase(unittest.TestCase):
             headers={"accept": self.base_resource._store["serializer"].get_content_type()}
         )
 
-        resp = self.base_resource.put(data={'foo': 'bar'})
+        resp = run(self.base_resource.put(data={'foo': 'bar'}))
         self.assertEqual(resp['result'], ['a', 'b', 'c'])
 
     def test_handle_serialization(self):
@@ -347,13 +350,13 @@ class ResourceTestCase(unittest.TestCase):
         resp.content = None
 
         self.base_resource._store.update({
-            "session": mock.Mock(spec=aiohttp.ClientSession),
+            "transport": mock.Mock(spec=slumber.transports.BaseTransport),
             "serializer": slumber.serialize.Serializer(),
         })
 
-        self.base_resource._store["session"].request.return_value = resp
+        self.base_resource._store["transport"].request.return_value = resp
 
-        self.assertEqual(self.base_resource.post(), None)
+        self.assertEqual(run(self.base_resource.post()), None)
 
     def test_get_200_subresource_json(self):
         r = mock.Mock(spec=aiohttp.ClientResponse)
@@ -362,17 +365,17 @@ class ResourceTestCase(unittest.TestCase):
         r.content = '{"result": ["a", "b", "c"]}'
 
         self.base_resource._store.update({
-            "session": mock.Mock(spec=aiohttp.ClientSession),
+            "transport": mock.Mock(spec=slumber.transports.BaseTransport),
             "serializer": slumber.serialize.Serializer(),
         })
-        self.base_resource._store["session"].request.return_value = r
+        self.base_resource._store["transport"].request.return_value = r
 
-        resp = self.base_resource.subresource._request("GET")
+        resp = run(self.base_resource.subresource._request("GET"))
 
         self.assertTrue(resp is r)
         self.assertEqual(resp.content, r.content)
 
-        self.base_resource._store["session"].request.assert_called_once_with(
+        self.base_resource._store["transport"].request.assert_called_once_with(
             "GET",
             "http://example/api/v1/test/subresource",
             data=None,
@@ -381,7 +384,7 @@ class ResourceTestCase(unittest.TestCase):
             headers={"accept": self.base_resource._store["serializer"].get_content_type()}
         )
 
-        resp = self.base_resource.get()
+        resp = run(self.base_resource.get())
         self.assertEqual(resp['result'], ['a', 'b', 'c'])
 
     def test_bad_resource_name(self):
@@ -395,14 +398,14 @@ class ResourceTestCase(unittest.TestCase):
         r.content = ''
 
         self.base_resource._store.update({
-            "session": mock.Mock(spec=aiohttp.ClientSession),
+            "transport": mock.Mock(spec=slumber.transports.BaseTransport),
             "serializer": slumber.serialize.Serializer(),
         })
 
-        self.base_resource._store["session"].request.return_value = r
+        self.base_resource._store["transport"].request.return_value = r
 
         with self.assertRaises(exceptions.HttpClientError):
-            self.base_resource.req._request("GET")
+            run(self.base_resource.req._request("GET"))
 
 
     def test_get_404_response(self):
@@ -412,13 +415,13 @@ class ResourceTestCase(unittest.TestCase):
         r.content = ''
 
         self.base_resource._store.update({
-            "session": mock.Mock(spec=aiohttp.ClientSession),
+            "transport": mock.Mock(spec=slumber.transports.BaseTransport),
             "serializer": slumber.serialize.Serializer(),
         })
-        self.base_resource._store["session"].request.return_value = r
+        self.base_resource._store["transport"].request.return_value = r
 
         with self.assertRaises(exceptions.HttpNotFoundError):
-            self.base_resource.req._request("GET")
+            run(self.base_resource.req._request("GET"))
 
     def test_get_500_response(self):
         r = mock.Mock(spec=aiohttp.ClientResponse)
@@ -427,13 +430,13 @@ class ResourceTestCase(unittest.TestCase):
         r.content = ''
 
         self.base_resource._store.update({
-            "session": mock.Mock(spec=aiohttp.ClientSession),
+            "transport": mock.Mock(spec=slumber.transports.BaseTransport),
             "serializer": slumber.serialize.Serializer(),
         })
-        self.base_resource._store["session"].request.return_value = r
+        self.base_resource._store["transport"].request.return_value = r
 
         with self.assertRaises(exceptions.HttpServerError):
-            self.base_resource.req._request("GET")
+            run(self.base_resource.req._request("GET"))
 
     def test_improperly_conf(self):
         with self.assertRaises(exceptions.ImproperlyConfigured):
@@ -445,9 +448,9 @@ class ResourceTestCase(unittest.TestCase):
         r.headers = {"content-type": "application/json"}
         r.content = '{"result": ["a", "b", "c"]}'
 
-        client = slumber.API(base_url="http://example/api/v1", session=mock.Mock(spec=aiohttp.ClientSession))
-        client.test._store["session"].request.return_value = r
-        resp = client.test.get()
+        client = slumber.API(base_url="http://example/api/v1", transport=mock.Mock(spec=slumber.transports.BaseTransport))
+        client.test._store["transport"].request.return_value = r
+        resp = run(client.test.get())
 
         self.assertEqual(resp['result'], ['a', 'b', 'c'])
 
@@ -473,17 +476,17 @@ class ResourceTestCase(unittest.TestCase):
         r.content = b'{"result": ["a", "b", "c"]}'
 
         self.base_resource._store.update({
-            "session": mock.Mock(spec=aiohttp.ClientSession),
+            "transport": mock.Mock(spec=slumber.transports.BaseTransport),
             "serializer": slumber.serialize.Serializer(),
         })
-        self.base_resource._store["session"].request.return_value = r
+        self.base_resource._store["transport"].request.return_value = r
 
-        resp = self.base_resource._request("GET")
+        resp = run(self.base_resource._request("GET"))
 
         self.assertTrue(resp is r)
         self.assertEqual(resp.content, r.content)
 
-        self.base_resource._store["session"].request.assert_called_once_with(
+        self.base_resource._store["transport"].request.assert_called_once_with(
             "GET",
             "http://example/api/v1/test",
             data=None,
@@ -492,7 +495,7 @@ class ResourceTestCase(unittest.TestCase):
             headers={"accept": self.base_resource._store["serializer"].get_content_type()}
         )
 
-        resp = self.base_resource.get()
+        resp = run(self.base_resource.get())
         self.assertEqual(resp['result'], ['a', 'b', 'c'])
 
     def test_get_with_raw(self):
@@ -502,59 +505,59 @@ class ResourceTestCase(unittest.TestCase):
         r.content = '{"result": "a"}'
 
         self.base_resource._store.update({
-            "session": mock.Mock(spec=aiohttp.ClientSession),
+            "transport": mock.Mock(spec=slumber.transports.BaseTransport),
             "serializer": slumber.serialize.Serializer(),
             "raw": True,
         })
-        self.base_resource._store["session"].request.return_value = r
+        self.base_resource._store["transport"].request.return_value = r
 
-        (response, decoded) = self.base_resource.get()
+        (response, decoded) = run(self.base_resource.get())
 
         self.assertIsInstance(response, aiohttp.ClientResponse)
         self.assertEqual(decoded["result"], "a")
 
     def test_as_raw_resource_get(self):
         apiurl = "http://example/api/v1"
-        ses = mock.Mock(spec=aiohttp.ClientSession)
+        ses = mock.Mock(spec=slumber.transports.BaseTransport)
         r = mock.Mock(spec=aiohttp.ClientResponse)
         r.status_code = 200
         r.headers = {}
         ses.request.return_value = r
 
-        api = slumber.API(apiurl, session=ses)
+        api = slumber.API(apiurl, transport=ses)
 
-        (response, _) = api.myresource(1).subresource.as_raw().get()
+        (response, _) = run(api.myresource(1).subresource.as_raw().get())
         self.assertIsInstance(response, aiohttp.ClientResponse)
 
     def test_all_resource_requests_are_raw_if_set_in_api(self):
         apiurl = "http://example/api/v1"
-        ses = mock.Mock(spec=aiohttp.ClientSession)
+        ses = mock.Mock(spec=slumber.transports.BaseTransport)
         r = mock.Mock(spec=aiohttp.ClientResponse)
         r.status_code = 200
         r.headers = {}
         ses.request.return_value = r
 
-        api = slumber.API(apiurl, session=ses, raw=True)
+        api = slumber.API(apiurl, transport=ses, raw=True)
 
-        (response, _) = api.myresource(1).subresource.get()
+        (response, _) = run(api.myresource(1).subresource.get())
         self.assertIsInstance(response, aiohttp.ClientResponse)
 
-        (response, _) = api.myresource(1).get()
+        (response, _) = run(api.myresource(1).get())
         self.assertIsInstance(response, aiohttp.ClientResponse)
 
     def test_send_content_type_only_if_body_data_exists(self):
         apiuri = "http://example/api/v1/"
         newuri = "http://example/api/v1/myresource/"
-        ses = mock.Mock(spec=aiohttp.ClientSession)
+        ses = mock.Mock(spec=slumber.transports.BaseTransport)
         r = mock.Mock(spec=aiohttp.ClientResponse)
         r.status_code = 201
         r.headers = {}
         ses.request.return_value = r
 
-        api = slumber.API(apiuri, session=ses)
+        api = slumber.API(apiuri, transport=ses)
 
         # Empty post request
-        api.myresource.post()
+        run(api.myresource.post())
         ses.return_value.status_code = 201
         ses.return_value.headers = {}
         self.assertEqual(ses.request.call_count, 1)
@@ -567,7 +570,7 @@ class ResourceTestCase(unittest.TestCase):
                 files=None,
                 params={})
 
-        api.myresource.post(data=dict(key='value'))
+        run(api.myresource.post(data=dict(key='value')))
         self.assertEqual(ses.request.call_count, 2)
         ses.request.assert_called_with('POST', newuri,
                 headers={
@@ -584,11 +587,11 @@ class ResourceTestCase(unittest.TestCase):
         postparams = dict(key1=1, key2="two")
         listuri = "http://example/api/v1/"
         newuri = "http://example/api/v1/myres/newthing/"
-        ses = mock.Mock(spec=aiohttp.ClientSession)
+        ses = mock.Mock(spec=slumber.transports.BaseTransport)
         ses.request.return_value.status_code = 201
         ses.request.return_value.headers = { "location": newuri }
-        api = slumber.API(listuri, session=ses)
-        api.myres.post(postparams, **getparams)
+        api = slumber.API(listuri, transport=ses)
+        run(api.myres.post(postparams, **getparams))
         self.assertEqual(ses.request.call_count, 2)
         ses.request.assert_called_with('GET', newuri,
                 headers={
@@ -605,17 +608,17 @@ class ResourceTestCase(unittest.TestCase):
         r.headers = {"content-type": "application/json"}
 
         self.base_resource._store.update({
-            "session": mock.Mock(spec=aiohttp.ClientSession),
+            "transport": mock.Mock(spec=slumber.transports.BaseTransport),
             "serializer": slumber.serialize.Serializer(),
         })
-        self.base_resource._store["session"].request.return_value = r
+        self.base_resource._store["transport"].request.return_value = r
 
-        resp = self.base_resource._request("POST")
+        resp = run(self.base_resource._request("POST"))
 
         self.assertTrue(resp is r)
         self.assertEqual(resp.content, r.content)
 
-        self.base_resource._store["session"].request.assert_called_once_with(
+        self.base_resource._store["transport"].request.assert_called_once_with(
             "POST",
             "http://example/api/v1/test",
             data=None,
@@ -624,6 +627,149 @@ class ResourceTestCase(unittest.TestCase):
             headers={"accept": self.base_resource._store["serializer"].get_content_type()}
         )
 
-        resp = self.base_resource.post(data={'foo': 'bar'})
+        resp = run(self.base_resource.post(data={'foo': 'bar'}))
         expected = b'Pr\xc3\xa9paratoire'.decode('utf8')
         self.assertEqual(resp['result'], expected)
+
+    def _raw_api(self):
+        ses = mock.Mock(spec=slumber.transports.BaseTransport)
+        ses.request.return_value = slumber.transports.Response(
+            200, {"content-type": "application/json"}, b'{"result": "a"}')
+        return slumber.API("http://example/api/v1", transport=ses)
+
+    def test_as_raw_does_not_leak_to_siblings(self):
+        api = self._raw_api()
+        resource = api.myresource
+
+        raw = resource.as_raw()
+
+        self.assertEqual(run(resource.get()), {"result": "a"})
+        (response, decoded) = run(raw.get())
+        self.assertEqual(decoded, {"result": "a"})
+
+    def test_raw_bytes_and_memoryview_skip_decoding(self):
+        api = self._raw_api()
+
+        with mock.patch.object(slumber.Resource, "_try_to_serialize_response") as decode:
+            body = run(api.myresource.get(raw="bytes"))
+            view = run(api.myresource.as_raw("memoryview").get())
+
+        self.assertEqual(decode.call_count, 0)
+        self.assertEqual(body, b'{"result": "a"}')
+        self.assertIsInstance(view, memoryview)
+        self.assertEqual(view.tobytes(), b'{"result": "a"}')
+
+    def test_raw_lazy_decodes_once_on_access(self):
+        api = self._raw_api()
+        loads = mock.Mock(wraps=slumber.serialize.JsonSerializer.loads)
+
+        with mock.patch.object(slumber.serialize.JsonSerializer, "loads", autospec=True, side_effect=loads):
+            resp = run(api.myresource.get(raw="lazy"))
+            self.assertEqual(loads.call_count, 0)
+            self.assertEqual(resp.status_code, 200)
+            self.assertEqual(resp.content, b'{"result": "a"}')
+
+            self.assertEqual(resp.data, {"result": "a"})
+            self.assertEqual(resp.data, {"result": "a"})
+
+        self.assertEqual(loads.call_count, 1)
+
+    def test_per_call_raw_is_not_sent_as_param(self):
+        api = self._raw_api()
+
+        run(api.myresource.get(raw="bytes", q="x"))
+
+        self.assertEqual(api.myresource._store["transport"].request.call_args[1]["params"], {"q": "x"})
+
+    def test_option_names_with_other_values_are_params(self):
+        api = self._raw_api()
+        params = {"timeout": "soon", "raw": "yes", "cache": "none", "priority": 3, "location": "Paris",
+                  "headers": "x", "hedge": "both", "on_status": "any", "idempotency": "key-1", "columnar": "x"}
+
+        self.assertEqual(run(api.myresource.get(**params)), {"result": "a"})
+        self.assertEqual(api.myresource._store["transport"].request.call_args[1]["params"], params)
+
+        run(api.myresource.post({}, params={"not_found": 1, "timeout": 5}, q="x"))
+        self.assertEqual(api.myresource._store["transport"].request.call_args[1]["params"],
+                         {"not_found": 1, "timeout": 5, "q": "x"})
+
+    def _status_api(self, status_code, content=b'{"detail": "nope"}'):
+        ses = mock.Mock(spec=slumber.transports.BaseTransport)
+        ses.request.return_value = slumber.transports.Response(
+            status_code, {"content-type": "application/json"}, content)
+        return slumber.API("http://example/api/v1", transport=ses, append_slash=False)
+
+    def test_not_found_returns_value(self):
+        api = self._status_api(404)
+
+        self.assertEqual(run(api.myresource(1).get(not_found=None)), None)
+        self.assertEqual(run(api.myresource(1).delete(not_found=False)), False)
+        self.assertFalse("not_found" in api.myresource._store["transport"].request.call_args[1]["params"])
+
+        with self.assertRaises(exceptions.HttpNotFoundError):
+            run(api.myresource(1).get())
+
+    def test_on_status_returns_value(self):
+        api = self._status_api(410)
+        gone = object()
+
+        self.assertTrue(run(api.myresource(1).get(on_status={410: gone})) is gone)
+
+        with self.assertRaises(exceptions.HttpClientError):
+            run(api.myresource(1).get(not_found=None))
+
+    def test_exception_is_lazy(self):
+        api = self._status_api(404)
+
+        with mock.patch.object(slumber.serialize.JsonSerializer, "loads") as loads:
+            loads.return_value = {"detail": "nope"}
+            try:
+                run(api.myresource(1).get())
+            except exceptions.HttpNotFoundError as exc:
+                error = exc
+
+            self.assertEqual(loads.call_count, 0)
+            self.assertEqual(error.data, {"detail": "nope"})
+            self.assertEqual(error.data, {"detail": "nope"})
+            self.assertEqual(loads.call_count, 1)
+
+        self.assertEqual(error.content, b'{"detail": "nope"}')
+        self.assertEqual(error.response.status_code, 404)
+        self.assertEqual(str(error), "Client Error 404: http://example/api/v1/myresource/1")
+
+    def test_exception_keeps_explicit_arguments(self):
+        error = exceptions.HttpServerError("Boom", response=None, content="body", extra=1)
+
+        self.assertEqual(str(error), "Boom")
+        self.assertEqual(error.content, "body")
+        self.assertEqual(error.extra, 1)
+
+    def test_exception_pickles(self):
+        api = self._status_api(404)
+        try:
+            run(api.myresource(1).get())
+        except exceptions.HttpNotFoundError as exc:
+            error = pickle.loads(pickle.dumps(exc))
+
+        self.assertIsInstance(error, exceptions.HttpNotFoundError)
+        self.assertEqual(str(error), "Client Error 404: http://example/api/v1/myresource/1")
+        self.assertEqual(error.url, "http://example/api/v1/myresource/1")
+        self.assertEqual(error.response.status_code, 404)
+        self.assertEqual(error.response.headers["Content-Type"], "application/json")
+        self.assertEqual(error.content, b'{"detail": "nope"}')
+        self.assertEqual(error.data, {"detail": "nope"})
+
+        error = pickle.loads(pickle.dumps(exceptions.HttpServerError("Boom", content="body", extra=1)))
+        self.assertEqual((str(error), error.content, error.extra), ("Boom", "body", 1))
+
+    def test_exception_with_an_undecodable_body_pickles(self):
+        api = self._status_api(502, content=b"<html>Bad Gateway</html>")
+        try:
+            run(api.myresource(1).get())
+        except exceptions.HttpServerError as exc:
+            error = pickle.loads(pickle.dumps(exc))
+
+        self.assertEqual(error.response.status_code, 502)
+        self.assertEqual(error.content, b"<html>Bad Gateway</html>")
+        with self.assertRaises(ValueError):
+            error.data
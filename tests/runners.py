@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import os
+import slumber
+import slumber.runners
+import unittest2 as unittest
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from .helpers import run
+
+
+async def item(request):
+    return web.json_response({"id": int(request.match_info["id"])})
+
+
+async def fetch(api, id):
+    data = await api.items(id).get()
+    return data["id"], os.getpid()
+
+
+async def slow_first(api, id):
+    await asyncio.sleep(0.2 if id == 0 else 0)
+    return id
+
+
+async def fail(api, id):
+    raise ValueError(id)
+
+
+class ProcessRunnerTestCase(unittest.TestCase):
+
+    def test_results_stream_in_order(self):
+        async def call():
+            app = web.Application()
+            app.router.add_get("/api/items/{id}/", item)
+            server = TestServer(app)
+            await server.start_server()
+            try:
+                config = {"base_url": str(server.make_url("/api"))}
+                async with slumber.ProcessRunner(config, fetch, processes=2, chunk_size=3) as runner:
+                    return [result async for result in runner.map(range(20))]
+            finally:
+                await server.close()
+
+        results = run(call())
+        self.assertEqual([id for id, _ in results], list(range(20)))
+        self.assertFalse(os.getpid() in set(pid for _, pid in results))
+
+    def test_unordered(self):
+        async def call():
+            async with slumber.ProcessRunner({"base_url": "http://example/api"}, slow_first, processes=2,
+                                             chunk_size=1, ordered=False) as runner:
+                return [result async for result in runner.map(range(4))]
+
+        results = run(call())
+        self.assertEqual(sorted(results), [0, 1, 2, 3])
+        self.assertEqual(results[-1], 0)
+
+    def test_errors_are_raised(self):
+        async def call():
+            async with slumber.ProcessRunner({"base_url": "http://example/api"}, fail, processes=1) as runner:
+                return [result async for result in runner.map(range(2))]
+
+        with self.assertRaises(ValueError):
+            run(call())
+
+    def test_chunks(self):
+        self.assertEqual(list(slumber.runners._chunks(range(5), 2)), [[0, 1], [2, 3], [4]])
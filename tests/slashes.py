@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import tempfile
+import slumber
+import slumber.inprocess
+import slumber.slashes
+import slumber.transports
+import unittest2 as unittest
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from .helpers import run
+
+
+def make_app(paths):
+    """
+    An ASGI app serving the paths without a trailing slash under /api/items
+    and with one elsewhere, redirecting the other form, and recording the
+    requested paths.
+    """
+    async def app(scope, receive, send):
+        path = scope["path"]
+        paths.append((scope["method"], path))
+
+        wants_slash = not path.startswith("/api/items")
+        if path.endswith("/") != wants_slash:
+            location = path + "/" if wants_slash else path.rstrip("/")
+            status = 301 if wants_slash else 308
+            await send({"type": "http.response.start", "status": status,
+                        "headers": [(b"location", location.encode("utf-8"))]})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": [(b"content-type", b"application/json")]})
+        await send({"type": "http.response.body", "body": b'{"path": "%s"}' % path.encode("utf-8")})
+
+    return app
+
+
+class SlashTableTestCase(unittest.TestCase):
+
+    def test_template(self):
+        template = slumber.slashes.template
+        self.assertEqual(template("http://x/api/users/12/"), "http://x/api/users/*")
+        self.assertEqual(template("http://x/api/users/0b6f7e2c-4a53-4b7c-9b1e-6f2d1c0e9a11/posts"),
+                         "http://x/api/users/*/posts")
+        self.assertEqual(template("http://x/api/users/me"), "http://x/api/users/me")
+
+    def test_toggled(self):
+        toggled = slumber.slashes.toggled
+        self.assertTrue(toggled("http://x/a/", "http://x/a?q=1"))
+        self.assertTrue(toggled("http://x/a", "http://x/a/"))
+        self.assertFalse(toggled("http://x/a/", "http://x/a/"))
+        self.assertFalse(toggled("http://x/a/", "http://x/b"))
+        self.assertFalse(toggled("http://x/a/", None))
+
+    def test_learns_per_template(self):
+        paths = []
+
+        async def call():
+            transport = slumber.inprocess.ASGITransport(make_app(paths))
+            api = slumber.API("http://example/api", append_slash="auto", transport=transport)
+            results = [await api.items(1).get(), await api.items(2).get(q="x"), await api.groups.get()]
+            return api, results
+
+        api, results = run(call())
+        self.assertEqual([result["path"] for result in results], ["/api/items/1", "/api/items/2", "/api/groups/"])
+        self.assertEqual(paths, [("GET", "/api/items/1/"), ("GET", "/api/items/1"), ("GET", "/api/items/2"),
+                                 ("GET", "/api/groups/")])
+        self.assertEqual(api._store["slashes"].dump(), {"http://example/api/items/*": False})
+
+    def test_unsafe_verbs_follow_preserving_redirects_only(self):
+        paths = []
+
+        async def call():
+            transport = slumber.inprocess.ASGITransport(make_app(paths))
+            table = slumber.SlashTable(default=False)
+            api = slumber.API("http://example/api", append_slash="auto", slashes=table, transport=transport)
+            await api.items.post({"a": 1})
+            await api.groups.post({"a": 1})
+            return table
+
+        table = run(call())
+        self.assertEqual(paths, [("POST", "/api/items"), ("POST", "/api/groups")])
+        self.assertEqual(len(table), 0)
+
+    def test_bounded_and_persisted(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, "slashes.json")
+
+        table = slumber.SlashTable(max_entries=2)
+        for name in ("a", "b", "c"):
+            table.learn("http://x/%s/" % name, False)
+        table.wants_slash("http://x/b")
+        table.learn("http://x/d", True)
+        self.assertEqual(sorted(table.dump()), ["http://x/b", "http://x/d"])
+
+        table.save(path)
+        loaded = slumber.SlashTable.load(path)
+        self.assertEqual(loaded.apply("http://x/b/"), "http://x/b")
+        self.assertEqual(loaded.apply("http://x/d"), "http://x/d/")
+        self.assertEqual(len(slumber.SlashTable.load(os.path.join(directory, "missing.json"))), 0)
+
+    def test_learns_from_redirects_followed_by_aiohttp(self):
+        async def handler(request):
+            return web.json_response({"path": request.path})
+
+        async def call():
+            app = web.Application(middlewares=[web.normalize_path_middleware(append_slash=False,
+                                                                             remove_slash=True)])
+            app.router.add_get("/api/items", handler)
+            server = TestServer(app)
+            await server.start_server()
+            api = slumber.API(str(server.make_url("/api")), append_slash="auto")
+            try:
+                results = [await api.items.get(), await api.items.get()]
+            finally:
+                await api.close()
+                await server.close()
+            return api, results
+
+        api, results = run(call())
+        self.assertEqual(results, [{"path": "/api/items"}] * 2)
+        self.assertEqual(api._store["slashes"].learned, 1)
+        self.assertEqual(api.items.url()[-6:], "/items")
@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+import slumber
+import slumber.inprocess
+import slumber.streams
+import slumber.transports
+import unittest2 as unittest
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from slumber import exceptions
+from .helpers import run
+
+
+def make_app(connections, chunks_per_connection, content_type=b"text/event-stream", status=200):
+    """
+    An ASGI app sending the next list of chunks on each connection and
+    recording the headers of the requests.
+    """
+    async def app(scope, receive, send):
+        connections.append(dict(scope["headers"]))
+        chunks = chunks_per_connection[min(len(connections), len(chunks_per_connection)) - 1]
+
+        await send({"type": "http.response.start", "status": status,
+                    "headers": [(b"content-type", content_type)]})
+        for chunk in chunks:
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": b""})
+
+    return app
+
+
+async def take(iterator, count):
+    items = []
+    async for item in iterator:
+        items.append(item)
+        if len(items) == count:
+            break
+    await iterator.aclose()
+    return items
+
+
+class EventStreamParserTestCase(unittest.TestCase):
+
+    def test_chunks_split_anywhere(self):
+        body = b'retry: 1500\r\nid: 1\r\nevent: update\r\ndata: {"a":\r\ndata: 1}\r\n\r\n: ping\r\n\r\nid: 2\r\ndata: "\xc3\xa9"\r\n\r\n'
+
+        for size in (1, 2, 5, len(body)):
+            parser = slumber.streams.EventStreamParser(loads=slumber.serialize.JsonSerializer().loads)
+            events = []
+            for start in range(0, len(body), size):
+                events.extend(parser.feed(body[start:start + size]))
+
+            self.assertEqual([(e.event, e.id, e.data) for e in events], [("update", "1", {"a": 1}),
+                                                                         ("message", "2", u"é")])
+            self.assertEqual(parser.last_event_id, "2")
+            self.assertEqual(parser.retry, 1.5)
+
+    def test_line_parser(self):
+        parser = slumber.streams.LineParser()
+        self.assertEqual(parser.feed(b'{"a": 1}\n{"b"'), [b'{"a": 1}'])
+        self.assertEqual(parser.feed(b': 2}\r\n\n'), [b'{"b": 2}'])
+
+
+class SubscribeTestCase(unittest.TestCase):
+
+    def test_server_sent_events(self):
+        connections = []
+        app = make_app(connections, [[b'id: 1\ndata: {"n": ', b'1}\n\nid: 2\ndata: {"n": 2}\n\n']])
+
+        async def call():
+            api = slumber.API("http://example/api", transport=slumber.inprocess.ASGITransport(app))
+            return await take(api.events.subscribe(), 2)
+
+        events = run(call())
+        self.assertEqual([(e.id, e.data) for e in events], [("1", {"n": 1}), ("2", {"n": 2})])
+        self.assertEqual(connections[0][b"accept"], b"text/event-stream, application/x-ndjson")
+
+    def test_reconnects_with_last_event_id(self):
+        connections = []
+        app = make_app(connections, [[b"retry: 0\nid: 7\ndata: 1\n\n"], [b"id: 8\ndata: 2\n\n"]])
+
+        async def call():
+            api = slumber.API("http://example/api", transport=slumber.inprocess.ASGITransport(app))
+            return await take(api.events.subscribe(), 2)
+
+        events = run(call())
+        self.assertEqual([e.data for e in events], [1, 2])
+        self.assertEqual(len(connections), 2)
+        self.assertFalse(b"last-event-id" in connections[0])
+        self.assertEqual(connections[1][b"last-event-id"], b"7")
+
+    def test_no_content_stops(self):
+        connections = []
+        app = make_app(connections, [[]], status=204)
+
+        async def call():
+            api = slumber.API("http://example/api", transport=slumber.inprocess.ASGITransport(app))
+            return [event async for event in api.events.subscribe()]
+
+        self.assertEqual(run(call()), [])
+        self.assertEqual(len(connections), 1)
+
+    def test_http_errors_raise(self):
+        app = make_app([], [[b'{"detail": "no"}']], content_type=b"application/json", status=403)
+
+        async def call():
+            api = slumber.API("http://example/api", transport=slumber.inprocess.ASGITransport(app))
+            return [event async for event in api.events.subscribe()]
+
+        with self.assertRaises(exceptions.HttpClientError) as ctx:
+            run(call())
+        self.assertEqual(ctx.exception.data, {"detail": "no"})
+
+    def test_ndjson(self):
+        app = make_app([], [[b'{"n": 1}\n{"n"', b': 2}\n', b'{"n": 3}\n']], content_type=b"application/x-ndjson")
+
+        async def call():
+            api = slumber.API("http://example/api", transport=slumber.inprocess.ASGITransport(app))
+            return await take(api.feed.subscribe(reconnect=False), 3)
+
+        self.assertEqual(run(call()), [{"n": 1}, {"n": 2}, {"n": 3}])
+
+    def test_ndjson_ends_with_the_stream(self):
+        connections = []
+        app = make_app(connections, [[b'{"n": 1}\n{"n": 2}\n']], content_type=b"application/x-ndjson")
+
+        async def call(**kwargs):
+            api = slumber.API("http://example/api", transport=slumber.inprocess.ASGITransport(app))
+            return await take(api.feed.subscribe(retry=0, **kwargs), 6)
+
+        self.assertEqual(run(call()), [{"n": 1}, {"n": 2}])
+        self.assertEqual(len(connections), 1)
+
+        # Reopened on demand, it is replayed.
+        self.assertEqual([item["n"] for item in run(call(reconnect=True))], [1, 2, 1, 2, 1, 2])
+
+    def test_max_retries(self):
+        class Failing(slumber.transports.BaseTransport):
+            calls = 0
+
+            def stream(self, *args, **kwargs):
+                Failing.calls += 1
+                raise ConnectionResetError()
+
+        async def call():
+            api = slumber.API("http://example/api", transport=Failing())
+            return [event async for event in api.events.subscribe(retry=0, max_retries=2)]
+
+        with self.assertRaises(ConnectionResetError):
+            run(call())
+        self.assertEqual(Failing.calls, 3)
+
+    def test_aiohttp_stream(self):
+        async def handler(request):
+            resp = web.StreamResponse(headers={"content-type": "text/event-stream"})
+            await resp.prepare(request)
+            for n in range(3):
+                await resp.write(("data: %d\n\n" % n).encode("utf-8"))
+            return resp
+
+        async def call():
+            app = web.Application()
+            app.router.add_get("/api/events/", handler)
+            server = TestServer(app)
+            await server.start_server()
+            try:
+                async with slumber.API(str(server.make_url("/api"))) as api:
+                    return await take(api.events.subscribe(reconnect=False), 3)
+            finally:
+                await server.close()
+
+        self.assertEqual([e.data for e in run(call())], [0, 1, 2])
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+import json
+import mock
+import slumber
+import slumber.transports
+import unittest2 as unittest
+
+try:
+    from urllib.parse import urlencode, urlsplit, parse_qs
+except ImportError:
+    from urllib import urlencode
+    from urlparse import urlsplit, parse_qs
+
+from . import helpers
+from .helpers import run
+
+
+def make_response(status_code=200, data=None, headers=None):
+    return helpers.make_response(status_code, json.dumps(data) if data is not None else b"", headers)
+
+
+class Collection(object):
+    """
+    A paginated collection taking updated_after, two records per page, with
+    an ETag per page.
+    """
+
+    def __init__(self, records):
+        self.records = dict((record["id"], record) for record in records)
+        self.requests = []
+
+    def __call__(self, method, url, params=None, headers=None, **kwargs):
+        query = dict((key, values[0]) for key, values in parse_qs(urlsplit(url).query).items())
+        query.update(params or {})
+        self.requests.append(query)
+
+        records = sorted(self.records.values(), key=lambda record: record["id"])
+        if "updated_after" in query:
+            records = [record for record in records if record["updated_at"] > int(query["updated_after"])]
+
+        page = int(query.get("page", 1))
+        body = {"results": records[(page - 1) * 2:page * 2]}
+        if page * 2 < len(records):
+            body["next"] = "/api/users/?" + urlencode(dict(query, page=page + 1))
+
+        etag = '"%s"' % hash(json.dumps(body, sort_keys=True))
+        if headers.get("if-none-match") == etag:
+            return make_response(304)
+        return make_response(data=body, headers={"etag": etag})
+
+
+def make_api(collection):
+    transport = mock.Mock(spec=slumber.transports.BaseTransport)
+
+    async def request(*args, **kwargs):
+        return collection(*args, **kwargs)
+
+    transport.request.side_effect = request
+    return slumber.API("http://example/api", transport=transport)
+
+
+class MirrorTestCase(unittest.TestCase):
+
+    def test_incremental_sync(self):
+        collection = Collection([{"id": n, "updated_at": n, "name": "user %s" % n} for n in range(1, 6)])
+        users = make_api(collection).users.mirror(since="updated_after", records="results", next="next")
+
+        stats = run(users.sync())
+        self.assertEqual(stats, {"pages": 3, "not_modified": 0, "updated": 5, "deleted": 0})
+        self.assertEqual(len(users), 5)
+        self.assertEqual(users.watermark, 5)
+
+        collection.records[2] = {"id": 2, "updated_at": 6, "name": "renamed"}
+        collection.records[6] = {"id": 6, "updated_at": 7, "name": "user 6"}
+        del collection.requests[:]
+
+        stats = run(users.sync())
+        self.assertEqual(stats, {"pages": 1, "not_modified": 0, "updated": 2, "deleted": 0})
+        self.assertEqual(collection.requests, [{"updated_after": 5}])
+        self.assertEqual(users[2]["name"], "renamed")
+        self.assertEqual(users.get(6)["name"], "user 6")
+        self.assertEqual(users.watermark, 7)
+
+    def test_params_named_like_options(self):
+        collection = Collection([{"id": 1, "updated_at": 1}])
+        users = make_api(collection).users.mirror(since="updated_after", params={"timeout": 30},
+                                                  records="results", next="next")
+        run(users.sync())
+        self.assertEqual(collection.requests, [{"timeout": 30}])
+
+    def test_tombstones(self):
+        collection = Collection([{"id": 1, "updated_at": 1}, {"id": 2, "updated_at": 2}])
+        users = make_api(collection).users.mirror(since="updated_after", deleted_field="deleted",
+                                                  records="results", next="next")
+        run(users.sync())
+
+        collection.records[1] = {"id": 1, "updated_at": 3, "deleted": True}
+        stats = run(users.sync())
+        self.assertEqual(stats["deleted"], 1)
+        self.assertNotIn(1, users)
+        self.assertIn(2, users)
+
+    def test_reconcile_every(self):
+        collection = Collection([{"id": n, "updated_at": n} for n in range(1, 6)])
+        users = make_api(collection).users.mirror(since="updated_after", reconcile_every=2,
+                                                  records="results", next="next")
+        run(users.sync())
+
+        del collection.records[5]
+        run(users.sync())
+        self.assertIn(5, users)
+
+        # The third cycle walks the whole collection, with unchanged pages
+        # not modified.
+        stats = run(users.sync())
+        self.assertEqual(stats, {"pages": 2, "not_modified": 1, "updated": 2, "deleted": 1})
+        self.assertEqual(sorted(users), [1, 2, 3, 4])
+
+    def test_etag_pages(self):
+        collection = Collection([{"id": n, "updated_at": n} for n in range(1, 6)])
+        users = make_api(collection).users.mirror(records="results", next="next")
+        run(users.sync())
+
+        collection.records[5] = {"id": 5, "updated_at": 9}
+        stats = run(users.sync())
+        self.assertEqual(stats, {"pages": 3, "not_modified": 2, "updated": 1, "deleted": 0})
+        self.assertEqual(users[5]["updated_at"], 9)
+        self.assertEqual(len(users), 5)
+
+    def test_failed_cycles_keep_the_watermark(self):
+        collection = Collection([{"id": n, "updated_at": n} for n in range(1, 4)])
+        users = make_api(collection).users.mirror(since="updated_after", records="results", next="next")
+        run(users.sync())
+
+        collection.records[4] = {"id": 4, "updated_at": 4}
+        collection.records[5] = {"id": 5, "updated_at": 5}
+        collection.records[6] = {"id": 6, "updated_at": 6}
+        original = collection.__class__.__call__
+
+        def failing(self, method, url, **kwargs):
+            if "page=2" in url:
+                return make_response(503)
+            return original(self, method, url, **kwargs)
+
+        with mock.patch.object(Collection, "__call__", failing):
+            with self.assertRaises(slumber.exceptions.HttpServerError):
+                run(users.sync())
+        self.assertEqual(users.watermark, 3)
+
+        run(users.sync())
+        self.assertEqual(users.watermark, 6)
+        self.assertEqual(sorted(users), [1, 2, 3, 4, 5, 6])
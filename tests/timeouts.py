@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import mock
+import aiohttp
+import slumber
+import slumber.transports
+import slumber.serialize
+import unittest2 as unittest
+
+from slumber import exceptions, timeouts
+from .helpers import run
+
+
+class TimeoutTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.response = mock.Mock(spec=aiohttp.ClientResponse)
+        self.response.status_code = 200
+        self.response.headers = {"content-type": "application/json"}
+        self.response.content = '{"result": "a"}'
+
+        self.transport = mock.Mock(spec=slumber.transports.BaseTransport)
+        self.transport.request.return_value = self.response
+
+    def test_coerce(self):
+        self.assertEqual(timeouts.Timeout.coerce(None), None)
+        self.assertEqual(timeouts.Timeout.coerce(3), timeouts.Timeout(total=3))
+
+        timeout = timeouts.Timeout(connect=1)
+        self.assertTrue(timeouts.Timeout.coerce(timeout) is timeout)
+
+    def test_resolve_merges_override(self):
+        default = timeouts.Timeout(total=10, connect=1)
+
+        self.assertEqual(timeouts.resolve(default, None), default)
+        self.assertEqual(timeouts.resolve(None, 2), timeouts.Timeout(total=2))
+        self.assertEqual(timeouts.resolve(default, timeouts.Timeout(read=5)),
+                         timeouts.Timeout(total=10, connect=1, read=5))
+
+    def test_capped_to_budget(self):
+        timeout = timeouts.Timeout(total=10, connect=1, read=2)
+
+        self.assertEqual(timeout.capped(3), timeouts.Timeout(total=3, connect=1, read=2))
+        self.assertEqual(timeout.capped(30).total, 10)
+
+    def test_without_total(self):
+        timeout = timeouts.Timeout(total=10, connect=1, read=2)
+        self.assertEqual(timeout.without_total(), timeouts.Timeout(connect=1, read=2))
+
+    def test_deadline_nesting_only_shortens(self):
+        self.assertEqual(timeouts.remaining(), None)
+
+        with slumber.deadline(10):
+            with slumber.deadline(100):
+                self.assertTrue(timeouts.remaining() <= 10)
+            with slumber.deadline(1):
+                self.assertTrue(timeouts.remaining() <= 1)
+
+        self.assertEqual(timeouts.remaining(), None)
+
+    def test_api_timeout_is_sent(self):
+        api = slumber.API("http://example/api/v1", transport=self.transport, timeout=5)
+
+        run(api.test.get())
+
+        timeout = self.transport.request.call_args[1]["timeout"]
+        self.assertEqual(timeout.total, 5)
+
+    def test_per_call_timeout_overrides_api(self):
+        api = slumber.API("http://example/api/v1", transport=self.transport,
+                          timeout=timeouts.Timeout(total=5, connect=1))
+
+        resp = run(api.test.get(timeout=2, q="x"))
+
+        self.assertEqual(resp["result"], "a")
+        args, kwargs = self.transport.request.call_args
+        self.assertEqual(kwargs["params"], {"q": "x"})
+        self.assertEqual(kwargs["timeout"].total, 2)
+        self.assertEqual(kwargs["timeout"].connect, 1)
+
+    def test_no_timeout_is_sent_by_default(self):
+        api = slumber.API("http://example/api/v1", transport=self.transport)
+
+        run(api.test.get())
+
+        self.assertFalse("timeout" in self.transport.request.call_args[1])
+
+    def test_expired_deadline_does_not_send(self):
+        api = slumber.API("http://example/api/v1", transport=self.transport)
+
+        async def call():
+            with slumber.deadline(0):
+                await api.test.get()
+
+        with self.assertRaises(exceptions.DeadlineExceeded):
+            run(call())
+
+        self.assertEqual(self.transport.request.call_count, 0)
+
+    def test_slow_request_is_cancelled_at_deadline(self):
+        cancelled = []
+
+        async def slow(*args, **kwargs):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+
+        self.transport.request.side_effect = slow
+        api = slumber.API("http://example/api/v1", transport=self.transport)
+
+        async def call():
+            with slumber.deadline(0.05):
+                await api.test.get()
+
+        with self.assertRaises(exceptions.DeadlineExceeded):
+            run(call())
+
+        self.assertEqual(cancelled, [True])
+        self.assertTrue(self.transport.request.call_args[1]["timeout"].total <= 0.05)
@@ -0,0 +1,318 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import io
+import json
+import socket
+import aiohttp
+import slumber
+import slumber.inprocess
+import slumber.transports
+import unittest2 as unittest
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from slumber import exceptions
+
+try:
+    import httpx
+    import hypercorn.asyncio
+    import hypercorn.config
+except ImportError:
+    httpx = None
+
+from .helpers import run
+
+
+async def echo(request):
+    body = await request.read()
+    return web.json_response({
+        "method": request.method,
+        "query": dict(request.query),
+        "body": body.decode("utf-8"),
+    })
+
+
+async def upload(request):
+    form = await request.post()
+    return web.json_response({
+        "name": form["name"],
+        "file": form["file"].file.read().decode("utf-8"),
+    })
+
+
+async def missing(request):
+    return web.json_response({"detail": "nope"}, status=404)
+
+
+def make_app():
+    app = web.Application()
+    app.router.add_route("*", "/api/echo", echo)
+    app.router.add_post("/api/upload", upload)
+    app.router.add_get("/api/missing", missing)
+    return app
+
+
+async def asgi_app(scope, receive, send):
+    """
+    Answers every request with the HTTP version it was made with.
+    """
+    if scope["type"] == "lifespan":
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    body = json.dumps({"http_version": scope["http_version"], "path": scope["path"]}).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": 200,
+        "headers": [(b"content-type", b"application/json")],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class AiohttpTransportTestCase(unittest.TestCase):
+
+    def with_api(self, test):
+        async def call():
+            server = TestServer(make_app())
+            await server.start_server()
+            transport = slumber.transports.AiohttpTransport()
+            api = slumber.API(str(server.make_url("/api")), append_slash=False, transport=transport)
+            try:
+                return await test(api)
+            finally:
+                await transport.close()
+                await server.close()
+
+        return run(call())
+
+    def test_get(self):
+        resp = self.with_api(lambda api: api.echo.get(q="x"))
+        self.assertEqual(resp, {"method": "GET", "query": {"q": "x"}, "body": ""})
+
+    def test_post_serializes_body(self):
+        resp = self.with_api(lambda api: api.echo.post({"a": 1}))
+        self.assertEqual(json.loads(resp["body"]), {"a": 1})
+
+    def test_files_are_sent_as_form(self):
+        resp = self.with_api(lambda api: api.upload.post({"name": "out"}, files={"file": io.BytesIO(b"data")}))
+        self.assertEqual(resp, {"name": "out", "file": "data"})
+
+    def test_errors_keep_exception_types(self):
+        with self.assertRaises(exceptions.HttpNotFoundError) as ctx:
+            self.with_api(lambda api: api.missing.get())
+
+        self.assertEqual(ctx.exception.response.status_code, 404)
+
+    def test_raw_response(self):
+        resp, decoded = self.with_api(lambda api: api.echo.as_raw().get())
+
+        self.assertIsInstance(resp, slumber.transports.Response)
+        self.assertIsInstance(resp.raw, aiohttp.ClientResponse)
+        self.assertEqual(decoded["method"], "GET")
+
+    def test_session_and_auth_belong_to_the_transport(self):
+        transport = slumber.transports.AiohttpTransport()
+        with self.assertRaises(exceptions.ImproperlyConfigured):
+            slumber.API("http://example/api", transport=transport, auth=("user", "pass"))
+        with self.assertRaises(exceptions.ImproperlyConfigured):
+            slumber.API("http://example/api", transport=transport, session=object())
+
+    def test_close(self):
+        async def call():
+            server = TestServer(make_app())
+            await server.start_server()
+            balancer = slumber.Balancer([str(server.make_url("/api"))], health_check_path="echo",
+                                        health_check_interval=60)
+            try:
+                async with slumber.API(balancer=balancer, append_slash=False) as api:
+                    await api.echo.get()
+                    health_checks = balancer._health_check_task
+                await asyncio.gather(health_checks, return_exceptions=True)
+                return health_checks, api._store["transport"]
+            finally:
+                await server.close()
+
+        health_checks, transport = run(call())
+        self.assertTrue(health_checks.cancelled())
+        self.assertTrue(transport.session.closed)
+
+
+@unittest.skipIf(httpx is None, "httpx and hypercorn are required")
+class HttpxTransportTestCase(unittest.TestCase):
+
+    def test_http2_against_local_server(self):
+        async def call():
+            with socket.socket() as sock:
+                sock.bind(("127.0.0.1", 0))
+                port = sock.getsockname()[1]
+
+            config = hypercorn.config.Config()
+            config.bind = ["127.0.0.1:%s" % port]
+            shutdown = asyncio.Event()
+            server = asyncio.ensure_future(
+                hypercorn.asyncio.serve(asgi_app, config, shutdown_trigger=shutdown.wait))
+
+            while True:
+                try:
+                    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                except OSError:
+                    await asyncio.sleep(0.01)
+                else:
+                    writer.close()
+                    break
+
+            transport = slumber.transports.HttpxTransport(prior_knowledge=True)
+            api = slumber.API("http://127.0.0.1:%s/api" % port, append_slash=False,
+                              transport=transport)
+            try:
+                return await asyncio.gather(*[api.items(i).get() for i in range(20)])
+            finally:
+                await transport.close()
+                shutdown.set()
+                await server
+
+        results = run(call())
+
+        self.assertEqual(set(result["http_version"] for result in results), set(["2"]))
+        self.assertEqual(results[3]["path"], "/api/items/3")
+
+
+class AiohttpAppTransportTestCase(unittest.TestCase):
+
+    def with_api(self, test, app=None):
+        async def call():
+            transport = slumber.inprocess.AiohttpAppTransport(app or make_app())
+            api = slumber.API("http://example/api", append_slash=False, transport=transport)
+            try:
+                return await test(api)
+            finally:
+                await transport.close()
+
+        return run(call())
+
+    def test_get(self):
+        resp = self.with_api(lambda api: api.echo.get(q="x"))
+        self.assertEqual(resp, {"method": "GET", "query": {"q": "x"}, "body": ""})
+
+    def test_post_serializes_body(self):
+        resp = self.with_api(lambda api: api.echo.post({"a": 1}))
+        self.assertEqual(json.loads(resp["body"]), {"a": 1})
+
+    def test_files_are_sent_as_form(self):
+        resp = self.with_api(lambda api: api.upload.post({"name": "out"}, files={"file": io.BytesIO(b"data")}))
+        self.assertEqual(resp, {"name": "out", "file": "data"})
+
+    def test_error_response(self):
+        with self.assertRaises(exceptions.HttpNotFoundError):
+            self.with_api(lambda api: api.missing.get())
+
+    def test_unknown_route(self):
+        with self.assertRaises(exceptions.HttpNotFoundError):
+            self.with_api(lambda api: api.nowhere.get())
+
+    def test_middlewares_and_startup_run(self):
+        started = []
+
+        @web.middleware
+        async def tag(request, handler):
+            resp = await handler(request)
+            resp.headers["x-tag"] = "started" if started else "not started"
+            return resp
+
+        async def startup(app):
+            started.append(True)
+
+        app = make_app()
+        app.middlewares.append(tag)
+        app.on_startup.append(startup)
+
+        resp, _ = self.with_api(lambda api: api.echo.as_raw().get(), app=app)
+        self.assertEqual(resp.headers["x-tag"], "started")
+
+    def test_concurrent_requests(self):
+        async def test(api):
+            return await asyncio.gather(*[api.echo.get(i=i) for i in range(100)])
+
+        results = self.with_api(test)
+        self.assertEqual([result["query"]["i"] for result in results], [str(i) for i in range(100)])
+
+
+    def test_streamed_response(self):
+        async def events(request):
+            resp = web.StreamResponse(headers={"content-type": "text/event-stream"})
+            await resp.prepare(request)
+            for n in range(3):
+                await resp.write(("data: %d\n\n" % n).encode("utf-8"))
+            return resp
+
+        app = make_app()
+        app.router.add_get("/api/events", events)
+
+        async def test(api):
+            received = []
+            async for event in api.events.subscribe(reconnect=False):
+                received.append(event.data)
+            return received
+
+        self.assertEqual(self.with_api(test, app=app), [0, 1, 2])
+
+    def test_timeout(self):
+        async def slow(request):
+            await asyncio.sleep(1)
+            return web.json_response({})
+
+        app = make_app()
+        app.router.add_get("/api/slow", slow)
+
+        with self.assertRaises(exceptions.RequestTimeout):
+            self.with_api(lambda api: api.slow.get(timeout=0.05), app=app)
+
+
+class ASGITransportTestCase(unittest.TestCase):
+
+    def test_timeout(self):
+        async def slow(scope, receive, send):
+            await asyncio.sleep(1)
+
+        async def call():
+            api = slumber.API("http://example/api", transport=slumber.inprocess.ASGITransport(slow))
+            return await api.items.get(timeout=0.05)
+
+        with self.assertRaises(exceptions.RequestTimeout):
+            run(call())
+
+    def test_get(self):
+        async def call():
+            transport = slumber.inprocess.ASGITransport(asgi_app)
+            api = slumber.API("http://example/api", append_slash=False, transport=transport)
+            return await api.items(3).get(q="x")
+
+        self.assertEqual(run(call()), {"http_version": "1.1", "path": "/api/items/3"})
+
+    def test_request_body_and_query(self):
+        received = {}
+
+        async def app(scope, receive, send):
+            message = await receive()
+            received.update(scope=scope, body=message["body"])
+            await send({"type": "http.response.start", "status": 201,
+                        "headers": [(b"content-type", b"application/json")]})
+            await send({"type": "http.response.body", "body": b'{"id": 1}', "more_body": True})
+            await send({"type": "http.response.body", "body": b""})
+
+        async def call():
+            api = slumber.API("http://example/api", transport=slumber.inprocess.ASGITransport(app))
+            return await api.items.post({"a": 1}, q="x")
+
+        self.assertEqual(run(call()), {"id": 1})
+        self.assertEqual(received["body"], b'{"a": 1}')
+        self.assertEqual(received["scope"]["method"], "POST")
+        self.assertEqual(received["scope"]["path"], "/api/items/")
+        self.assertEqual(received["scope"]["query_string"], b"q=x")
+        self.assertTrue((b"host", b"example") in received["scope"]["headers"])
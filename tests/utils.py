@@ -66,3 +66,9 @@ class UtilsTestCase(unittest.TestCase):
         url = slumber.url_join("http://example.com/", "tǝst/".decode('utf8'))
         expected = "http://example.com/tǝst/".decode('utf8')
         self.assertEqual(url, expected)
+
+    def test_parse_retry_after(self):
+        self.assertEqual(slumber.utils.parse_retry_after("3"), 3.0)
+        self.assertEqual(slumber.utils.parse_retry_after(None), None)
+        self.assertEqual(slumber.utils.parse_retry_after("soon"), None)
+        self.assertEqual(slumber.utils.parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT"), 0.0)
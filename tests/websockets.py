@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import aiohttp
+import slumber
+import slumber.inprocess
+import slumber.websockets
+import unittest2 as unittest
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from slumber import exceptions
+from .helpers import run
+
+
+async def rpc(request):
+    """
+    Answers {"id", "method": "add", "params"} calls in reverse order of
+    arrival, two at a time, and pushes a notification first.
+    """
+    ws = web.WebSocketResponse()
+    await ws.prepare(request)
+    await ws.send_json({"event": "hello", "auth": request.headers.get("Authorization"),
+                        "query": dict(request.query)})
+
+    waiting = []
+    async for message in ws:
+        if message.type != aiohttp.WSMsgType.TEXT:
+            continue
+        call = message.json()
+        if call.get("method") == "echo":
+            await ws.send_json(call)
+            continue
+        waiting.append(call)
+        if len(waiting) == 2:
+            for call in reversed(waiting):
+                await ws.send_json({"id": call["id"], "result": sum(call["params"])})
+            waiting = []
+    return ws
+
+
+async def silent(request):
+    ws = web.WebSocketResponse()
+    await ws.prepare(request)
+    async for message in ws:
+        if message.type == aiohttp.WSMsgType.TEXT and message.data == '"bye"':
+            await ws.close()
+    return ws
+
+
+async def chatty(request):
+    """
+    Pushes five notifications, then echoes the calls.
+    """
+    ws = web.WebSocketResponse()
+    await ws.prepare(request)
+    for n in range(5):
+        await ws.send_json({"event": n})
+    async for message in ws:
+        if message.type == aiohttp.WSMsgType.TEXT:
+            await ws.send_str(message.data)
+    return ws
+
+
+async def with_server(test):
+    app = web.Application()
+    app.router.add_get("/api/rpc/", rpc)
+    app.router.add_get("/api/silent/", silent)
+    app.router.add_get("/api/chatty/", chatty)
+    server = TestServer(app)
+    await server.start_server()
+    try:
+        async with slumber.API(str(server.make_url("/api")), auth=("user", "pass")) as api:
+            return await test(api)
+    finally:
+        await server.close()
+
+
+class WebSocketTestCase(unittest.TestCase):
+
+    def test_websocket_url(self):
+        self.assertEqual(slumber.websockets.websocket_url("http://example/api/"), "ws://example/api/")
+        self.assertEqual(slumber.websockets.websocket_url("https://example/api/"), "wss://example/api/")
+
+    def test_calls_are_correlated_by_id(self):
+        async def test(api):
+            async with api.rpc.websocket() as ws:
+                results = await asyncio.gather(ws.call({"method": "add", "params": [1, 2]}),
+                                               ws.call({"method": "add", "params": [3, 4]}))
+                hello = await ws.receive()
+            return results, hello
+
+        results, hello = run(with_server(test))
+        self.assertEqual([result["result"] for result in results], [3, 7])
+        self.assertEqual(results[0]["id"], 1)
+        self.assertEqual(results[1]["id"], 2)
+        self.assertEqual(hello["event"], "hello")
+        self.assertEqual(hello["auth"], aiohttp.BasicAuth("user", "pass").encode())
+
+    def test_query_and_send(self):
+        async def test(api):
+            ws = await api.rpc.websocket(channel="prices")
+            await ws.send({"method": "echo", "id": "a"})
+            messages = [await ws.receive(), await ws.receive()]
+            await ws.close()
+            return messages
+
+        hello, echo = run(with_server(test))
+        self.assertEqual(hello["query"], {"channel": "prices"})
+        self.assertEqual(echo, {"method": "echo", "id": "a"})
+
+    def test_call_timeout(self):
+        async def test(api):
+            async with api.silent.websocket() as ws:
+                await ws.call({"method": "add", "params": []}, timeout=0.05)
+
+        with self.assertRaises(exceptions.RequestTimeout):
+            run(with_server(test))
+
+    def test_close_ends_iteration_and_fails_calls(self):
+        async def test(api):
+            async with api.silent.websocket() as ws:
+                pending = asyncio.ensure_future(ws.call({"method": "add"}))
+                await asyncio.sleep(0.01)
+                await ws.send("bye")
+                messages = [message async for message in ws]
+                with self.assertRaises(exceptions.ConnectionClosed):
+                    await pending
+                with self.assertRaises(exceptions.ConnectionClosed):
+                    await ws.send("again")
+            return messages
+
+        self.assertEqual(run(with_server(test)), [])
+
+    def test_calls_are_answered_with_a_full_queue(self):
+        async def test(api):
+            async with api.chatty.websocket(max_queue=2) as ws:
+                reply = await ws.call({"method": "echo"}, timeout=1)
+                return reply, ws.dropped, [await ws.receive(), await ws.receive()]
+
+        reply, dropped, messages = run(with_server(test))
+        self.assertEqual(reply, {"method": "echo", "id": 1})
+        self.assertEqual(dropped, 3)
+        self.assertEqual(messages, [{"event": 3}, {"event": 4}])
+
+    def test_transport_without_websockets(self):
+        async def test():
+            api = slumber.API("http://example/api", transport=slumber.inprocess.ASGITransport(None))
+            await api.rpc.websocket()
+
+        with self.assertRaises(NotImplementedError):
+            run(test())